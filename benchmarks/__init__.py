@@ -0,0 +1,5 @@
+"""Benchmarks of the ETL stages over synthetic bank statements.
+
+    python -m benchmarks.bench_pipeline --bank bbva --pages 10 --output results.json
+    python -m benchmarks.compare base.json results.json
+"""
@@ -0,0 +1,106 @@
+"""Micro-benchmark of the Nequi transaction transforms.
+
+Compares the vectorized clean_data/transform_transactions with the former
+apply/str.replace implementation on a synthetic statement.
+
+Usage:
+    python -m benchmarks.bench_nequi_transforms --rows 100000 --repeat 3
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from files_process.etls.run_log import RunLog
+from files_process.etls.steps import transform_nequi_transactions as nequi
+
+
+def synthetic_statement(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Nequi-like extracted table: amounts as text with '$' and thousands separators, some blanks."""
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0, 250_000, rows).round(2)
+    balances = np.abs(rng.normal(1_000_000, 500_000, rows)).round(2)
+
+    def as_text(amounts):
+        return pd.Series([f"${amount:,.2f}" for amount in amounts], dtype=object)
+
+    dataframe = pd.DataFrame({
+        "operation_date": pd.date_range("2020-01-01", periods=rows, freq="min").strftime("%d/%m/%Y"),
+        "description": rng.choice(["PAGO PSE", "RECARGA", "ENVIO A OTRO NEQUI", "COMPRA"], rows),
+        "value": as_text(values),
+        "balance": as_text(balances),
+    })
+    blanks = rng.random(rows) < 0.01
+    dataframe.loc[blanks, "value"] = " "
+    return dataframe
+
+
+def legacy_clean_data(dataframe, log, logger, **kwargs):
+    dataframe["month"] = f"{kwargs.get('month')}/{kwargs.get('year')}"
+    dataframe = dataframe.replace(r"^\s*$", pd.NA, regex=True)
+    for column in ["value", "balance"]:
+        dataframe[column] = dataframe[column].str.replace(",", "", regex=False)
+        dataframe[column] = dataframe[column].str.replace("$", "", regex=False)
+        dataframe[column] = dataframe[column].fillna(0)
+        dataframe[column] = pd.to_numeric(dataframe[column], errors="coerce")
+        dataframe = dataframe[pd.notna(dataframe[column])]
+    dataframe["description"] = dataframe["description"].astype(str)
+    dataframe["month"] = dataframe["month"].astype(str)
+    return dataframe, log
+
+
+def legacy_transform_transactions(dataframe, log, logger, **kwargs):
+    dataframe["concept"] = dataframe["description"]
+    dataframe["charges"] = dataframe["value"].apply(lambda x: x if x <= 0 else 0)
+    dataframe["credits"] = dataframe["value"].apply(lambda x: x if x > 0 else 0)
+    dataframe["balance"] = dataframe["balance"]
+    dataframe["bank"] = "Nequi"
+    dataframe["extra_data"] = ""
+    dataframe = dataframe.drop(columns=["description", "value"])
+    dataframe["charges"] = dataframe["charges"].apply(lambda x: abs(x) if x < 0 else x)
+    return dataframe, log
+
+
+def run(clean, transform, source: pd.DataFrame, logger) -> (pd.DataFrame, float, float):
+    """Run both transforms, returning the result and the seconds spent in each."""
+    start = time.perf_counter()
+    dataframe, log = clean(source.copy(), RunLog(), logger, month=1, year=2024)
+    cleaned = time.perf_counter()
+    dataframe, log = transform(dataframe, log, logger)
+    return dataframe, cleaned - start, time.perf_counter() - cleaned
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+
+    logger = logging.getLogger("bench")
+    source = synthetic_statement(options.rows)
+
+    results = {}
+    for name, clean, transform in [
+        ("legacy", legacy_clean_data, legacy_transform_transactions),
+        ("vectorized", nequi.clean_data, nequi.transform_transactions),
+    ]:
+        runs = [run(clean, transform, source, logger) for _ in range(options.repeat)]
+        clean_time = min(r[1] for r in runs)
+        transform_time = min(r[2] for r in runs)
+        results[name] = (runs[-1][0], clean_time + transform_time)
+        print(
+            f"{name:<10} {len(runs[-1][0]):>8} rows  "
+            f"clean_data {clean_time:.3f}s  transform_transactions {transform_time:.3f}s  (best of {options.repeat})"
+        )
+
+    legacy, vectorized = results["legacy"][0], results["vectorized"][0]
+    pd.testing.assert_frame_equal(
+        legacy.reset_index(drop=True), vectorized.reset_index(drop=True), check_dtype=False
+    )
+    print(f"speedup: {results['legacy'][1] / results['vectorized'][1]:.1f}x (same output)")
+
+
+if __name__ == "__main__":
+    main()
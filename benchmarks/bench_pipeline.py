@@ -0,0 +1,218 @@
+"""End-to-end benchmark of a statement upload over synthetic PDFs.
+
+Times each stage: check_pdf_access, get_text, extract_tables, and one real
+pipeline run of the task against a local SQLite database standing in for
+MySQL (or any --db-url). The pipeline stages (extract, every step of
+tasks.json, commit) are read from the run's metric records. Steps that call
+stored procedures are left out of the pipeline on SQLite. The post-load
+step is never run.
+Results are written as JSON, to compare runs with benchmarks.compare.
+
+Usage:
+    python -m benchmarks.bench_pipeline --bank bbva --pages 10 --rows 25 --repeat 3 --output results.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.engine import make_url
+
+from benchmarks.synthetic_pdf import make_statement
+from files_process.batch import BANK_TASKS
+from files_process.etls.db import dispose_engines
+from files_process.etls.etl import ETL
+from files_process.extractors import PDFExtractor
+
+MONTH, YEAR = 3, 2024
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _timed(func, *args, **kwargs) -> tuple:
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _record(results: dict, stage: str, seconds: float, rows: int = None):
+    entry = results.setdefault(stage, {"runs": [], "rows": None})
+    entry["runs"].append(round(seconds, 6))
+    if rows is not None:
+        entry["rows"] = rows
+
+
+def _uses_stored_procedure(step_plan) -> bool:
+    return "stored_procedure" in step_plan.args
+
+
+def _stage(step: str) -> str:
+    return step if step in ("extract", "load", "commit") else f"step:{step}"
+
+
+def run_task(plan, settings: dict, pdf_path: str, password: str, db_url: str, results: dict, logger):
+    """Runs the task's pipeline once over the PDF and records the seconds of each step from its metric records."""
+    sqlite = make_url(db_url).get_backend_name() == "sqlite"
+    run_kwargs = {"filepath": pdf_path, "month": MONTH, "year": YEAR, "cache": "off", "dedup": "off", "checkpoint": "off"}
+    if password:
+        run_kwargs["pdf_password"] = password
+
+    pipeline = plan.build(settings, logger, **run_kwargs)
+    # The post-load would move or delete the statement
+    pipeline.post_load = None
+    if sqlite:
+        skipped = [step_plan.name for step_plan in plan.steps if _uses_stored_procedure(step_plan)]
+        for name in skipped:
+            results.setdefault(f"step:{name}", {"runs": [], "rows": None, "skipped": "stored procedure on SQLite"})
+        pipeline.steps = [step for step_plan, step in zip(plan.steps, pipeline.steps) if step_plan.name not in skipped]
+
+    log = pipeline.run()
+    for record in log:
+        if record.identifier != "metric" or record.data["step"] == "total":
+            continue
+        rows = record.data.get("rows_out")
+        _record(results, _stage(record.data["step"]), record.data["wall_seconds"],
+                record.data.get("rows_in") if rows is None else rows)
+
+    for message in log.messages("error"):
+        logger.warning(f"Step error during the benchmark: {message}")
+    return log
+
+
+def run_benchmark(bank: str, pages: int, rows: int, password: str = None, repeat: int = 3,
+                  db_url: str = None, workdir: str = None) -> dict:
+    """
+    Generates a statement and times every stage of its upload.
+
+    Args:
+        bank: Bank key (bbva, nequi)
+        pages: Pages of the synthetic statement
+        rows: Movements per page
+        password: Encrypts the statement with this password when given
+        repeat: Runs of each stage
+        db_url: Database of the load, a SQLite file in workdir by default
+        workdir: Directory for the PDF and the databases, a temporary one by default
+
+    Returns:
+        dict: Stage name -> runs (seconds), median, min and rows
+    """
+    from settings import Settings
+
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_")
+    db_url = db_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    logger = logging.getLogger("bench")
+
+    pdf_path = make_statement(os.path.join(workdir, f"{bank}.pdf"), bank, pages, rows, password, MONTH, YEAR)
+
+    app_settings = Settings()
+    plan = ETL(app_settings).get_plan(BANK_TASKS[bank])
+    settings = {
+        **app_settings.__dict__,
+        "table_cache_enabled": False,
+        "dedup_index_path": os.path.join(workdir, "dedup.db"),
+        # Step timings come from the metric records of the run, not from the metric sinks
+        "metrics_enabled": True,
+        "metrics_tracemalloc": False,
+        "metrics_jsonl_path": None,
+        "metrics_prometheus_dir": None,
+    }
+    flavor = plan.extract.args.get("flavor", "network")
+
+    extractor = PDFExtractor(logger)
+    results = {}
+    # The tasks read the connection string from MYSQL_DB_URI, pointed at the stand-in database during the runs
+    previous_db_uri = os.environ.get("MYSQL_DB_URI")
+    os.environ["MYSQL_DB_URI"] = db_url
+    try:
+        for _ in range(repeat):
+            _, seconds = _timed(extractor.check_pdf_access, pdf_path, password)
+            _record(results, "check_pdf_access", seconds)
+
+            text, seconds = _timed(extractor.get_text, pdf_path, password)
+            _record(results, "get_text", seconds, len(text))
+
+            tables, seconds = _timed(
+                extractor.extract_tables, pdf_path, password, flavor=flavor,
+                workers=settings.get("pdf_extract_workers", 1), min_parallel_pages=settings.get("pdf_parallel_min_pages", 4)
+            )
+            _record(results, "extract_tables", seconds, sum(len(table) for table in tables))
+
+            run_task(plan, settings, pdf_path, password, db_url, results, logger)
+    finally:
+        if previous_db_uri is None:
+            os.environ.pop("MYSQL_DB_URI", None)
+        else:
+            os.environ["MYSQL_DB_URI"] = previous_db_uri
+
+    for entry in results.values():
+        if entry["runs"]:
+            entry["median"] = statistics.median(entry["runs"])
+            entry["min"] = min(entry["runs"])
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bank", choices=sorted(BANK_TASKS) + ["all"], default="all")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=25, help="Movements per page")
+    parser.add_argument("--password", default=None, help="Encrypt the statements with this password")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--db-url", default=None, help="SQLAlchemy URL of the load database (default: SQLite in a temp dir)")
+    parser.add_argument("--output", default=None, help="JSON results file (default: stdout)")
+    options = parser.parse_args(argv)
+
+    banks = sorted(BANK_TASKS) if options.bank == "all" else [options.bank]
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": {
+                "pages": options.pages, "rows": options.rows, "encrypted": bool(options.password),
+                "repeat": options.repeat, "db": make_url(options.db_url).get_backend_name() if options.db_url else "sqlite",
+            },
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        for bank in banks:
+            bank_dir = os.path.join(workdir, bank)
+            os.makedirs(bank_dir)
+            for stage, entry in run_benchmark(
+                    bank, options.pages, options.rows, options.password, options.repeat, options.db_url, bank_dir).items():
+                report["results"][f"{bank}/{stage}"] = entry
+        # Release the SQLite files before the directory is removed
+        dispose_engines()
+
+    output = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w") as results_file:
+            results_file.write(output)
+    else:
+        print(output)
+
+    for stage, entry in report["results"].items():
+        summary = entry.get("skipped") or f"{entry['median']:.4f}s median, {entry['min']:.4f}s min"
+        print(f"{stage:<32} {summary}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Compare two benchmark result files written by benchmarks.bench_pipeline.
+
+Usage:
+    python -m benchmarks.compare base.json new.json [--threshold 0.1]
+
+Prints the median of each stage in both runs and the change. Exits with 1
+when a stage is slower than the threshold (10% by default).
+"""
+import argparse
+import json
+import sys
+
+
+def load_results(path: str) -> dict:
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+def compare(base: dict, new: dict, threshold: float = 0.1) -> list:
+    """
+    Compares the stage medians of two reports.
+
+    Returns:
+        list: (stage, base median, new median, relative change, status) for the stages timed in both
+    """
+    rows = []
+    for stage, entry in new["results"].items():
+        base_entry = base["results"].get(stage)
+        if not base_entry or "median" not in base_entry or "median" not in entry:
+            continue
+        change = (entry["median"] - base_entry["median"]) / base_entry["median"] if base_entry["median"] else 0.0
+        status = "slower" if change > threshold else "faster" if change < -threshold else ""
+        rows.append((stage, base_entry["median"], entry["median"], change, status))
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change reported as slower/faster")
+    options = parser.parse_args(argv)
+
+    base, new = load_results(options.base), load_results(options.new)
+    print(f"base {base['meta'].get('commit')}  new {new['meta'].get('commit')}")
+    if base["meta"].get("params") != new["meta"].get("params"):
+        print(f"warning: different parameters {base['meta'].get('params')} / {new['meta'].get('params')}")
+
+    rows = compare(base, new, options.threshold)
+    width = max([len(row[0]) for row in rows] + [5])
+    print(f"{'stage':<{width}}  {'base':>9}  {'new':>9}  {'change':>8}")
+    for stage, base_median, new_median, change, status in rows:
+        print(f"{stage:<{width}}  {base_median:>8.4f}s  {new_median:>8.4f}s  {change:>+7.1%}  {status}")
+    return 1 if any(row[4] == "slower" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Synthetic bank statements for the benchmarks.
+
+BBVA-style statements draw the movements as a ruled grid, read by camelot's
+lattice/network flavors; Nequi-style statements lay them out as plain aligned
+text, read by the stream flavor. The first page carries a header with the bank
+and the period, like the real statements. Needs reportlab, which is not a
+runtime dependency of the bot (pip install reportlab).
+
+Usage:
+    python -m benchmarks.synthetic_pdf out.pdf --bank nequi --pages 30 --rows 25 --password secret
+"""
+import argparse
+import io
+import random
+from datetime import date, timedelta
+
+import pypdf
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet
+
+
+CONCEPTS = [
+    "PAGO PSE SERVICIOS PUBLICOS", "COMPRA EN COMERCIO", "TRANSFERENCIA RECIBIDA", "RETIRO CAJERO",
+    "ABONO NOMINA", "PAGO TARJETA CREDITO", "RECARGA CELULAR", "ENVIO A OTRO NEQUI", "INTERESES",
+]
+
+BBVA_HEADER = ["Mov.", "F. Operación", "F. Valor", "Concepto", "Cargos", "Abonos", "Saldo"]
+NEQUI_HEADER = ["Fecha", "Descripción", "Valor", "Saldo"]
+
+
+def _amount(value: float) -> str:
+    return f"{value:,.2f}"
+
+
+def _movements(rows: int, month: int, year: int, seed: int) -> list:
+    """Movements of the period as (day, concept, value, balance), value < 0 for charges."""
+    rng = random.Random(seed)
+    start = date(year, month, 1)
+    balance = 1_500_000.0
+    movements = []
+    for number in range(rows):
+        day = start + timedelta(days=min(27, number * 28 // max(rows, 1)))
+        value = round(rng.uniform(-400_000, 400_000), 2)
+        balance = round(balance + value, 2)
+        movements.append((day, rng.choice(CONCEPTS), value, balance))
+    return movements
+
+
+def _bbva_pdf(pages: int, rows_per_page: int, month: int, year: int, seed: int) -> bytes:
+    buffer = io.BytesIO()
+    styles = getSampleStyleSheet()
+    document = SimpleDocTemplate(buffer, pagesize=letter, leftMargin=1 * cm, rightMargin=1 * cm)
+    last_day = (date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)).day
+    story = [
+        Paragraph("BBVA Colombia - Extracto de cuenta de ahorros", styles["Title"]),
+        Paragraph(f"Periodo: 01/{month:02d}/{year} al {last_day}/{month:02d}/{year}", styles["Normal"]),
+    ]
+    movements = _movements(pages * rows_per_page, month, year, seed)
+    for page in range(pages):
+        rows = [BBVA_HEADER]
+        for number, (day, concept, value, balance) in enumerate(
+                movements[page * rows_per_page:(page + 1) * rows_per_page], start=page * rows_per_page + 1):
+            operation_date = day.strftime("%d/%m/%Y")
+            rows.append([
+                str(number), operation_date, operation_date, concept,
+                _amount(-value) if value < 0 else "", _amount(value) if value >= 0 else "", _amount(balance),
+            ])
+        table = Table(rows, repeatRows=0)
+        table.setStyle(TableStyle([
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+            ("FONTSIZE", (0, 0), (-1, -1), 7),
+        ]))
+        story.append(table)
+        if page < pages - 1:
+            story.append(PageBreak())
+    document.build(story)
+    return buffer.getvalue()
+
+
+def _nequi_pdf(pages: int, rows_per_page: int, month: int, year: int, seed: int) -> bytes:
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    _, height = letter
+    columns = [1.5 * cm, 4.5 * cm, 13 * cm, 17 * cm]
+    movements = _movements(pages * rows_per_page, month, year, seed)
+    last_day = (date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)).day
+
+    for page in range(pages):
+        top = height - 2 * cm
+        if page == 0:
+            pdf.setFont("Helvetica-Bold", 14)
+            pdf.drawString(columns[0], top, "Nequi - Extracto de tu cuenta")
+            pdf.setFont("Helvetica", 9)
+            pdf.drawString(columns[0], top - 0.6 * cm, f"Periodo: {year}/{month:02d}/01 a {year}/{month:02d}/{last_day}")
+            top -= 2 * cm
+
+        pdf.setFont("Helvetica-Bold", 8)
+        # Amounts and their titles are right-aligned on the same edge, so stream reads four columns
+        pdf.drawString(columns[0], top, NEQUI_HEADER[0])
+        pdf.drawString(columns[1], top, NEQUI_HEADER[1])
+        pdf.drawRightString(columns[2] + 2.5 * cm, top, NEQUI_HEADER[2])
+        pdf.drawRightString(columns[3] + 2.5 * cm, top, NEQUI_HEADER[3])
+        pdf.setFont("Helvetica", 8)
+        line_height = min(0.6 * cm, (top - 2 * cm) / max(rows_per_page, 1))
+        for row, (day, concept, value, balance) in enumerate(movements[page * rows_per_page:(page + 1) * rows_per_page], start=1):
+            y = top - row * line_height
+            pdf.drawString(columns[0], y, day.strftime("%d/%m/%Y"))
+            pdf.drawString(columns[1], y, concept)
+            pdf.drawRightString(columns[2] + 2.5 * cm, y, f"${_amount(value)}")
+            pdf.drawRightString(columns[3] + 2.5 * cm, y, f"${_amount(balance)}")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def encrypt_pdf(content: bytes, password: str) -> bytes:
+    """Encrypts a PDF with a user password, as the banks send the statements."""
+    writer = pypdf.PdfWriter(clone_from=pypdf.PdfReader(io.BytesIO(content)))
+    writer.encrypt(password, algorithm="AES-128")
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def make_statement(path: str, bank: str = "bbva", pages: int = 5, rows_per_page: int = 25,
+                   password: str = None, month: int = 3, year: int = 2024, seed: int = 0) -> str:
+    """
+    Writes a synthetic statement.
+
+    Args:
+        path: Output PDF path
+        bank: 'bbva' (ruled table) or 'nequi' (aligned text)
+        pages: Number of pages
+        rows_per_page: Movements per page
+        password: Encrypts the PDF with this password when given
+        month, year: Period of the statement
+        seed: Seed of the generated amounts, the same arguments give the same file
+
+    Returns:
+        str: The output path
+    """
+    builders = {"bbva": _bbva_pdf, "nequi": _nequi_pdf}
+    if bank not in builders:
+        raise ValueError(f"Unknown bank '{bank}', expected one of {sorted(builders)}")
+
+    content = builders[bank](pages, rows_per_page, month, year, seed)
+    if password:
+        content = encrypt_pdf(content, password)
+    with open(path, "wb") as pdf_file:
+        pdf_file.write(content)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic bank statement.")
+    parser.add_argument("path")
+    parser.add_argument("--bank", choices=["bbva", "nequi"], default="bbva")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=25, help="Movements per page")
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--month", type=int, default=3)
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args(argv)
+    make_statement(options.path, options.bank, options.pages, options.rows, options.password,
+                   options.month, options.year, options.seed)
+
+
+if __name__ == "__main__":
+    main()
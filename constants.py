@@ -2,3 +2,7 @@
 
 PROCESS_BBVA_TRANSACTIONS_ETL = "process_transactions_bbva"
 PROCESS_NEQUI_TRANSACTIONS_ETL = "process_transactions_nequi"
+PROCESS_RESUME_ETL = "process_resume"
+
+# Tareas de cada banco, ejecutadas como un DAG sobre una sola extracción
+PROCESS_BBVA_ETL = [PROCESS_BBVA_TRANSACTIONS_ETL, PROCESS_RESUME_ETL]
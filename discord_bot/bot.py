@@ -1,7 +1,10 @@
 import discord
 import os
-from discord.ext import commands
+from concurrent.futures import ThreadPoolExecutor
+from discord.ext import commands, tasks
+from files_process.jobs import JobQueue
 from . import manage_extact_channel
+from .info_cache import StatementInfoCache
 
 
 class DiscordBot(commands.Bot):
@@ -16,6 +19,14 @@ class DiscordBot(commands.Bot):
         super().__init__(command_prefix='!', intents=intents)
         self.debug_channel = None
         self.extract_log_channel = None
+        # Ejecutor acotado para el trabajo bloqueante (PDF, LLM, ETL) fuera del event loop
+        self.executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "etl_concurrency", 2),
+            thread_name_prefix="etl"
+        )
+        self.job_queue = JobQueue.from_settings(settings)
+        # Respuestas del LLM por encabezado de extracto, para no repetir la inferencia en resubidas
+        self.info_cache = StatementInfoCache.from_settings(settings)
 
         # Registrar eventos y comandos
         self._register_events()
@@ -62,6 +73,30 @@ class DiscordBot(commands.Bot):
         commands_list = [f"- {cmd.name}: {cmd.help or 'Sin descripción'}" for cmd in self.commands]
         return "\n".join(commands_list)
 
+    async def setup_hook(self):
+        self.notify_jobs.change_interval(seconds=getattr(self.settings, "job_poll_seconds", 2))
+        self.notify_jobs.start()
+
+    @tasks.loop(seconds=2)
+    async def notify_jobs(self):
+        """Publica el resultado de los trabajos terminados por los workers"""
+        jobs = await manage_extact_channel.run_blocking(self.executor, self.job_queue.pending_notifications)
+        if not jobs:
+            return
+
+        debug_channel = await self._get_debug_channel()
+        log_channel = await self._get_extract_log_channel()
+        for job in jobs:
+            try:
+                await manage_extact_channel.handle_job_result(self, job, self.logger, debug_channel, log_channel)
+            except Exception as e:
+                self.logger.error(f"Error notificando el trabajo {job['id']}: {str(e)}")
+            await manage_extact_channel.run_blocking(self.executor, self.job_queue.mark_notified, job["id"])
+
+    @notify_jobs.before_loop
+    async def _before_notify_jobs(self):
+        await self.wait_until_ready()
+
     def _format_events(self):
         event_list = ["- on_ready", "- on_command_error"]
         return "\n".join(event_list)
@@ -101,7 +136,10 @@ class DiscordBot(commands.Bot):
             # Verificar si el mensaje está en el canal process-extract
             if message.channel.name == "process-extract":
                 log_channel = await self._get_extract_log_channel()
-                await manage_extact_channel.handle_extract_message(message, self.logger, debug_channel, log_channel, self.settings)
+                await manage_extact_channel.handle_extract_message(
+                    message, self.logger, debug_channel, log_channel, self.settings, self.job_queue, self.executor,
+                    self.info_cache
+                )
 
             # Procesar comandos después de verificar el mensaje
 
@@ -114,6 +152,19 @@ class DiscordBot(commands.Bot):
             await ctx.send(self._get_bot_info())
             self.logger.info(f"Comando 'info' ejecutado por {ctx.author.name}")
 
+        @self.command(name='job')
+        async def job(ctx, job_id: int):
+            """Muestra el estado de un trabajo de procesamiento"""
+            job = await manage_extact_channel.run_blocking(self.executor, self.job_queue.get, job_id)
+            if job is None:
+                await ctx.send(f"No existe el trabajo #{job_id}.")
+                return
+
+            status = f"**Trabajo #{job['id']}** ({job['bank']}): {job['status']}, intentos: {job['attempts']}"
+            if job['error']:
+                status += f"\nÚltimo error: {job['error']}"
+            await ctx.send(status)
+
         @self.command(name='limpiar')
         @commands.has_permissions(manage_messages=True)
         async def limpiar(ctx, cantidad: int):
@@ -122,6 +173,10 @@ class DiscordBot(commands.Bot):
             await ctx.send(f'Se han eliminado {cantidad} mensajes.', delete_after=5)
             self.logger.info(f"Comando 'limpiar' ejecutado por {ctx.author.name} - {cantidad} mensajes eliminados")
 
+    async def close(self):
+        await super().close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
     def run(self):
         """Inicia el bot"""
         TOKEN = os.getenv('DISCORD_TOKEN')
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class StatementInfoCache:
+    """Persistent cache of the statement info answered by the LLM, backed by SQLite.
+
+    Entries are keyed by a hash of the model and the normalized header text
+    sent to it, so re-uploads and retries of a statement skip the inference.
+    Entries expire after the TTL and the least recently used ones are evicted
+    beyond max_entries.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float = 90 * 24 * 3600, max_entries: int = 5000):
+        """
+        Initializes the cache and creates its table if needed.
+
+        Args:
+            db_path: Path of the SQLite database
+            ttl_seconds: Age after which an entry is ignored and removed
+            max_entries: Maximum number of entries kept
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS statement_info (
+                    key TEXT PRIMARY KEY,
+                    info TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS statement_info_accessed ON statement_info (accessed_at)")
+
+    @classmethod
+    def from_settings(cls, settings) -> "StatementInfoCache":
+        return cls(
+            getattr(settings, "llm_cache_path", "data/llm_cache.db"),
+            ttl_seconds=getattr(settings, "llm_cache_ttl_days", 90) * 24 * 3600,
+            max_entries=getattr(settings, "llm_cache_max_entries", 5000),
+        )
+
+    @contextmanager
+    def _connect(self):
+        """Autocommit connection, closed on exit."""
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def make_key(text: str, model: str) -> str:
+        """Hash of the model and the header text, ignoring case and whitespace differences."""
+        normalized = re.sub(r"\s+", " ", (text or "").lower()).strip()
+        return hashlib.sha256(f"{model}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str, model: str) -> Optional[dict]:
+        """
+        Returns the cached info for a header text, None on a miss or an expired entry.
+
+        Args:
+            text: Header text sent to the LLM
+            model: LLM model name
+        """
+        key = self.make_key(text, model)
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute("SELECT info, created_at FROM statement_info WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                connection.execute("DELETE FROM statement_info WHERE key = ?", (key,))
+                return None
+            connection.execute("UPDATE statement_info SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, text: str, model: str, info: dict):
+        """
+        Stores the info answered for a header text and evicts expired and least recently used entries.
+
+        Args:
+            text: Header text sent to the LLM
+            model: LLM model name
+            info: Validated statement info
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO statement_info (key, info, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (self.make_key(text, model), json.dumps(info), now, now)
+            )
+            connection.execute("DELETE FROM statement_info WHERE created_at < ?", (now - self.ttl_seconds,))
+            connection.execute(
+                "DELETE FROM statement_info WHERE key IN "
+                "(SELECT key FROM statement_info ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
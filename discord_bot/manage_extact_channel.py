@@ -1,10 +1,16 @@
+import asyncio
+import functools
 import os
 
+import discord
 from ollama import chat
 from ollama import ChatResponse
 from pydantic import BaseModel
-from files_process.extractors import PDFExtractor
-from files_process import FileProcessor
+from discord_bot.info_cache import StatementInfoCache
+from files_process.etls.run_log import RunLog
+from files_process.extractors import PDFExtractor, detect_statement
+from files_process.jobs import STATUS_FAILED
+from logger import setup_logger
 
 
 # Emojis para reacciones
@@ -15,6 +21,8 @@ EMOJI_WARNING = "⚠️"      # Advertencia
 EMOJI_PDF = "📄"          # Documento
 EMOJI_ACCESS = "🔒"      # Acceso
 
+LLM_MODEL = "gemma3:4b"
+
 
 class PDfInfo(BaseModel):
     bank_name: str
@@ -25,16 +33,28 @@ class PDfInfo(BaseModel):
         return self.__dict__
 
 
-def get_extract_info(text) -> PDfInfo:
+def get_extract_info(text, cache: StatementInfoCache = None, logger=None) -> PDfInfo:
     """
     Extracts information from a text that corresponds to a bank statement.
 
     Args:
         text (str): Text to extract information from
+        cache (StatementInfoCache): Optional cache of previous answers for the same text
+        logger: Logger instance (the bot's logger by default)
 
     Returns:
         PDfInfo: Extracted information
     """
+    logger = logger or setup_logger()
+    if cache is not None:
+        try:
+            cached = cache.get(text, LLM_MODEL)
+            if cached is not None:
+                return PDfInfo.model_validate(cached)
+        except Exception as e:
+            # Un caché dañado o bloqueado solo cuesta la llamada al LLM
+            logger.warning(f"Error reading the statement info cache: {e}")
+
     base_prompt = f"""
      You are going to receive a text that corresponds to a bank statement. Extract the following information from it:
 
@@ -50,13 +70,72 @@ def get_extract_info(text) -> PDfInfo:
         }
     ]
     try:
-        response: ChatResponse = chat(model='gemma3:4b', messages=messages, format=PDfInfo.model_json_schema())
+        response: ChatResponse = chat(model=LLM_MODEL, messages=messages, format=PDfInfo.model_json_schema())
         json_response = PDfInfo.model_validate_json(response.message.content)
-        return json_response
     except Exception as e:
-        print(e)
+        logger.error(f"Error extracting the statement info with the LLM: {e}")
         return None
 
+    if cache is not None:
+        try:
+            cache.put(text, LLM_MODEL, json_response.to_dict())
+        except Exception as e:
+            logger.warning(f"Error writing the statement info cache: {e}")
+    return json_response
+
+
+def complete_statement_info(task_params: dict, file_name: str, header: str, info_cache: StatementInfoCache = None,
+                            logger=None, llm_header_chars: int = 2000) -> dict:
+    """
+    Fills the bank, month and year that the upload message did not give.
+
+    The file name and the header text are tried first; the LLM is only asked,
+    with the first llm_header_chars characters of the header, when a field is
+    still missing.
+
+    Args:
+        task_params: Parameters of the upload message, updated in place
+        file_name: Name of the uploaded file
+        header: Text of the first page(s)
+        info_cache: StatementInfoCache of the LLM answers
+        logger: Logger instance
+        llm_header_chars: Characters of the header sent to the LLM
+
+    Returns:
+        dict: task_params
+    """
+    missing = [key for key in PDfInfo.model_fields if key not in task_params]
+    if not missing:
+        return task_params
+
+    detected = detect_statement(file_name, header)
+    task_params.update({key: value for key, value in detected.items() if key not in task_params})
+
+    if any(key not in task_params for key in missing):
+        if logger:
+            logger.info(f"Statement info of {file_name} not found in the header, asking the LLM")
+        info = get_extract_info(header[:llm_header_chars], info_cache, logger)
+        if info is not None:
+            task_params.update({key: value for key, value in info.to_dict().items() if key not in task_params})
+    return task_params
+
+
+async def run_blocking(executor, func, *args, **kwargs):
+    """
+    Runs a blocking call in the executor so the event loop keeps serving Discord.
+
+    Args:
+        executor: Executor to run the call in (None uses the loop's default executor)
+        func: Blocking callable
+        *args: Positional arguments for the callable
+        **kwargs: Keyword arguments for the callable
+
+    Returns:
+        The callable's result
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
 
 async def handle_error(message, file_name, error_message, log, debug_channel, clear_processing=True, error_category="error"):
     """
@@ -139,15 +218,23 @@ def get_params_from_message(message):
     return params
 
 
-async def handle_extract_message(message, logger, debug_channel, log_channel, settings):
+async def handle_extract_message(message, logger, debug_channel, log_channel, settings, job_queue, executor=None, info_cache=None):
     """
     Handles messages with PDF attachments consistently.
 
+    The access check and the statement info lookup run in the executor, then
+    the upload is enqueued as a job for the worker processes. The result is
+    reported by handle_job_result once the job finishes.
+
     Args:
         message: Discord message
         logger: Logger instance
         debug_channel: Debugging channel
+        log_channel: Channel where the processing log is posted
         settings: Application settings
+        job_queue: JobQueue where the uploads are enqueued
+        executor: Bounded executor for the blocking work
+        info_cache: StatementInfoCache of the LLM answers
     """
     logger.info(f"Processing message from channel: {message.channel.name}")
     pdf_extractor = PDFExtractor(logger)
@@ -173,12 +260,17 @@ async def handle_extract_message(message, logger, debug_channel, log_channel, se
         task_params = get_params_from_message(message)
         pdf_password = task_params.get('pdf_password', None)
 
+        document = None
+        queued = False
         try:
             os.makedirs(settings.dowload_files, exist_ok=True)
-            download_path = os.path.join(settings.dowload_files, attachment.filename)
+            # Prefixed with the message id so queued uploads with the same name do not overwrite each other
+            download_path = os.path.join(settings.dowload_files, f"{message.id}_{attachment.filename}")
             await attachment.save(download_path)
 
-            if not pdf_extractor.check_pdf_access(download_path, pdf_password):
+            # Decrypt once and share the document with the access check and the header text
+            document = await run_blocking(executor, pdf_extractor.open_document, download_path, pdf_password)
+            if not pdf_extractor.check_pdf_access(document):
                 await handle_error(
                     message,
                     attachment.filename,
@@ -191,11 +283,22 @@ async def handle_extract_message(message, logger, debug_channel, log_channel, se
 
             task_params['filepath'] = download_path
 
-            text = pdf_extractor.get_text(str(download_path), pdf_password)
-
-            info = get_extract_info(text)
-            if info is not None:
-                task_params.update({key: value for key, value in info.to_dict().items() if key not in task_params})
+            # Only what the message did not give is looked up: first with the file name and page 1, then with the LLM
+            missing = [key for key in PDfInfo.model_fields if key not in task_params]
+            if missing:
+                # Pages are read lazily and only until the header gives bank, month and year
+                header = await run_blocking(
+                    executor,
+                    pdf_extractor.get_text,
+                    document,
+                    pages=getattr(settings, "header_max_pages", 1),
+                    until=lambda text: all(key in detect_statement(attachment.filename, text) for key in missing),
+                    max_chars=getattr(settings, "header_max_chars", 20000)
+                )
+                await run_blocking(
+                    executor, complete_statement_info, task_params, attachment.filename, header, info_cache, logger,
+                    getattr(settings, "llm_header_chars", 2000)
+                )
 
             if "month" not in task_params or "year" not in task_params:
                 await handle_error(
@@ -209,24 +312,104 @@ async def handle_extract_message(message, logger, debug_channel, log_channel, se
                 )
                 continue
 
-            log = FileProcessor(settings).process_file(**task_params)
-
-            logger.info(f"File {attachment.filename} processed successfully")
-            await message.remove_reaction(EMOJI_PROCESSING, message.guild.me)
-            await message.add_reaction(EMOJI_SUCCESS)
-            await message.reply(f"✅ File {attachment.filename} processed successfully. month: {task_params['month']} year: {task_params['year']}")
-            await log_channel.send(f"✅ File {attachment.filename} processed successfully.")
+            bank_name = str(task_params.pop("bank_name", "")).strip().lower()
+            if not bank_name:
+                await handle_error(
+                    message,
+                    attachment.filename,
+                    "Please provide the bank in the format 'bank_name: <bank>'",
+                    logger,
+                    debug_channel,
+                    clear_processing=False,
+                    error_category="warning"
+                )
+                continue
 
-            transaction_log_messages = [f"{get_identifier_icon(row['identifier'])} {row['message']}" for _, row in log.iterrows() if row['identifier'] != 'file_processed']
-            transaction_log_reply = f"{EMOJI_PDF} Log {attachment.filename}.\n" + "\n".join(transaction_log_messages)
-            await log_channel.send(transaction_log_reply)
+            # The job only carries the file path, the worker process opens and decrypts the PDF again
+            job_id = await run_blocking(
+                executor,
+                job_queue.enqueue,
+                bank_name,
+                task_params,
+                channel_id=message.channel.id,
+                message_id=message.id
+            )
+            queued = True
 
-            # await log_channel.send("#" * 15)
+            logger.info(f"File {attachment.filename} queued as job {job_id}")
+            await message.reply(f"{EMOJI_PROCESSING} File {attachment.filename} queued as job #{job_id}. month: {task_params['month']} year: {task_params['year']}")
 
         except Exception as e:
-            print(e)
+            # handle_error logs it with logger.error
             await handle_error(message, attachment.filename, str(e), logger, debug_channel)
         finally:
-            await message.delete()
-            if os.path.exists(download_path):
-                os.remove(download_path)
+            if document is not None:
+                document.close()
+            # Queued uploads are kept until their job reports back
+            if not queued:
+                await message.delete()
+                if os.path.exists(download_path):
+                    os.remove(download_path)
+
+
+async def handle_job_result(bot, job, logger, debug_channel, log_channel):
+    """
+    Reports a finished job on the upload message and in the log channel, then
+    deletes the upload message. The downloaded file is deleted here if it is
+    still in place, whether the job failed or its post-load did not run.
+
+    Args:
+        bot: Discord bot, used to find the upload message
+        job: Finished job from the JobQueue
+        logger: Logger instance
+        debug_channel: Debugging channel
+        log_channel: Channel where the processing log is posted
+    """
+    file_name = os.path.basename(job["params"].get("filepath", ""))
+    message = None
+    channel = bot.get_channel(job["channel_id"]) if job["channel_id"] else None
+    if channel is not None:
+        try:
+            message = await channel.fetch_message(job["message_id"])
+        except discord.NotFound:
+            logger.warning(f"Message of job {job['id']} no longer exists")
+
+    # Bank statements must not stay in the download dir: the post-load does not run
+    # for failed jobs nor for runs that ended early (empty extraction, extract errors)
+    filepath = job["params"].get("filepath")
+    if filepath and os.path.isfile(filepath):
+        try:
+            os.remove(filepath)
+        except OSError as e:
+            logger.error(f"Error deleting {filepath}: {e}")
+
+    if job["status"] == STATUS_FAILED:
+        error_message = f"Job #{job['id']} for {file_name} failed after {job['attempts']} attempts: {job['error']}"
+        if message is not None:
+            await handle_error(message, file_name, error_message, logger, debug_channel)
+        else:
+            logger.error(error_message)
+            if debug_channel:
+                await debug_channel.send(f"{EMOJI_ERROR} {error_message}")
+    else:
+        logger.info(f"File {file_name} processed successfully")
+        params = job["params"]
+        if message is not None:
+            await message.remove_reaction(EMOJI_PROCESSING, message.guild.me)
+            await message.add_reaction(EMOJI_SUCCESS)
+            await message.reply(f"✅ File {file_name} processed successfully. month: {params.get('month')} year: {params.get('year')}")
+        await log_channel.send(f"✅ File {file_name} processed successfully.")
+
+        log = RunLog(job["result"])
+        transaction_log_messages = [f"{get_identifier_icon(record.identifier)} {record.message}" for record in log if record.identifier not in ('file_processed', 'metric', 'profile')]
+        transaction_log_reply = f"{EMOJI_PDF} Log {file_name}.\n" + "\n".join(transaction_log_messages)
+        await log_channel.send(transaction_log_reply)
+
+        profile_messages = log.messages("profile")
+        if profile_messages:
+            # Hot functions of a profiled run (profile:on), kept within the Discord message limit
+            profile_reply = "\n".join(profile_messages)[:1800]
+            await log_channel.send(f"{EMOJI_PDF} Profile {file_name}.\n```\n{profile_reply}\n```")
+
+    if message is not None:
+        await message.delete()
@@ -0,0 +1,268 @@
+"""Batch mode: process a directory of statements of one bank in parallel and load them together.
+
+Usage:
+    python -m files_process.batch <directory> <bank> [--workers N] [--password P]
+
+Each file is extracted and transformed in a worker process. The results are
+merged and go through the task's Loads and Steps once, in one transaction.
+Month and year come from the file name (2024-03, 03_2024...) unless
+--month and --year are given.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from files_process.etls.dedup import DedupIndex, row_fingerprints
+from files_process.etls.etl import ETL
+from files_process.etls.pipeline import Load, Pipeline, Transform
+from files_process.etls.run_log import RunLog
+from files_process.etls.utils import insert_row, is_enabled
+from files_process.extractors.statement_detector import detect_from_filename
+from logger import setup_logger
+import constants
+
+
+BANK_TASKS = {
+    "bbva": constants.PROCESS_BBVA_TRANSACTIONS_ETL,
+    "nequi": constants.PROCESS_NEQUI_TRANSACTIONS_ETL,
+}
+
+_etl = None
+
+
+def period_from_filename(file_path: str) -> Optional[Tuple[int, int]]:
+    """Returns (month, year) from the file name, None if it has no period."""
+    info = detect_from_filename(file_path)
+    return (info["month"], info["year"]) if "month" in info else None
+
+
+def per_file_steps(steps: list) -> int:
+    """Number of leading Transforms (not Loads) of a task, run on each file before the merge."""
+    count = 0
+    for step in steps:
+        if not isinstance(step, Transform) or isinstance(step, Load):
+            break
+        count += 1
+    return count
+
+
+def dedup_step_args(plan) -> Optional[dict]:
+    """tasks.json args of the task's dedup step (filter_new_rows), None if the task has none."""
+    for step in plan.steps:
+        if step.method == "filter_new_rows":
+            return step.args
+    return None
+
+
+def drop_repeated_rows(frames: List[Tuple[str, pd.DataFrame]], key_columns: List[str] = None,
+                       amount_columns: List[str] = None) -> Tuple[List[Tuple[str, pd.DataFrame]], List[int]]:
+    """
+    Drops the rows of each file that are already in an earlier file of the batch.
+
+    The files are filtered against the dedup index in parallel and their rows
+    are only committed with the merged load, so the index cannot catch two
+    overlapping statements of the same batch.
+
+    Args:
+        frames: (file path, transformed rows) in load order
+        key_columns: Columns that identify a transaction
+        amount_columns: Key columns compared as amounts
+
+    Returns:
+        tuple: (frames without the repeated rows, rows dropped from each file)
+    """
+    seen = np.empty(0, dtype=np.int64)
+    deduped, dropped = [], []
+    for file_path, data in frames:
+        if data.empty:
+            deduped.append((file_path, data))
+            dropped.append(0)
+            continue
+        fingerprints = row_fingerprints(data, key_columns, amount_columns)
+        repeated = np.isin(fingerprints, seen)
+        seen = np.concatenate([seen, fingerprints[~repeated]])
+        deduped.append((file_path, data[~repeated]))
+        dropped.append(int(repeated.sum()))
+    return deduped, dropped
+
+
+def _init_worker(settings):
+    global _etl
+    # The files are already spread across processes, page-parallel extraction would oversubscribe the CPUs
+    settings.pdf_extract_workers = 1
+    _etl = ETL(settings)
+
+
+def _process_file(task_name: str, file_path: str, run_kwargs: dict, run_id: str) -> dict:
+    """Extract and transform one file in a worker process, as part of the batch run run_id."""
+    start = time.perf_counter()
+    logger = setup_logger("batch")
+    pipeline = _etl.get_plan(task_name).build(_etl.settings.__dict__, logger, filepath=file_path, **run_kwargs)
+
+    data, log = pipeline.extract.run(pipeline.log)
+    if not data.empty:
+        for step in pipeline.steps[:per_file_steps(pipeline.steps)]:
+            data, log = step.run(data, log, run_id=run_id)
+
+    return {
+        "file": file_path,
+        "data": data,
+        "log": log.to_records(),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run_batch(settings, directory: str, bank: str, workers: int = None, pattern: str = "*.pdf",
+              password: str = None, month: int = None, year: int = None, post_load: bool = False,
+              logger=None) -> Tuple[List[dict], RunLog]:
+    """
+    Processes every file of a directory for one bank.
+
+    Args:
+        settings: Application settings
+        directory: Directory with the statements
+        bank: Bank key (bbva, nequi)
+        workers: Worker processes, defaults to the number of CPUs
+        pattern: Glob pattern of the files
+        password: PDF password
+        month, year: Period of every file, by default it is read from each file name
+        post_load: Run the task's post-load step (it moves or deletes the files)
+        logger: Optional logger
+
+    Returns:
+        tuple: (report rows, log of the load)
+    """
+    logger = logger or setup_logger("batch")
+    task_name = BANK_TASKS[bank.strip().lower()]
+    etl = ETL(settings)
+    plan = etl.get_plan(task_name)
+    if plan is None:
+        raise ValueError(f"Task {task_name} not found in {settings.tasks_file}")
+
+    report = []
+    jobs = []
+    for file_path in sorted(glob.glob(os.path.join(directory, pattern))):
+        period = (month, year) if month and year else period_from_filename(file_path)
+        if period is None:
+            report.append({"file": file_path, "rows": 0, "seconds": 0.0, "status": "skipped: no month/year in the file name"})
+            continue
+        run_kwargs = {"month": period[0], "year": period[1]}
+        if password:
+            run_kwargs["pdf_password"] = password
+        jobs.append((file_path, run_kwargs))
+
+    logger.info(f"Processing {len(jobs)} files of {directory} with task {task_name}")
+    # One run for the whole batch, each file is a part of it whose rows are committed by the merged load
+    run_id = uuid.uuid4().hex
+    frames = []
+    log = RunLog()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker, initargs=(settings,)) as executor:
+        futures = [
+            executor.submit(_process_file, task_name, file_path, run_kwargs, f"{run_id}:{number}")
+            for number, (file_path, run_kwargs) in enumerate(jobs)
+        ]
+        for number, ((file_path, _), future) in enumerate(zip(jobs, futures)):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error processing {file_path}: {e}")
+                insert_row(log, ["error", f"Error processing {file_path}: {e}"])
+                report.append({"file": file_path, "rows": 0, "seconds": 0.0, "status": f"error: {e}"})
+                continue
+
+            file_log = RunLog(result["log"])
+            log.extend(file_log)
+            errors = file_log.messages("error")
+            report.append({
+                "file": file_path,
+                "rows": len(result["data"]),
+                "seconds": result["seconds"],
+                "status": f"error: {errors[0]}" if errors else "ok",
+            })
+            if not errors and not result["data"].empty:
+                frames.append((file_path, result["data"]))
+            elif errors:
+                # Left out of the load, its rows must not count as loaded
+                DedupIndex.from_settings(settings.__dict__).discard(f"{run_id}:{number}")
+
+    # Overlapping statements of the batch are still pending in the dedup index, they are deduped here
+    dedup_args = dedup_step_args(plan)
+    if frames and dedup_args is not None and is_enabled(settings.__dict__.get("dedup", "on")):
+        frames, dropped = drop_repeated_rows(frames, dedup_args.get("key_columns"), dedup_args.get("amount_columns"))
+        for (file_path, _), count in zip(frames, dropped):
+            if count:
+                message = f"Skipped {count} rows of {os.path.basename(file_path)} already in an earlier file of the batch"
+                logger.info(message)
+                insert_row(log, ["info", message])
+
+    # Merged load: the rest of the task runs once over the files without errors, in the task's transaction
+    start = time.perf_counter()
+    built = plan.build(settings.__dict__, logger)
+    pipeline = Pipeline(
+        source=pd.concat([frame for _, frame in frames], ignore_index=True) if frames else pd.DataFrame(),
+        steps=built.steps[per_file_steps(built.steps):],
+        load=built.load,
+        post_load=built.post_load if post_load else None,
+        logger=logger,
+        transaction=built.transaction,
+        run_id=run_id,
+        metrics=built.metrics,
+    )
+    # Errors of the skipped files must not roll back the load, post-load only sees the loaded files
+    for file_path, _ in frames:
+        insert_row(pipeline.log, ["file_processed", file_path])
+    load_log = pipeline.run()
+
+    log.extend(RunLog(record for record in load_log if record.identifier != "file_processed"))
+    report.append({
+        "file": "(load)",
+        "rows": sum(len(frame) for _, frame in frames),
+        "seconds": time.perf_counter() - start,
+        "status": f"error: {load_log.messages('error')[0]}" if load_log.has_errors else "ok",
+    })
+    return report, log
+
+
+def print_report(report: List[dict]):
+    width = max([len(os.path.basename(row["file"])) for row in report] + [4])
+    print(f"{'file':<{width}}  {'rows':>8}  {'seconds':>8}  status")
+    for row in report:
+        print(f"{os.path.basename(row['file']):<{width}}  {row['rows']:>8}  {row['seconds']:>8.2f}  {row['status']}")
+
+
+def main(argv=None) -> int:
+    from settings import Settings
+
+    parser = argparse.ArgumentParser(description="Process a directory of bank statements in parallel.")
+    parser.add_argument("directory")
+    parser.add_argument("bank", choices=sorted(BANK_TASKS))
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPUs)")
+    parser.add_argument("--pattern", default="*.pdf")
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--month", type=int, default=None)
+    parser.add_argument("--year", type=int, default=None)
+    parser.add_argument("--post-load", action="store_true", help="Run the task's post-load step (moves or deletes the files)")
+    options = parser.parse_args(argv)
+
+    load_dotenv()
+    report, log = run_batch(
+        Settings(), options.directory, options.bank, workers=options.workers, pattern=options.pattern,
+        password=options.password, month=options.month, year=options.year, post_load=options.post_load
+    )
+    print_report(report)
+    for message in log.messages("error"):
+        print(f"error: {message}")
+    return 1 if log.has_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Vectorized parsing of the amount columns extracted from bank statements."""
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from files_process.etls.run_log import RunLog
+from files_process.etls.utils import insert_row
+
+
+class AmountSpec:
+    """Number format of the amounts of a statement.
+
+    Attributes:
+    - thousands: Thousands separator, removed before parsing.
+    - decimal: Decimal separator, converted to '.'.
+    - currency: Currency symbols removed before parsing.
+    - parentheses_negative: '(1,234.00)' is read as -1234.00.
+    - trailing_minus: '1,234.00-' is read as -1234.00.
+    """
+
+    def __init__(self, thousands: str = ",", decimal: str = ".", currency: Tuple[str, ...] = ("$",),
+                 parentheses_negative: bool = True, trailing_minus: bool = True):
+        if thousands == decimal:
+            raise ValueError("The thousands and decimal separators must be different.")
+        self.thousands = thousands
+        self.decimal = decimal
+        self.currency = tuple(currency)
+        self.parentheses_negative = parentheses_negative
+        self.trailing_minus = trailing_minus
+
+    @classmethod
+    def from_kwargs(cls, kwargs: dict, default: str) -> "AmountSpec":
+        """Spec of a step: 'amount_format' from tasks.json/settings, by name or as a dict of attributes."""
+        amount_format = kwargs.get("amount_format", default)
+        if isinstance(amount_format, dict):
+            return cls(**amount_format)
+        if amount_format not in AMOUNT_SPECS:
+            raise ValueError(f"Unknown amount format '{amount_format}'")
+        return AMOUNT_SPECS[amount_format]
+
+
+AMOUNT_SPECS = {
+    # 1,234,567.89 as printed by BBVA and Nequi statements
+    "bbva": AmountSpec(thousands=",", decimal="."),
+    "nequi": AmountSpec(thousands=",", decimal="."),
+    # 1.234.567,89
+    "es_CO": AmountSpec(thousands=".", decimal=","),
+    "es_ES": AmountSpec(thousands=".", decimal=",", currency=("€", "EUR")),
+}
+
+
+# Labels of the amount columns, repeated as a row at the top of every page of a statement
+HEADER_LABELS = frozenset({
+    "cargos", "abonos", "saldo", "valor", "importe", "monto",
+    "saldo operación", "saldo operacion", "saldo liquidación", "saldo liquidacion",
+})
+
+
+def header_rows(dataframe: pd.DataFrame, columns: Iterable[str], labels=HEADER_LABELS) -> pd.Series:
+    """Boolean mask of the rows where an amount column holds a column label instead of an amount."""
+    labels = {label.casefold() for label in labels}
+    rows = pd.Series(False, index=dataframe.index)
+    for column in columns:
+        if pd.api.types.is_numeric_dtype(dataframe[column]):
+            continue
+        text = dataframe[column].astype(str).str.replace("\xa0", " ", regex=False).str.strip().str.casefold()
+        rows |= text.isin(labels).to_numpy()
+    return rows
+
+
+def _normalize(text: pd.Series, spec: AmountSpec) -> Tuple[pd.Series, pd.Series]:
+    """Remove separators and symbols and resolve the negative notations. Returns (text, negative mask)."""
+    for symbol in (spec.thousands,) + spec.currency:
+        text = text.str.replace(symbol, "", regex=False)
+    if spec.decimal != ".":
+        text = text.str.replace(spec.decimal, ".", regex=False)
+
+    negative = pd.Series(False, index=text.index)
+    if spec.parentheses_negative:
+        wrapped = (text.str.startswith("(") & text.str.endswith(")")).fillna(False).astype(bool)
+        text = text.mask(wrapped, text.str.slice(1, -1))
+        negative |= wrapped
+    if spec.trailing_minus:
+        trailing = text.str.endswith("-").fillna(False).astype(bool)
+        text = text.mask(trailing, text.str.slice(0, -1))
+        negative |= trailing
+    return text, negative
+
+
+def parse_amounts(series: pd.Series, spec: AmountSpec, fill_value=0, as_cents: bool = False) -> Tuple[pd.Series, pd.Series]:
+    """Parse a column of amounts.
+
+    Most cells only need the separators removed, so the whole column is
+    parsed that way first and the full normalization (spaces, parentheses,
+    trailing minus) only runs on the cells that failed.
+
+    Args:
+        series: Amounts as text (numeric columns are returned as they are).
+        spec: Number format of the amounts.
+        fill_value: Value of the empty cells, None to keep them empty.
+        as_cents: Return fixed-point Int64 cents instead of float64.
+
+    Returns:
+        tuple: (parsed amounts, boolean mask of the non-empty cells that could not be parsed)
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.astype("float64")
+        invalid = pd.Series(False, index=series.index)
+    else:
+        text = series.astype(object)
+        empty = text.isna().to_numpy()
+        text = text.mask(empty, "")
+        for symbol in (spec.thousands,) + spec.currency:
+            text = text.str.replace(symbol, "", regex=False)
+        if spec.decimal != ".":
+            text = text.str.replace(spec.decimal, ".", regex=False)
+        values = pd.to_numeric(text, errors="coerce").astype("float64")
+
+        failed = values.isna().to_numpy() & ~empty
+        if failed.any():
+            retry = series[failed].astype(str).str.replace("\xa0", " ", regex=False).str.strip().str.replace(" ", "", regex=False)
+            empty[failed] = (retry == "").to_numpy()
+            retry, negative = _normalize(retry, spec)
+            retried = pd.to_numeric(retry, errors="coerce").astype("float64")
+            values[failed] = retried.mask(negative, -retried).to_numpy()
+
+        invalid = pd.Series(values.isna().to_numpy() & ~empty, index=series.index)
+        if fill_value is not None:
+            values[empty] = fill_value
+
+    if as_cents:
+        values = pd.Series(np.round(values.to_numpy() * 100), index=values.index).astype("Int64")
+    return values, invalid
+
+
+def parse_amount_columns(dataframe: pd.DataFrame, columns: Iterable[str], spec: AmountSpec, log: RunLog, logger,
+                         fill_value=0, as_cents: bool = False, max_examples: int = 5,
+                         header_labels=HEADER_LABELS) -> Tuple[pd.DataFrame, pd.Series, RunLog]:
+    """Parse the amount columns of a dataframe in place.
+
+    The page headers repeated in the extracted tables (rows whose amount cells
+    are in header_labels) are dropped first, so they are not reported. The
+    cells that still could not be parsed are left empty and reported with one
+    warning per column.
+
+    Returns:
+        tuple: (dataframe, boolean mask of the rows with unparseable amounts, log)
+    """
+    columns = list(columns)
+    if header_labels:
+        headers = header_rows(dataframe, columns, header_labels)
+        if headers.any():
+            logger.debug(f"Dropping {int(headers.sum())} repeated header rows")
+            dataframe = dataframe.loc[~headers].copy()
+
+    invalid_rows = pd.Series(False, index=dataframe.index)
+    for column in columns:
+        original = dataframe[column]
+        dataframe[column], invalid = parse_amounts(original, spec, fill_value=fill_value, as_cents=as_cents)
+        if invalid.any():
+            examples = ", ".join(repr(value) for value in original[invalid].head(max_examples))
+            message = f"{int(invalid.sum())} unparseable amounts in column '{column}': {examples}"
+            logger.warning(message)
+            log = insert_row(log, ["warning", message])
+            invalid_rows |= invalid
+    return dataframe, invalid_rows, log
@@ -0,0 +1,112 @@
+"""Checkpoints of the DataFrame after each Transform, to resume a failed run without extracting again.
+
+A run over the same file with the same task definition and arguments starts
+from the last checkpointed Transform, so retrying a failed database step only
+runs the Loads and Steps again. Checkpoints live in a TableCache of their own.
+"""
+import hashlib
+import json
+import os
+from typing import List, Optional, Tuple
+
+from pandas import DataFrame
+
+from files_process.extractors import PDFDocument, TableCache, file_sha256
+
+# Run arguments that do not change the data, or are not JSON
+_IGNORED_ARGS = {"filepath", "document", "pdf_password", "logger", "transaction", "run_id",
+                 "chunked", "cache", "checkpoint", "profile"}
+
+
+def _json_args(kwargs: dict) -> dict:
+    return {
+        key: value for key, value in kwargs.items()
+        if key not in _IGNORED_ARGS and isinstance(value, (str, int, float, bool, list, dict, type(None)))
+    }
+
+
+def _provider_config(provider) -> dict:
+    """What defines the output of a provider: its function, its tasks.json args and the code of its script."""
+    return {
+        "script": provider.script,
+        "method": provider.method,
+        "args": provider.args,
+        "source": file_sha256(provider.script),
+    }
+
+
+def _chain(previous: str, payload: dict) -> str:
+    return hashlib.sha256((previous + json.dumps(payload, sort_keys=True, default=str)).encode("utf-8")).hexdigest()
+
+
+class PipelineCheckpoints:
+    """Checkpoint keys of the leading Transforms of one run.
+
+    keys[i] is the key of the data after steps[i]. The chain stops at the
+    first Load or Step, and at the first Transform with "checkpoint": false in
+    tasks.json (steps whose result depends on more than their input, like the
+    dedup filter).
+    """
+
+    def __init__(self, cache: TableCache, keys: List[str], input_path: str = None, logger=None):
+        self.cache = cache
+        self.keys = keys
+        self.input_path = input_path
+        self.logger = logger
+
+    @classmethod
+    def for_run(cls, settings: dict, plan, run_kwargs: dict, logger=None) -> Optional["PipelineCheckpoints"]:
+        """
+        Checkpoints of a run of a TaskPlan, None if they are disabled or the input is not a single file.
+
+        Args:
+            settings: Settings (pipeline_checkpoints, checkpoint_dir, checkpoint_max_mb)
+            plan: TaskPlan of the run
+            run_kwargs: Runtime arguments of the run; 'checkpoint: off' disables them
+        """
+        enabled = run_kwargs.get("checkpoint", settings.get("pipeline_checkpoints", True))
+        if str(enabled).strip().lower() in ("off", "no", "false", "0"):
+            return None
+
+        document = run_kwargs.get("document")
+        if isinstance(document, PDFDocument) and document.is_accessible:
+            input_path, input_hash = document.file_path, document.sha256
+        elif run_kwargs.get("filepath") and os.path.isfile(run_kwargs["filepath"]):
+            input_path, input_hash = run_kwargs["filepath"], file_sha256(run_kwargs["filepath"])
+        else:
+            return None
+
+        key = _chain("", {"input": input_hash, "args": _json_args(run_kwargs), "extract": _provider_config(plan.extract)})
+        keys = []
+        for step in plan.steps:
+            if step.step_type != "Transform" or not step.checkpoint:
+                break
+            key = _chain(key, _provider_config(step))
+            keys.append(key)
+        if not keys:
+            return None
+
+        cache = TableCache(
+            settings.get("checkpoint_dir", "cache/checkpoints"),
+            int(settings.get("checkpoint_max_mb", 256)) * 1024 * 1024,
+            logger,
+        )
+        return cls(cache, keys, input_path, logger)
+
+    def resume(self) -> Optional[Tuple[int, DataFrame]]:
+        """
+        Finds the last checkpointed step of a previous run.
+
+        Returns:
+            tuple: (index of the step, data after it), None if there is no checkpoint
+        """
+        for index in range(len(self.keys) - 1, -1, -1):
+            tables = self.cache.get(self.keys[index])
+            if tables:
+                return index, tables[0]
+        return None
+
+    def save(self, index: int, dataframe: DataFrame):
+        """Stores the data after steps[index], if that step is checkpointed."""
+        if index < len(self.keys):
+            self.cache.put(self.keys[index], [dataframe])
@@ -0,0 +1,66 @@
+"""Normalization of the blank cells of the extracted tables."""
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+
+
+# Set in DataFrame.attrs once the blanks of a frame are normalized
+BLANK_NORMALIZED = "blank_normalized"
+
+
+def _normalize_cell(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return value if value else pd.NA
+    return value
+
+
+def normalize_blanks(dataframe: pd.DataFrame, drop_empty: bool = False, force: bool = False) -> pd.DataFrame:
+    """Strip every text cell and set the blank ones to NA in a single pass.
+
+    Replaces the per-transform replace(r'^\\s*$', pd.NA, regex=True). The
+    cells of all the text columns are factorized together, so each distinct
+    value is stripped once however many times it repeats (blanks, concepts,
+    dates). The frame is marked with attrs['blank_normalized'] and later
+    calls return it as is.
+
+    Args:
+        dataframe: Extracted table.
+        drop_empty: Also drop the rows and columns where every cell is NA or ''.
+            Whitespace-only cells do not count, so the tables keep the number
+            of columns camelot found.
+        force: Normalize even if the frame is already marked.
+
+    Returns:
+        pd.DataFrame: Normalized frame (the input frame is not modified).
+    """
+    if dataframe.attrs.get(BLANK_NORMALIZED) and not force:
+        return dataframe
+
+    dataframe = dataframe.copy(deep=False)
+    blank = dataframe.isna().to_numpy() if drop_empty else None
+    positions = [
+        position for position, dtype in enumerate(dataframe.dtypes)
+        if is_object_dtype(dtype) or is_string_dtype(dtype)
+    ]
+
+    if positions and len(dataframe):
+        block = dataframe.iloc[:, positions].to_numpy(dtype=object)
+        codes, uniques = pd.factorize(block.ravel())
+        # The extra last slot is taken by code -1, the cells that were already NA
+        normalized = np.empty(len(uniques) + 1, dtype=object)
+        normalized[:-1] = [_normalize_cell(value) for value in uniques]
+        normalized[-1] = pd.NA
+        values = normalized[codes].reshape(block.shape)
+        for index, position in enumerate(positions):
+            dataframe.isetitem(position, values[:, index])
+
+        if blank is not None:
+            empty = np.append(np.array([value == "" for value in uniques], dtype=bool), True)
+            blank[:, positions] = empty[codes].reshape(block.shape)
+
+    if drop_empty:
+        dataframe = dataframe.iloc[~blank.all(axis=1), ~blank.all(axis=0)]
+
+    dataframe.attrs[BLANK_NORMALIZED] = True
+    return dataframe
@@ -0,0 +1,144 @@
+import os
+import threading
+from typing import Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+
+
+# Backends whose driver supports LOAD DATA LOCAL INFILE
+MYSQL_BACKENDS = ("mysql", "mariadb")
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def resolve_connection_string(kwargs: dict) -> Tuple[Optional[str], Optional[str]]:
+    """Resolve the connection string of a step from 'connection_string_env_var' or 'connection_string'.
+
+    Returns:
+        tuple: (connection string, None) or (None, error message)
+    """
+    connection_string_env_var = kwargs.get("connection_string_env_var")
+
+    if connection_string_env_var:
+        connection_string = os.environ.get(connection_string_env_var)
+        if not connection_string:
+            return None, f"Environment variable '{connection_string_env_var}' not set."
+        return connection_string, None
+    elif "connection_string" in kwargs:
+        return kwargs["connection_string"], None
+
+    return None, "Either 'connection_string_env_var' or 'connection_string' argument is required."
+
+
+def get_engine(connection_string: str, kwargs: dict = None) -> Engine:
+    """Return the process-wide engine for a connection string, creating it on first use.
+
+    The pool is configured from the settings merged into the step kwargs:
+    db_pool_size, db_max_overflow, db_pool_pre_ping and db_pool_recycle.
+    Extra driver arguments can be passed with 'connect_args'. 'local_infile'
+    enables LOAD DATA LOCAL INFILE on MySQL/MariaDB connections and is
+    ignored by other backends, whose drivers reject it.
+    """
+    kwargs = kwargs or {}
+    backend = make_url(connection_string).get_backend_name()
+    options = {
+        "pool_pre_ping": kwargs.get("db_pool_pre_ping", True),
+        "pool_recycle": kwargs.get("db_pool_recycle", 3600),
+    }
+    if backend != "sqlite":
+        options["pool_size"] = kwargs.get("db_pool_size", 5)
+        options["max_overflow"] = kwargs.get("db_max_overflow", 10)
+    connect_args = dict(kwargs.get("connect_args") or {})
+    connect_args.pop("local_infile", None)
+    if kwargs.get("local_infile") and backend in MYSQL_BACKENDS:
+        connect_args["local_infile"] = 1
+    if connect_args:
+        options["connect_args"] = connect_args
+
+    key = (connection_string, repr(sorted(options.items())))
+    engine = _engines.get(key)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(key)
+            if engine is None:
+                engine = create_engine(connection_string, **options)
+                _engines[key] = engine
+    return engine
+
+
+def dispose_engines():
+    """Close the pooled connections of every registered engine."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+def _forget_engines_after_fork():
+    # Connections inherited from the parent process must not be used by the child
+    global _engines_lock
+    _engines_lock = threading.Lock()
+    for engine in _engines.values():
+        engine.dispose(close=False)
+    _engines.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_engines_after_fork)
+
+
+class SharedTransaction:
+    """Connection and transaction shared by the steps of one pipeline run.
+
+    The connection is checked out of the pooled engine on first use. Steps
+    that target the same connection string run on it without committing;
+    the Pipeline commits once at the end, or rolls back if any step failed.
+    """
+
+    def __init__(self, connection_string: str, kwargs: dict = None):
+        self.connection_string = connection_string
+        self.kwargs = kwargs or {}
+        self._connection = None
+        self._transaction = None
+        self._after_commit = []
+        self._after_rollback = []
+
+    def after_commit(self, callback):
+        """Run a callback once the transaction commits, for work outside the database (local indexes, files)."""
+        self._after_commit.append(callback)
+
+    def after_rollback(self, callback):
+        """Run a callback if the transaction rolls back."""
+        self._after_rollback.append(callback)
+
+    def _run_callbacks(self, callbacks: list):
+        self._after_commit, self._after_rollback = [], []
+        for callback in callbacks:
+            callback()
+
+    def connection_for(self, connection_string: str):
+        """Return the shared connection if it targets the same database, otherwise None."""
+        if connection_string != self.connection_string:
+            return None
+        if self._connection is None:
+            self._connection = get_engine(self.connection_string, self.kwargs).connect()
+            self._transaction = self._connection.begin()
+        return self._connection
+
+    def commit(self):
+        if self._transaction is not None and self._transaction.is_active:
+            self._transaction.commit()
+        self._run_callbacks(self._after_commit)
+
+    def rollback(self):
+        if self._transaction is not None and self._transaction.is_active:
+            self._transaction.rollback()
+        self._run_callbacks(self._after_rollback)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
+        self._transaction = None
@@ -0,0 +1,157 @@
+"""Local index of the transactions already loaded, to ship only new rows to the database."""
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_KEY_COLUMNS = ["bank", "operation_date", "concept", "charges", "credits", "balance"]
+DEFAULT_AMOUNT_COLUMNS = ["charges", "credits", "balance"]
+
+STATUS_PENDING = "pending"
+STATUS_COMMITTED = "committed"
+
+
+def row_fingerprints(dataframe: pd.DataFrame, key_columns: List[str] = None, amount_columns: List[str] = None) -> np.ndarray:
+    """
+    Stable 64-bit fingerprint of each row.
+
+    Text is stripped and amounts are rounded to cents before hashing, so the
+    same transaction extracted again gives the same fingerprint. Identical
+    rows of one statement get the number of the occurrence mixed in, so they
+    are kept apart and reprocessing the statement gives the same set.
+
+    Args:
+        dataframe: Transformed transactions
+        key_columns: Columns that identify a transaction
+        amount_columns: Key columns compared as amounts
+
+    Returns:
+        np.ndarray: int64 fingerprints in row order
+    """
+    key_columns = key_columns or DEFAULT_KEY_COLUMNS
+    amount_columns = set(DEFAULT_AMOUNT_COLUMNS if amount_columns is None else amount_columns)
+
+    keys = pd.DataFrame(index=range(len(dataframe)))
+    for column in key_columns:
+        values = dataframe[column].reset_index(drop=True)
+        if column in amount_columns:
+            keys[column] = pd.to_numeric(values, errors="coerce").astype("float64").round(2)
+        else:
+            keys[column] = values.astype("string").str.strip().fillna("").astype(object)
+
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    occurrence = pd.Series(hashes).groupby(hashes, sort=False).cumcount().to_numpy()
+    repeated = occurrence > 0
+    if repeated.any():
+        # First occurrences keep the plain hash, so a row does not change fingerprint when a duplicate appears
+        hashes[repeated] = pd.util.hash_pandas_object(
+            pd.DataFrame({"hash": hashes[repeated], "occurrence": occurrence[repeated]}), index=False
+        ).to_numpy()
+    return hashes.view(np.int64)
+
+
+class DedupIndex:
+    """Fingerprints of the rows loaded by previous runs, stored in SQLite.
+
+    Rows are recorded as pending under the run id when they are filtered and
+    only count as loaded once the run commits them, so a run that fails or
+    rolls back does not hide its rows from the next one. Parts of a run (the
+    files of a batch) use '<run_id>:<part>' and are committed with the run.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initializes the index and creates its table if needed.
+
+        Args:
+            db_path: Path of the SQLite database
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    fingerprint INTEGER PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    run_id TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS fingerprints_run ON fingerprints (run_id)")
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> "DedupIndex":
+        return cls(settings.get("dedup_index_path", "data/dedup.db"))
+
+    @contextmanager
+    def _connect(self):
+        """Autocommit connection, closed on exit."""
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def known(self, fingerprints: np.ndarray) -> np.ndarray:
+        """
+        Checks which fingerprints were committed by a previous run.
+
+        Returns:
+            np.ndarray: Boolean mask aligned with fingerprints
+        """
+        if len(fingerprints) == 0:
+            return np.zeros(0, dtype=bool)
+
+        with self._connect() as connection:
+            connection.execute("CREATE TEMP TABLE candidates (fingerprint INTEGER PRIMARY KEY)")
+            connection.executemany("INSERT OR IGNORE INTO candidates VALUES (?)", ((int(value),) for value in fingerprints))
+            found = connection.execute(
+                "SELECT fingerprint FROM candidates JOIN fingerprints USING (fingerprint) WHERE status = ?",
+                (STATUS_COMMITTED,)
+            ).fetchall()
+        return np.isin(fingerprints, np.array([row[0] for row in found], dtype=np.int64))
+
+    def add_pending(self, run_id: str, fingerprints: np.ndarray):
+        """Records the fingerprints sent to the database by a run, without overriding committed ones."""
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN")
+            connection.executemany(
+                "INSERT INTO fingerprints (fingerprint, status, run_id, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (fingerprint) DO UPDATE SET run_id = excluded.run_id, updated_at = excluded.updated_at "
+                "WHERE fingerprints.status = ?",
+                ((int(value), STATUS_PENDING, run_id, now, STATUS_PENDING) for value in fingerprints)
+            )
+            connection.execute("COMMIT")
+
+    def commit(self, run_id: str) -> int:
+        """
+        Marks the pending fingerprints of a run and its parts as loaded.
+
+        Returns:
+            int: Number of committed fingerprints
+        """
+        with self._connect() as connection:
+            return connection.execute(
+                "UPDATE fingerprints SET status = ?, updated_at = ? WHERE (run_id = ? OR run_id LIKE ?) AND status = ?",
+                (STATUS_COMMITTED, time.time(), run_id, f"{run_id}:%", STATUS_PENDING)
+            ).rowcount
+
+    def discard(self, run_id: str) -> int:
+        """
+        Forgets the pending fingerprints of a run, or of a part of it, that did not load its rows.
+
+        Returns:
+            int: Number of discarded fingerprints
+        """
+        with self._connect() as connection:
+            return connection.execute(
+                "DELETE FROM fingerprints WHERE (run_id = ? OR run_id LIKE ?) AND status = ?",
+                (run_id, f"{run_id}:%", STATUS_PENDING)
+            ).rowcount
@@ -1,11 +1,16 @@
-import os
 import json
+import os
+import threading
 import time
-from importlib.machinery import SourceFileLoader
-
-import pandas as pd
-
-from files_process.etls.pipeline import Step, Pipeline, Transform, Load
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from graphlib import CycleError, TopologicalSorter
+from typing import List, Optional
+
+from files_process.etls.pipeline import TaskPlan
+from files_process.etls.profiling import RunProfiler, profiling_requested
+from files_process.etls.run_log import RunLog
+from files_process.etls.utils import insert_row
+from files_process.extractors import TableStore, file_sha256
 from settings import Settings
 import logger
 
@@ -20,8 +25,15 @@ class ETL:
         """
         self.settings = settings
         self.start_time = time.time()
-        self.tasks_data = self._load_tasks()
         self.logger = logger.setup_logger("etl")
+        # (versión de tasks.json, tareas, planes compilados), se reemplaza completo al recargar
+        self._tasks_state = (None, [], {})
+        self._tasks_lock = threading.Lock()
+        self._reload_tasks()
+
+    @property
+    def tasks_data(self) -> list:
+        return self._reload_tasks()[1]
 
     def _load_tasks(self) -> dict:
         """
@@ -33,143 +45,196 @@ class ETL:
         with open(self.settings.tasks_file) as tasks_file:
             return json.load(tasks_file)
 
-    def _create_extract_provider(self, task: dict, *args, **kwargs) -> Step:
+    def _reload_tasks(self) -> tuple:
         """
-        Crea el proveedor de extracción para una tarea
+        Recarga las tareas si tasks.json cambió desde la última lectura
 
-        Args:
-            task: Datos de la tarea
+        Si el archivo nuevo no se puede leer se mantienen las tareas anteriores.
 
         Returns:
-            Step: Proveedor de extracción configurado
+            tuple: (versión del archivo, tareas, planes compilados)
         """
-        extract_provider_module = SourceFileLoader(
-            "extract_provider",
-            task["extract_provider"]["script"]
-        ).load_module()
-
-        kwargs.update(task["extract_provider"]["args"])
-        kwargs.update(self.settings.__dict__)
-        kwargs.update({"logger": self.logger})
-
-        return Step(
-            getattr(extract_provider_module, task["extract_provider"]["method"]),
-            *args,
-            **kwargs
-        )
-
-    def _create_step_provider(self, step: dict, *args, **kwargs) -> Step:
+        state = self._tasks_state
+        try:
+            stat = os.stat(self.settings.tasks_file)
+        except OSError as e:
+            if state[0] is None:
+                raise
+            self.logger.error(f"No se pudo leer {self.settings.tasks_file}: {str(e)}")
+            return state
+
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version == state[0]:
+            return state
+
+        with self._tasks_lock:
+            if version == self._tasks_state[0]:
+                return self._tasks_state
+            try:
+                tasks_data = self._load_tasks()
+            except (OSError, ValueError) as e:
+                if self._tasks_state[0] is None:
+                    raise
+                self.logger.error(f"No se pudo recargar {self.settings.tasks_file}: {str(e)}")
+                return self._tasks_state
+
+            self._tasks_state = (version, tasks_data, {})
+            self.logger.info(f"Tareas cargadas desde {self.settings.tasks_file}")
+            return self._tasks_state
+
+    def _get_plan(self, task: dict, plans: dict) -> TaskPlan:
         """
-        Crea un proveedor de paso según su tipo
+        Obtiene el plan compilado de una tarea, compilándolo la primera vez
 
         Args:
-            step: Datos del paso
+            task: Datos de la tarea
+            plans: Planes compilados de la versión actual de tasks.json
 
         Returns:
-            Step/Transform/Load: Proveedor de paso configurado
+            TaskPlan: Plan con los proveedores ya resueltos
         """
-        step_provider_module = SourceFileLoader(step["name"], step["script"]).load_module()
-        step_provider = getattr(step_provider_module, step["method"])
+        plan = plans.get(task["key"])
+        if plan is None:
+            plan = TaskPlan(task)
+            plans[task["key"]] = plan
+        return plan
 
-        kwargs.update(step["args"])
-        kwargs.update(self.settings.__dict__)
-        kwargs.update({"logger": self.logger})
-
-        if step["type"] == "Transform":
-            return Transform(step_provider, *args, **kwargs)
-        elif step["type"] == "Step":
-            return Step(step_provider, *args, **kwargs)
-        elif step["type"] == "Load":
-            return Load(step_provider, *args, **kwargs)
-
-    def _create_load_provider(self, task: dict, *args, **kwargs) -> Load:
+    def _process_task(self, task: dict, plans: dict, *args, post_load: bool = True, **kwargs) -> RunLog:
         """
-        Crea el proveedor de carga para una tarea
+        Procesa una tarea individual, con cProfile si la ejecución, la tarea o la configuración lo piden
 
         Args:
-            task: Datos de la tarea
-
-        Returns:
-            Load: Proveedor de carga configurado
+            task: Datos de la tarea a procesar
+            plans: Planes compilados de la versión actual de tasks.json
+            post_load: Ejecutar el post-load de la tarea (False cuando lo ejecuta run_tasks al final)
         """
-        if "load_provider" in task and 'script' in task["load_provider"]:
-            load_provider_module = SourceFileLoader(
-                "load_provider",
-                task["load_provider"]["script"]
-            ).load_module()
-
-            load_provider_module = SourceFileLoader(
-                "load_provider",
-                task["load_provider"]["script"]
-            ).load_module()
+        settings = self.settings.__dict__
+        profile = profiling_requested(settings, task, kwargs)
+        kwargs.pop("profile", None)
+        if not profile:
+            return self._run_task(task, plans, *args, post_load=post_load, **kwargs)
+
+        filepath = kwargs.get("filepath")
+        file_hash = file_sha256(filepath) if filepath and os.path.isfile(filepath) else None
+        profiler = RunProfiler.from_settings(settings, self.logger)
+        return profiler.run(task["key"], file_hash, self._run_task, task, plans, *args, post_load=post_load, **kwargs)
+
+    def _run_task(self, task: dict, plans: dict, *args, post_load: bool = True, **kwargs) -> RunLog:
+        """
+        Construye y ejecuta el pipeline de una tarea
 
-            kwargs.update(task["load_provider"]["args"])
-            kwargs.update(self.settings.__dict__)
-            kwargs.update({"logger": self.logger})
+        Args:
+            task: Datos de la tarea a procesar
+            plans: Planes compilados de la versión actual de tasks.json
+            post_load: Ejecutar el post-load de la tarea
+        """
+        self.logger.info(f"Executing {task['name']} task")
 
-            return Load(
-                getattr(load_provider_module, task["load_provider"]["method"]),
-                *args,
-                **kwargs
-            )
+        # Crear y ejecutar pipeline
+        pipeline = self._get_plan(task, plans).build(self.settings.__dict__, self.logger, *args, **kwargs)
+        if not post_load:
+            pipeline.post_load = None
+        return pipeline.run(*args, **kwargs)
 
-    def _create_post_load_provider(self, task: dict, *args, **kwargs) -> Step:
+    def get_plan(self, task_name: str) -> Optional[TaskPlan]:
         """
-        Crea el proveedor de post-carga para una tarea
+        Obtiene el plan compilado de una tarea por su key
 
         Args:
-            task: Datos de la tarea
+            task_name: Key de la tarea en tasks.json
 
         Returns:
-            Step: Proveedor de post-carga configurado
+            TaskPlan: Plan de la tarea, None si no existe
         """
-        if "post_load_provider" in task:
-            post_load_provider_module = SourceFileLoader(
-                "post_load_provider",
-                task["post_load_provider"]["script"]
-            ).load_module()
-
-            kwargs.update(task["post_load_provider"]["args"])
-            kwargs.update(self.settings.__dict__)
-            kwargs.update({"logger": self.logger})
+        _, tasks_data, plans = self._reload_tasks()
+        task = next((t for t in tasks_data if t["key"] == task_name), None)
+        return self._get_plan(task, plans) if task else None
 
-            return Step(
-                getattr(post_load_provider_module, task["post_load_provider"]["method"]),
-                *args,
-                **kwargs
-            )
-        return None
+    def run(self, task_name: str, **kwargs) -> RunLog:
+        if task_name:
+            _, tasks_data, plans = self._reload_tasks()
+            task = next((t for t in tasks_data if t["key"] == task_name), None)
+            if task:
+                return self._process_task(task, plans, **kwargs)
+            else:
+                self.logger.error(f"No se encontró la tarea con nombre: {task_name}")
+        return RunLog()
 
-    def _process_task(self, task: dict, *args, **kwargs) -> pd.DataFrame:
+    def run_tasks(self, task_names: List[str], *args, **kwargs) -> RunLog:
         """
-        Procesa una tarea individual
+        Ejecuta varias tareas sobre el mismo archivo como un DAG
 
-        Args:
-            task: Datos de la tarea a procesar
-        """
-        self.logger.info(f"Executing {task['name']} task")
+        Las tareas declaran en tasks.json las keys de las que dependen con
+        "depends_on"; una tarea empieza cuando sus dependencias terminaron sin
+        errores y las ramas independientes se ejecutan en paralelo en hilos
+        (dag_workers). Todas comparten una sola extracción de tablas por archivo.
+        El post-load de las tareas se ejecuta una sola vez al final, para que
+        ninguna borre o mueva el archivo mientras otra lo lee.
 
-        # Crear proveedores
-        extract_provider = self._create_extract_provider(task, *args, **kwargs)
-        steps = [self._create_step_provider(step, *args, **kwargs) for step in task["steps"]]
-        load_provider = self._create_load_provider(task, *args, **kwargs)
-        post_load_provider = self._create_post_load_provider(task, *args, **kwargs)
-        # Crear y ejecutar pipeline
-        pipeline = Pipeline(
-            source=None,
-            extract=extract_provider,
-            steps=steps,
-            load=load_provider,
-            post_load=post_load_provider,
-            logger=self.logger,
-        )
-        return pipeline.run(*args, **kwargs)
+        Args:
+            task_names: Keys de las tareas en tasks.json
 
-    def run(self, task_name: str, **kwargs) -> pd.DataFrame:
-        if task_name:
-            task = next((t for t in self.tasks_data if t["key"] == task_name), None)
-            if task:
-                return self._process_task(task, **kwargs)
-            else:
+        Returns:
+            RunLog: Logs de las tareas en el orden de task_names
+        """
+        _, tasks_data, plans = self._reload_tasks()
+        log = RunLog()
+        tasks = {}
+        for task_name in task_names:
+            task = next((t for t in tasks_data if t["key"] == task_name), None)
+            if task is None:
                 self.logger.error(f"No se encontró la tarea con nombre: {task_name}")
-        return pd.DataFrame()
+                insert_row(log, ["error", f"Task {task_name} not found"])
+            else:
+                tasks[task_name] = task
+        if not tasks:
+            return log
+
+        dependencies = {key: list(task.get("depends_on", [])) for key, task in tasks.items()}
+        # Las dependencias fuera de la ejecución no entran al grafo, se reportan al llegar a la tarea
+        sorter = TopologicalSorter({key: [d for d in deps if d in tasks] for key, deps in dependencies.items()})
+        try:
+            sorter.prepare()
+        except CycleError as e:
+            self.logger.error(f"Dependencias circulares entre tareas: {e.args[1]}")
+            insert_row(log, ["error", f"Circular task dependencies: {' -> '.join(e.args[1])}"])
+            return log
+
+        kwargs["table_store"] = TableStore()
+        logs = {}
+        workers = int(getattr(self.settings, "dag_workers", 0) or len(tasks))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etl_dag") as executor:
+            futures = {}
+            while sorter.is_active():
+                for key in sorter.get_ready():
+                    failed = [d for d in dependencies[key] if d not in logs or logs[d].has_errors]
+                    if failed:
+                        logs[key] = insert_row(RunLog(), ["error", f"Task {key} skipped, dependencies failed or missing: {', '.join(failed)}"])
+                        sorter.done(key)
+                        continue
+                    futures[executor.submit(self._process_task, tasks[key], plans, *args, post_load=False, **kwargs)] = key
+
+                if not futures:
+                    continue
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = futures.pop(future)
+                    try:
+                        logs[key] = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error ejecutando la tarea {key}: {str(e)}")
+                        logs[key] = insert_row(RunLog(), ["error", f"Error running task {key}: {e}"])
+                    sorter.done(key)
+
+        for key in tasks:
+            log.extend(logs[key])
+
+        # Un solo post-load por proveedor distinto, con los archivos de todas las tareas
+        post_loads = {}
+        for key in tasks:
+            provider = self._get_plan(tasks[key], plans).post_load
+            if provider is not None:
+                post_loads.setdefault((provider.script, provider.method, json.dumps(provider.args, sort_keys=True)), provider)
+        for provider in post_loads.values():
+            log = provider.bind(self.settings.__dict__, self.logger, *args, **kwargs).run(log)
+        return log
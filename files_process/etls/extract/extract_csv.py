@@ -2,10 +2,11 @@ import os
 import pandas as pd
 import glob
 
+from files_process.etls.run_log import RunLog
 from files_process.etls.utils import insert_row
 
 
-def extract(log: pd.DataFrame, *args, **kwargs) -> tuple:
+def extract(log: RunLog, *args, **kwargs) -> tuple:
     """Extracts data from CSV files and returns a DataFrame."""
 
     settings = kwargs
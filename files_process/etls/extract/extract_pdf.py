@@ -1,22 +1,64 @@
 import os
 import glob
 import pandas as pd
+from files_process.etls.cleaning import normalize_blanks
+from files_process.etls.run_log import RunLog
 from files_process.etls.utils import insert_row
-from files_process.extractors.pdf_extractor import PDFExtractor
+from files_process.extractors import PDFDocument, PDFExtractor, TableCache, file_sha256
 
 
-def extract(log: pd.DataFrame, logger, *args, **kwargs) -> tuple:
-    """Extracts data from PDF files and returns a DataFrame."""
-    settings = kwargs
-    files_to_process = []
-    flavor = kwargs.get("flavor", "network")
+def _extract_file_tables(extractor: PDFExtractor, cache: TableCache, file, flavor: str, settings: dict, refresh: bool = False) -> list:
+    """Extracts the tables of a file that match 'column_mapping', going through the table cache when enabled.
 
-    if "column_mapping" not in settings or not isinstance(settings["column_mapping"], list):
-        logger.error("Missing required parameter 'column_mapping' or it is not a list.")
-        insert_row(log, ["error", "Missing required parameter 'column_mapping' or it is not a list."])
-        return pd.DataFrame(), log
+    With a 'table_store' in the run arguments the raw tables are shared with the other tasks of the upload.
+    """
+    extract_params = {
+        "flavor": flavor,
+        "pages": settings.get("pages", "all"),
+        "table_areas": settings.get("table_areas"),
+    }
+
+    key = None
+    if cache is not None:
+        file_hash = file.sha256 if isinstance(file, PDFDocument) else file_sha256(file)
+        key = cache.make_key(file_hash, column_mapping=settings["column_mapping"], **extract_params)
+        if refresh:
+            cache.invalidate(key)
+        else:
+            tables = cache.get(key)
+            if tables is not None:
+                return tables
+
+    def extract_tables():
+        return extractor.extract_tables(
+            file,
+            settings.get("pdf_password"),
+            workers=settings.get("pdf_extract_workers", 1),
+            min_parallel_pages=settings.get("pdf_parallel_min_pages", 4),
+            **extract_params
+        )
+
+    store = settings.get("table_store")
+    if store is not None:
+        # Tasks of the same upload share one camelot pass, each keeps the tables of its column_mapping
+        store_key = (getattr(file, "file_path", file), flavor, extract_params["pages"], str(extract_params["table_areas"]))
+        tables = store.get_or_extract(store_key, extract_tables)
+    else:
+        tables = extract_tables()
+    filtered = [table for table in tables if table is not None and len(table.columns) == len(settings["column_mapping"])]
 
-    if "filepath" in settings and os.path.isfile(settings["filepath"]):
+    if key is not None:
+        cache.put(key, filtered)
+    return filtered
+
+
+def _files_to_process(settings: dict, log: RunLog, logger) -> list:
+    """Files of the run: the document opened by the caller, 'filepath', or the PDFs in 'process_dir'."""
+    files_to_process = []
+    if settings.get("document") is not None and settings["document"].is_accessible:
+        # Already opened and decrypted by the caller, reuse it instead of reparsing the file
+        files_to_process.append(settings["document"])
+    elif "filepath" in settings and os.path.isfile(settings["filepath"]):
         files_to_process.append(settings["filepath"])
     elif "process_dir" in settings:
         process_dir = settings["process_dir"]
@@ -29,26 +71,108 @@ def extract(log: pd.DataFrame, logger, *args, **kwargs) -> tuple:
             insert_row(log, ["warning", f"No PDF files found in directory {process_dir}."])
 
         files_to_process.extend(all_files)
+    return files_to_process
+
+
+def _table_cache(settings: dict, logger) -> tuple:
+    """'cache: off' skips the table cache for this run, 'cache: refresh' re-extracts and replaces the entry."""
+    cache_mode = str(settings.get("cache", "on")).strip().lower()
+    cache = None if cache_mode in ("off", "no", "false", "0") else TableCache.from_settings(settings, logger)
+    return cache, cache_mode == "refresh"
+
+
+def _to_dataframe(tables: list, column_mapping: list) -> pd.DataFrame:
+    df = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=column_mapping)
+    if not df.empty:
+        df.columns = column_mapping
+        # No-op for freshly extracted tables, normalizes tables cached before the blanks were
+        df = normalize_blanks(df)
+    return df
+
+
+def _valid_column_mapping(settings: dict, log: RunLog, logger) -> bool:
+    if "column_mapping" not in settings or not isinstance(settings["column_mapping"], list):
+        logger.error("Missing required parameter 'column_mapping' or it is not a list.")
+        insert_row(log, ["error", "Missing required parameter 'column_mapping' or it is not a list."])
+        return False
+    return True
 
+
+def extract(log: RunLog, logger, *args, **kwargs) -> tuple:
+    """Extracts data from PDF files and returns a DataFrame."""
+    settings = kwargs
+    flavor = kwargs.get("flavor", "network")
+
+    if not _valid_column_mapping(settings, log, logger):
+        return pd.DataFrame(), log
+
+    files_to_process = _files_to_process(settings, log, logger)
     extractor = PDFExtractor()
     extracted_data = []
+    cache, refresh = _table_cache(settings, logger)
 
     for file in files_to_process:
+        file_path = getattr(file, "file_path", file)
         try:
-            tables = extractor.extract_tables(file, settings.get("pdf_password"), flavor=flavor)
-            filtered = [table for table in tables if table is not None and len(table.columns) == len(settings["column_mapping"])]
-            logger.info(f"Processed file {file}")
-            insert_row(log, ["file_processed", file])
+            filtered = _extract_file_tables(extractor, cache, file, flavor, settings, refresh=refresh)
+            logger.info(f"Processed file {file_path}")
+            insert_row(log, ["file_processed", file_path])
             extracted_data.extend(filtered)
         except Exception as e:
-            logger.warning(f"Error extracting tables from file {file}: {str(e)}")
-            insert_row(log, ["error", f"Error extracting tables from file {file}: {str(e)}"])
+            logger.warning(f"Error extracting tables from file {file_path}: {str(e)}")
+            insert_row(log, ["error", f"Error extracting tables from file {file_path}: {str(e)}"])
 
-    df = pd.concat(extracted_data, ignore_index=True) if extracted_data else pd.DataFrame(columns=settings["column_mapping"])
+    df = _to_dataframe(extracted_data, settings["column_mapping"])
     if df.empty:
         logger.error("No valid tables found in PDF files.")
         insert_row(log, ["error", "No valid tables found in PDF files."])
-    else:
-        df.columns = settings["column_mapping"]
 
     return df, log
+
+
+def extract_chunks(log: RunLog, logger, *args, **kwargs):
+    """Extracts data from PDF files one chunk at a time, for the chunked Pipeline mode.
+
+    Yields one DataFrame per file, or per 'chunk_pages' pages of each file
+    when it is set, so only one chunk of the batch is held in memory. Entries
+    are added to the log as the chunks are read.
+    """
+    settings = kwargs
+    flavor = kwargs.get("flavor", "network")
+    chunk_pages = int(settings.get("chunk_pages", 0) or 0)
+
+    if not _valid_column_mapping(settings, log, logger):
+        return
+
+    extractor = PDFExtractor()
+    cache, refresh = _table_cache(settings, logger)
+    found = False
+
+    for file in _files_to_process(settings, log, logger):
+        file_path = getattr(file, "file_path", file)
+        document = file
+        try:
+            if chunk_pages > 0 and not isinstance(file, PDFDocument):
+                # Decrypted once for all the page chunks of the file
+                document = extractor.open_document(file, settings.get("pdf_password"))
+            page_chunks = extractor.page_chunks(document, settings.get("pages", "all"), chunk_pages)
+
+            for pages in page_chunks:
+                tables = _extract_file_tables(extractor, cache, document, flavor, {**settings, "pages": pages}, refresh=refresh)
+                df = _to_dataframe(tables, settings["column_mapping"])
+                if not df.empty:
+                    found = True
+                    yield df
+
+            logger.info(f"Processed file {file_path}")
+            insert_row(log, ["file_processed", file_path])
+        except Exception as e:
+            logger.warning(f"Error extracting tables from file {file_path}: {str(e)}")
+            insert_row(log, ["error", f"Error extracting tables from file {file_path}: {str(e)}"])
+        finally:
+            if document is not file:
+                document.close()
+
+    if not found:
+        logger.error("No valid tables found in PDF files.")
+        insert_row(log, ["error", "No valid tables found in PDF files."])
@@ -0,0 +1,108 @@
+import csv
+import os
+import tempfile
+from contextlib import nullcontext
+
+from pandas import DataFrame
+from sqlalchemy import inspect
+
+from files_process.etls.db import MYSQL_BACKENDS, get_engine, resolve_connection_string
+from files_process.etls.run_log import RunLog
+from files_process.etls.utils import insert_row
+
+
+def _prepare_table(connection, dataframe: DataFrame, destination: str, operation: str, in_transaction: bool):
+    """Create the table if it does not exist, otherwise empty it keeping its schema and indexes."""
+    if not inspect(connection).has_table(destination):
+        dataframe.head(0).to_sql(destination, connection, index=False)
+        return
+
+    if operation != "truncate":
+        return
+
+    table = connection.dialect.identifier_preparer.quote(destination)
+    # TRUNCATE commits implicitly in MySQL, DELETE keeps the pipeline transaction able to roll back
+    if in_transaction or connection.dialect.name not in MYSQL_BACKENDS:
+        connection.exec_driver_sql(f"DELETE FROM {table}")
+    else:
+        connection.exec_driver_sql(f"TRUNCATE TABLE {table}")
+
+
+def _load_data_infile(connection, dataframe: DataFrame, destination: str, logger) -> bool:
+    """Stream the rows as CSV through LOAD DATA LOCAL INFILE. Returns False if the server or driver refuses it."""
+    preparer = connection.dialect.identifier_preparer
+    columns = ", ".join(preparer.quote(str(column)) for column in dataframe.columns)
+
+    fd, csv_path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        # Unquoted NULL is read as SQL NULL, quotes inside values are doubled
+        dataframe.to_csv(csv_path, index=False, header=False, na_rep="NULL", quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+        path = csv_path.replace("\\", "\\\\").replace("'", "\\'")
+        connection.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {preparer.quote(destination)} "
+            "CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY '\\n' ({columns})"
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"LOAD DATA LOCAL INFILE not available, using multi-row inserts: {e}")
+        return False
+    finally:
+        os.remove(csv_path)
+
+
+def bulk_load(dataframe: DataFrame, log: RunLog, logger, *args, **kwargs):
+    """Bulk load data into a MySQL table.
+
+    Unlike save_to_sql the table is not dropped: with operation 'truncate' it is
+    emptied, with 'append' rows are added. Rows are streamed through
+    LOAD DATA LOCAL INFILE on MySQL/MariaDB (the connection needs
+    "local_infile": true), falling back to multi-row INSERTs of 'chunksize'
+    rows on other backends or when the server refuses it. In a chunked
+    pipeline only the first chunk truncates the table.
+    """
+    if "destination" not in kwargs:
+        error_message = "The 'destination' argument is required."
+        logger.error(error_message)
+        log = insert_row(log, ["error", error_message])
+        return None, log
+
+    destination = kwargs["destination"]
+    operation = kwargs.get("operation", "truncate")
+    if kwargs.get("chunk_index", 0) > 0:
+        # Chunked pipeline: the table was prepared by the first chunk
+        operation = "append"
+    chunksize = kwargs.get("chunksize", 1000)
+
+    connection_string, error_message = resolve_connection_string(kwargs)
+    if error_message:
+        logger.error(error_message)
+        log = insert_row(log, ["error", error_message])
+        return None, log
+
+    try:
+        transaction = kwargs.get("transaction")
+        shared_connection = transaction.connection_for(connection_string) if transaction else None
+        local_infile = bool(kwargs.get("local_infile", True))
+        engine_kwargs = {**kwargs, "local_infile": local_infile}
+
+        # Inside a pipeline transaction the rows are committed together with the following steps
+        with nullcontext(shared_connection) if shared_connection is not None else get_engine(connection_string, engine_kwargs).begin() as connection:
+            _prepare_table(connection, dataframe, destination, operation, shared_connection is not None)
+
+            logger.info(f"Saving {len(dataframe)} rows to {destination}")
+            if not dataframe.empty:
+                use_infile = local_infile and connection.dialect.name in MYSQL_BACKENDS
+                loaded = use_infile and _load_data_infile(connection, dataframe, destination, logger)
+                if not loaded:
+                    dataframe.to_sql(destination, connection, if_exists="append", index=False, method="multi", chunksize=chunksize)
+
+        insert_row(log, ["success", f"Saved {len(dataframe)} rows to {destination}"])
+    except Exception as e:
+        error_message = f"Error saving to SQL: {e}"
+        logger.error(error_message)
+        log = insert_row(log, ["error", error_message])
+
+    return None, log
@@ -0,0 +1,229 @@
+"""Per-step measures of a pipeline run: wall and CPU time, memory and rows.
+
+Measures are added to the run log as 'metric' records, whose data holds the
+values, and optionally appended to a JSON lines file and written as a
+Prometheus textfile (one file per task, for the node_exporter textfile
+collector).
+"""
+import json
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from pandas import DataFrame
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of the process so far, in MB."""
+    if resource is None:
+        return None
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def rows_of(result) -> Optional[int]:
+    """Rows of a step input or result: a DataFrame or a (DataFrame, log) tuple."""
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    return len(result) if isinstance(result, DataFrame) else None
+
+
+class StepMetrics:
+    """Measures of one step, summed over its calls (the chunks of a chunked run)."""
+
+    __slots__ = ("name", "calls", "wall_seconds", "cpu_seconds", "rows_in", "rows_out",
+                 "peak_rss_mb", "rss_growth_mb", "peak_alloc_mb")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rows_in = None
+        self.rows_out = None
+        self.peak_rss_mb = None
+        self.rss_growth_mb = 0.0
+        self.peak_alloc_mb = None
+
+    def add_rows(self, attribute: str, rows: Optional[int]):
+        if rows is not None:
+            setattr(self, attribute, (getattr(self, attribute) or 0) + rows)
+
+    def to_dict(self) -> dict:
+        return {
+            "step": self.name,
+            "calls": self.calls,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "peak_rss_mb": None if self.peak_rss_mb is None else round(self.peak_rss_mb, 2),
+            "rss_growth_mb": round(self.rss_growth_mb, 2),
+            "peak_alloc_mb": None if self.peak_alloc_mb is None else round(self.peak_alloc_mb, 2),
+        }
+
+    def message(self) -> str:
+        text = f"{self.name}: {self.wall_seconds:.3f}s wall, {self.cpu_seconds:.3f}s cpu"
+        if self.rows_in is not None or self.rows_out is not None:
+            text += f", rows {'-' if self.rows_in is None else self.rows_in} -> {'-' if self.rows_out is None else self.rows_out}"
+        if self.peak_alloc_mb is not None:
+            text += f", peak alloc {self.peak_alloc_mb:.1f} MB"
+        if self.rss_growth_mb:
+            text += f", peak RSS +{self.rss_growth_mb:.1f} MB"
+        return text
+
+
+class MetricsRecorder:
+    """Collects the measures of the steps of one pipeline run and reports them.
+
+    Attributes:
+    - task: Key of the task, label of the sinks.
+    - enabled: Measure the steps at all.
+    - trace_memory: Measure the peak Python allocations of each step with tracemalloc.
+      It slows the run down, so it is off unless metrics_tracemalloc is set.
+    - jsonl_path: (Optional) File where one JSON line per step is appended.
+    - prometheus_dir: (Optional) Directory of the Prometheus textfiles.
+    """
+
+    def __init__(self, task: str = None, enabled: bool = True, trace_memory: bool = False,
+                 jsonl_path: str = None, prometheus_dir: str = None):
+        self.task = task
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.jsonl_path = jsonl_path
+        self.prometheus_dir = prometheus_dir
+        self.steps: Dict[str, StepMetrics] = {}
+        self._started = time.perf_counter()
+
+    @classmethod
+    def from_settings(cls, settings: dict, task: str = None) -> "MetricsRecorder":
+        return cls(
+            task=task,
+            enabled=settings.get("metrics_enabled", True),
+            trace_memory=settings.get("metrics_tracemalloc", False),
+            jsonl_path=settings.get("metrics_jsonl_path"),
+            prometheus_dir=settings.get("metrics_prometheus_dir"),
+        )
+
+    @contextmanager
+    def measure(self, name: str, data_in=None):
+        """
+        Measures the block as one call of the step name.
+
+        Yields a dict where the block can leave its 'result', to count the rows out, and
+        set 'exhausted' when it found nothing to do (the end of a chunk generator).
+        """
+        outcome = {}
+        if not self.enabled:
+            yield outcome
+            return
+
+        metrics = self.steps.get(name)
+        if metrics is None:
+            metrics = self.steps[name] = StepMetrics(name)
+
+        if self.trace_memory:
+            # Started once and left running, pipelines of other threads may be measuring too
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            allocated_before = tracemalloc.get_traced_memory()[0]
+        rss_before = _peak_rss_mb()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield outcome
+        finally:
+            if not outcome.get("exhausted"):
+                metrics.calls += 1
+            metrics.wall_seconds += time.perf_counter() - wall_start
+            metrics.cpu_seconds += time.process_time() - cpu_start
+            metrics.add_rows("rows_in", rows_of(data_in))
+            metrics.add_rows("rows_out", rows_of(outcome.get("result")))
+
+            rss_after = _peak_rss_mb()
+            if rss_after is not None:
+                metrics.peak_rss_mb = rss_after
+                metrics.rss_growth_mb += rss_after - rss_before
+            if self.trace_memory:
+                peak = (tracemalloc.get_traced_memory()[1] - allocated_before) / (1024 * 1024)
+                metrics.peak_alloc_mb = max(metrics.peak_alloc_mb or 0.0, peak)
+
+    def records(self) -> list:
+        """Measures of every step, in order of first call, followed by the whole run."""
+        records = [metrics.to_dict() for metrics in self.steps.values()]
+        if records:
+            records.append({"step": "total", "calls": 1, "wall_seconds": round(time.perf_counter() - self._started, 6)})
+        return records
+
+    def flush(self, log, logger=None, run_id: str = None):
+        """
+        Adds the measures to the run log as 'metric' records and writes them to the sinks.
+
+        A failing sink only logs a warning, metrics never fail the run.
+        """
+        if not self.enabled or not self.steps:
+            return log
+
+        for metrics in self.steps.values():
+            log.append("metric", metrics.message(), metrics.to_dict())
+        records = self.records()
+        log.append("metric", f"total: {records[-1]['wall_seconds']:.3f}s wall", records[-1])
+
+        try:
+            if self.jsonl_path:
+                self._write_jsonl(records, run_id)
+            if self.prometheus_dir:
+                self._write_prometheus(records)
+        except Exception as e:
+            if logger:
+                logger.warning(f"Error writing pipeline metrics: {e}")
+        return log
+
+    def _write_jsonl(self, records: list, run_id: str):
+        os.makedirs(os.path.dirname(self.jsonl_path) or ".", exist_ok=True)
+        timestamp = time.time()
+        with open(self.jsonl_path, "a") as metrics_file:
+            for record in records:
+                metrics_file.write(json.dumps({"timestamp": timestamp, "task": self.task, "run_id": run_id, **record}) + "\n")
+
+    def _write_prometheus(self, records: list):
+        """Writes the last run of the task to <prometheus_dir>/etl_<task>.prom, replacing it atomically."""
+        os.makedirs(self.prometheus_dir, exist_ok=True)
+        task = self.task or "pipeline"
+        gauges = {
+            "wall_seconds": "Wall time of the step in the last run",
+            "cpu_seconds": "CPU time of the step in the last run",
+            "rows_in": "Rows received by the step in the last run",
+            "rows_out": "Rows returned by the step in the last run",
+            "peak_rss_mb": "Peak RSS of the process after the step",
+            "peak_alloc_mb": "Peak Python allocations during the step",
+        }
+        lines = []
+        for field, help_text in gauges.items():
+            samples = [record for record in records if record.get(field) is not None]
+            if not samples:
+                continue
+            lines.append(f"# HELP etl_step_{field} {help_text}")
+            lines.append(f"# TYPE etl_step_{field} gauge")
+            for record in samples:
+                step = record["step"].replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'etl_step_{field}{{task="{task}",step="{step}"}} {record[field]}')
+        lines.append("# HELP etl_last_run_timestamp_seconds End of the last run of the task")
+        lines.append("# TYPE etl_last_run_timestamp_seconds gauge")
+        lines.append(f'etl_last_run_timestamp_seconds{{task="{task}"}} {time.time():.3f}')
+
+        file_name = "etl_" + re.sub(r"[^A-Za-z0-9_]", "_", task) + ".prom"
+        fd, temp_path = tempfile.mkstemp(dir=self.prometheus_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as prom_file:
+            prom_file.write("\n".join(lines) + "\n")
+        os.replace(temp_path, os.path.join(self.prometheus_dir, file_name))
@@ -1,2 +1,3 @@
 
 from .pipeline import Step, Transform, Load, Pipeline, insert_row
+from .plan import ProviderPlan, TaskPlan, load_module
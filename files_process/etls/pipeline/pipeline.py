@@ -1,7 +1,11 @@
 """ the base of this pipeline system has extracted from https://github.com/rob-dalton/pandas-etl-pipeline/wiki/Examples"""
+import uuid
+
 from pandas import DataFrame, isna
 from typing import List, Union
 
+from files_process.etls.metrics import MetricsRecorder
+from files_process.etls.run_log import RunLog
 from files_process.etls.utils import insert_row
 from logger import setup_logger
 
@@ -10,15 +14,17 @@ class Step(object):
     """Step to run in a Pipeline.
 
     A Step is a function and a set of arguments that
-    are called during Pipeline.run().
+    are called during Pipeline.run(). name labels its metrics.
     """
+    name = None
+
     def __init__(self, func, *args, **kwargs):
         self.func = func
         self.args = args
         self.kwargs = kwargs
 
-    def run(self, log):
-        return self.func(log, *self.args, **self.kwargs)
+    def run(self, log: RunLog, **context):
+        return self.func(log, *self.args, **self.kwargs, **context)
 
 
 class Transform(Step):
@@ -32,8 +38,8 @@ class Transform(Step):
         self.args = args
         self.kwargs = kwargs
 
-    def run(self, data: DataFrame, log: DataFrame):
-        return self.func(data, log, *self.args, **self.kwargs)
+    def run(self, data: DataFrame, log: RunLog, **context):
+        return self.func(data, log, *self.args, **self.kwargs, **context)
 
 
 class Load(Transform):
@@ -59,6 +65,18 @@ class Pipeline:
     - load: (Optional) The final Step in a pipeline. Should save or pass Pipeline.data somewhere.
     - post_load: (Optional) The Step to run after loading.
     - logger: Logger for the pipeline.
+    - transaction: (Optional) SharedTransaction passed to every Step, Transform and Load.
+      It is committed once after the last step, or rolled back if any step logged an error.
+    - run_id: (Optional) Identifier of the run, passed to every Step, Transform and Load.
+      A new one is generated when not given.
+    - chunked: (Optional) The extract Step yields DataFrame chunks. The leading Transforms
+      and Loads, then the load, run once per chunk (with a 'chunk_index' context argument,
+      Loads append after the first chunk); the remaining Steps run once after the last chunk.
+    - metrics: (Optional) MetricsRecorder that measures every Step, Transform and Load.
+      The measures are added to the log as 'metric' records at the end of the run.
+    - checkpoints: (Optional) PipelineCheckpoints of the run. The data is stored after each
+      checkpointed Transform, and a run that finds a checkpoint skips the extract and the
+      Transforms before it.
     """
 
     def __init__(self,
@@ -67,40 +85,189 @@ class Pipeline:
                  extract: Step = None,
                  load: Load = None,
                  post_load: Step = None,
-                 logger=None):
+                 logger=None,
+                 transaction=None,
+                 chunked: bool = False,
+                 run_id: str = None,
+                 metrics: MetricsRecorder = None,
+                 checkpoints=None):
         self.data = None
         self.source = source
         self.steps = steps
         self.extract = extract
         self.load = load
         self.post_load = post_load
-        self.log = DataFrame(columns=["identifier", "message"])
+        self.log = RunLog()
         self.logger = logger or setup_logger("etl_pipeline")
+        self.transaction = transaction
+        self.run_id = run_id or uuid.uuid4().hex
+        self.chunked = chunked
+        self.metrics = metrics or MetricsRecorder()
+        self.checkpoints = checkpoints
+        self.chunk_steps = []
+        if chunked:
+            self.chunk_steps, final_steps = self._split_chunk_steps(steps)
+            if any(isinstance(step, Transform) for step in final_steps):
+                raise ValueError("In chunked mode every Transform and Load must come before the first Step.")
+
+    @staticmethod
+    def _split_chunk_steps(steps: List[Union[Step, Transform, Load]]) -> tuple:
+        """Split the steps into the leading Transforms and Loads, run per chunk, and the rest."""
+        for index, step in enumerate(steps):
+            if not isinstance(step, Transform):
+                return steps[:index], steps[index:]
+        return list(steps), []
+
+    @staticmethod
+    def _step_name(step: Step, default: str) -> str:
+        return step.name or getattr(step.func, "__name__", None) or default
+
+    def _run_step(self, step: Step, *args, name: str = None, **context):
+        """Run a Step, Transform or Load measuring it. Transforms and Loads get the data as first argument."""
+        name = name or self._step_name(step, "step")
+        data_in = args[0] if isinstance(step, Transform) else None
+        with self.metrics.measure(name, data_in) as outcome:
+            outcome["result"] = step.run(*args, self.log, **context) if data_in is not None else step.run(self.log, **context)
+        return outcome["result"]
 
     def _extract(self, **kwargs) -> DataFrame:
         """Run the extraction Step."""
-        return self.extract.run(self.log)
+        return self._run_step(self.extract, name="extract")
+
+    def run(self, load=True, **kwargs) -> RunLog:
+        if self.chunked and not isinstance(self.source, DataFrame):
+            return self._run_chunked()
 
-    def run(self, load=True, **kwargs) -> DataFrame:
+        try:
+            return self._run()
+        finally:
+            self.log = self.metrics.flush(self.log, self.logger, self.run_id)
+
+    def _resume(self) -> int:
+        """Load the data of the last checkpoint. Returns the index of the first step to run."""
+        resumed = self.checkpoints.resume() if self.checkpoints else None
+        if resumed is None:
+            return 0
+
+        index, self.data = resumed
+        step_name = self._step_name(self.steps[index], str(index))
+        self.logger.info(f"Resuming run from the checkpoint of step {step_name}")
+        # The extract is skipped, the post-load still has to find the file
+        self.log = insert_row(self.log, ["file_processed", self.checkpoints.input_path])
+        self.log = insert_row(self.log, ["info", f"Resumed from the checkpoint of step {step_name}, extraction skipped"])
+        return index + 1
+
+    def _run(self) -> RunLog:
+        start = 0
         if isinstance(self.source, DataFrame):
             self.data = self.source
         else:
-            self.data, self.log = self._extract()
+            start = self._resume()
+            if start == 0:
+                self.data, self.log = self._extract()
 
         if self.data.empty:
             self.log = insert_row(self.log, ["error", "!!WARNING¡¡ data extracted is empty"])
             return self.log
 
-        for step in self.steps:
-            if isinstance(step, Transform):
-                self.data, self.log = step.run(self.data, self.log)
-            else:
-                self.log = step.run(self.log)
+        context = self._context()
+        try:
+            for index, step in enumerate(self.steps[start:], start):
+                if isinstance(step, Transform):
+                    self.data, self.log = self._run_step(step, self.data, **context)
+                    if self.checkpoints and not isinstance(step, Load) and not self.log.has_errors:
+                        self.checkpoints.save(index, self.data)
+                else:
+                    self.log = self._run_step(step, **context)
+
+            if self.load:
+                _, self.log = self._run_step(self.load, self.data, name="load", **context)
+
+            with self.metrics.measure("commit"):
+                self._end_transaction()
+        except Exception:
+            if self.transaction:
+                self.transaction.rollback()
+            raise
+        finally:
+            if self.transaction:
+                self.transaction.close()
+
+        if self.post_load:
+            self.log = self._run_step(self.post_load, name="post_load")
+
+        return self.log
+
+    def _run_chunked(self) -> RunLog:
+        try:
+            return self._run_chunks()
+        finally:
+            self.log = self.metrics.flush(self.log, self.logger, self.run_id)
+
+    def _next_chunk(self, chunks):
+        """Next chunk of the extract generator, measured as the extract step. None after the last one."""
+        with self.metrics.measure("extract") as outcome:
+            outcome["result"] = next(chunks, None)
+            outcome["exhausted"] = outcome["result"] is None
+        return outcome["result"]
+
+    def _run_chunks(self) -> RunLog:
+        """Run the pipeline over the chunks yielded by the extract Step, holding one chunk at a time."""
+        context = self._context()
+        chunks = 0
+        rows = 0
+        try:
+            extracted = iter(self.extract.run(self.log))
+            chunk_index = 0
+            while (chunk := self._next_chunk(extracted)) is not None:
+                for step in self.chunk_steps:
+                    if isinstance(step, Load):
+                        _, self.log = self._run_step(step, chunk, chunk_index=chunk_index, **context)
+                    else:
+                        chunk, self.log = self._run_step(step, chunk, chunk_index=chunk_index, **context)
+                if self.load:
+                    _, self.log = self._run_step(self.load, chunk, name="load", chunk_index=chunk_index, **context)
+                chunks += 1
+                rows += len(chunk)
+                chunk_index += 1
 
-        if self.load:
-            _, self.log = self.load.run(self.data, self.log)
+            if chunks == 0:
+                self.log = insert_row(self.log, ["error", "!!WARNING¡¡ data extracted is empty"])
+                return self.log
+            self.logger.info(f"Processed {rows} rows in {chunks} chunks")
+
+            for step in self.steps[len(self.chunk_steps):]:
+                self.log = self._run_step(step, **context)
+
+            with self.metrics.measure("commit"):
+                self._end_transaction()
+        except Exception:
+            if self.transaction:
+                self.transaction.rollback()
+            raise
+        finally:
+            if self.transaction:
+                self.transaction.close()
 
         if self.post_load:
-            self.log = self.post_load.run(self.log)
+            self.log = self._run_step(self.post_load, name="post_load")
 
         return self.log
+
+    def _context(self) -> dict:
+        """Arguments of the run passed to every Step, Transform and Load."""
+        context = {"run_id": self.run_id}
+        if self.transaction:
+            context["transaction"] = self.transaction
+        return context
+
+    def _end_transaction(self):
+        """Commit the shared transaction, or roll it back if a step logged an error."""
+        if not self.transaction:
+            return
+
+        if self.log.has_errors:
+            self.logger.warning("Rolling back pipeline transaction due to errors")
+            self.transaction.rollback()
+        else:
+            self.transaction.commit()
@@ -0,0 +1,163 @@
+"""Pipeline plans compiled once from the task definitions in tasks.json."""
+import importlib.util
+import os
+import threading
+from types import ModuleType
+
+from files_process.etls.checkpoints import PipelineCheckpoints
+from files_process.etls.db import SharedTransaction, resolve_connection_string
+from files_process.etls.metrics import MetricsRecorder
+from files_process.etls.utils import is_enabled
+from .pipeline import Step, Transform, Load, Pipeline
+
+
+STEP_TYPES = {
+    "Step": Step,
+    "Transform": Transform,
+    "Load": Load,
+}
+
+_modules = {}
+_modules_lock = threading.Lock()
+
+
+def load_module(script: str) -> ModuleType:
+    """Load a step script, reusing the module while the file is not modified.
+
+    The cache is keyed by the absolute path and the modification time, so an
+    edited script is executed again on its next use.
+    """
+    path = os.path.abspath(script)
+    mtime = os.path.getmtime(path)
+
+    with _modules_lock:
+        cached = _modules.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        module_name = "etl_" + os.path.relpath(path).replace(os.sep, "_").replace(".", "_")
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[path] = (mtime, module)
+        return module
+
+
+class ProviderPlan:
+    """A provider or step of a task with its script resolved.
+
+    Attributes:
+    - name: Name of the provider.
+    - script: Path of the script that defines the function.
+    - method: Name of the function in the script.
+    - args: Static arguments from tasks.json.
+    - step_type: Step, Transform or Load.
+    - chunk_method: (Optional) Name of the generator function used in the chunked mode.
+    - checkpoint: The data after this Transform can be checkpointed ("checkpoint": false
+      for Transforms whose result depends on more than their input).
+    """
+
+    def __init__(self, definition: dict, step_type: str, name: str = None):
+        if step_type not in STEP_TYPES:
+            raise ValueError(f"Unknown step type '{step_type}' in {definition.get('script')}")
+
+        self.name = definition.get("name", name)
+        self.script = definition["script"]
+        self.method = definition["method"]
+        self.args = dict(definition.get("args", {}))
+        self.step_type = step_type
+        self.chunk_method = definition.get("chunk_method")
+        self.checkpoint = is_enabled(definition.get("checkpoint", True))
+        # Fail at compile time on missing scripts or methods
+        self.func
+        if self.chunk_method:
+            self.chunk_func
+
+    @property
+    def func(self):
+        return getattr(load_module(self.script), self.method)
+
+    @property
+    def chunk_func(self):
+        return getattr(load_module(self.script), self.chunk_method)
+
+    def bind(self, settings: dict, logger, *args, chunked: bool = False, **kwargs) -> Step:
+        """Create the Step for one run, binding the runtime kwargs.
+
+        With chunked the Step calls chunk_method instead of method.
+        """
+        kwargs.update(self.args)
+        kwargs.update(settings)
+        kwargs.update({"logger": logger})
+        func = self.chunk_func if chunked else self.func
+        step = STEP_TYPES[self.step_type](func, *args, **kwargs)
+        step.name = self.name
+        return step
+
+
+class TaskPlan:
+    """A task from tasks.json compiled into its providers.
+
+    Attributes:
+    - key: Key of the task.
+    - name: Name of the task.
+    - extract: Extraction provider.
+    - steps: Steps, Transforms and Loads of the task.
+    - load: (Optional) Load provider.
+    - post_load: (Optional) Post-load provider.
+    - transaction: (Optional) Connection settings of the transaction shared by the task's steps.
+    - chunked: The extract provider has a chunk_method, so the task can run in chunked mode.
+    """
+
+    def __init__(self, task: dict):
+        self.key = task["key"]
+        self.name = task["name"]
+        self.transaction = task.get("transaction")
+        self.extract = ProviderPlan(task["extract_provider"], "Step", "extract_provider")
+        self.steps = [ProviderPlan(step, step["type"]) for step in task["steps"]]
+        self.chunked = self.extract.chunk_method is not None
+
+        self.load = None
+        if "load_provider" in task and "script" in task["load_provider"]:
+            self.load = ProviderPlan(task["load_provider"], "Load", "load_provider")
+
+        self.post_load = None
+        if "post_load_provider" in task:
+            self.post_load = ProviderPlan(task["post_load_provider"], "Step", "post_load_provider")
+
+    def build(self, settings: dict, logger, *args, **kwargs) -> Pipeline:
+        """Create the Pipeline for one run.
+
+        Args:
+            settings: Settings merged into every provider's kwargs.
+            logger: Logger passed to the providers and the pipeline.
+            *args, **kwargs: Runtime arguments of the run (filepath, month, year...).
+                'chunked' overrides the pipeline_chunked setting.
+        """
+        chunked = is_enabled(kwargs.pop("chunked", settings.get("pipeline_chunked", False))) and self.chunked
+        # The chunked mode never holds the whole DataFrame, so it has no checkpoints
+        checkpoints = None if chunked else PipelineCheckpoints.for_run(settings, self, kwargs, logger)
+        kwargs.pop("checkpoint", None)
+
+        def bind(provider):
+            return provider.bind(settings, logger, *args, **dict(kwargs)) if provider else None
+
+        transaction = None
+        if self.transaction:
+            # Without a connection string each step reports the missing configuration itself
+            connection_string, _ = resolve_connection_string(self.transaction)
+            if connection_string:
+                transaction = SharedTransaction(connection_string, {**settings, **self.transaction})
+
+        return Pipeline(
+            source=None,
+            extract=self.extract.bind(settings, logger, *args, chunked=chunked, **dict(kwargs)),
+            steps=[bind(step) for step in self.steps],
+            load=bind(self.load),
+            post_load=bind(self.post_load),
+            logger=logger,
+            transaction=transaction,
+            chunked=chunked,
+            metrics=MetricsRecorder.from_settings(settings, task=self.key),
+            checkpoints=checkpoints,
+        )
@@ -0,0 +1,127 @@
+"""Opt-in cProfile of a pipeline run, to diagnose statements that are only slow with real PDFs.
+
+Profiling is turned on by profile_enabled in settings.json, "profile": true in
+a task of tasks.json or 'profile:on' in the run arguments. Each profiled run
+writes <profile_dir>/<task key>_<file hash>_<timestamp>.prof (open it with
+pstats or snakeviz); only the newest profile_keep files are kept. The hottest
+functions are added to the run log as 'profile' records.
+
+cProfile only sees the thread that runs the task: the pages extracted in the
+camelot process pool show up as waiting time of the pool.
+"""
+import cProfile
+import os
+import pstats
+import threading
+import time
+from typing import Callable, Optional
+
+from files_process.etls.utils import is_enabled
+from files_process.etls.run_log import RunLog
+
+# cProfile can only profile one run at a time in the process (sys.monitoring on Python 3.12+)
+_profile_lock = threading.Lock()
+
+
+def profiling_requested(settings: dict, task: dict, run_kwargs: dict) -> bool:
+    """A run is profiled if the run arguments, the task or the settings ask for it, in that order."""
+    if "profile" in run_kwargs:
+        return is_enabled(run_kwargs["profile"])
+    if "profile" in task:
+        return is_enabled(task["profile"])
+    return is_enabled(settings.get("profile_enabled", False))
+
+
+class RunProfiler:
+    """Runs a function under cProfile and stores the profile with a retention limit.
+
+    Attributes:
+    - profile_dir: Directory of the .prof files.
+    - keep: Number of profiles kept, the oldest are deleted.
+    - top: Number of hot functions added to the run log.
+    """
+
+    def __init__(self, profile_dir: str = "logs/profiles", keep: int = 50, top: int = 10, logger=None):
+        self.profile_dir = profile_dir
+        self.keep = keep
+        self.top = top
+        self.logger = logger
+
+    @classmethod
+    def from_settings(cls, settings: dict, logger=None) -> "RunProfiler":
+        return cls(
+            settings.get("profile_dir", "logs/profiles"),
+            int(settings.get("profile_keep", 50)),
+            int(settings.get("profile_top", 10)),
+            logger,
+        )
+
+    def profile_path(self, task_key: str, file_hash: Optional[str]) -> str:
+        name = f"{task_key}_{(file_hash or 'nofile')[:16]}_{time.strftime('%Y%m%d-%H%M%S')}.prof"
+        return os.path.join(self.profile_dir, name)
+
+    def run(self, task_key: str, file_hash: Optional[str], func: Callable[..., RunLog], *args, **kwargs) -> RunLog:
+        """
+        Runs func under the profiler and adds its hottest functions to the returned log.
+
+        If another run is being profiled, func runs without the profiler.
+
+        Args:
+            task_key: Key of the task, first part of the file name
+            file_hash: SHA-256 of the processed file, second part of the file name
+            func: Function that runs the task and returns its RunLog
+
+        Returns:
+            RunLog: Log of func with the 'profile' records
+        """
+        if not _profile_lock.acquire(blocking=False):
+            if self.logger:
+                self.logger.warning(f"Another run is being profiled, {task_key} runs without the profiler")
+            return func(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        try:
+            log = profiler.runcall(func, *args, **kwargs)
+        finally:
+            _profile_lock.release()
+
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            path = self.profile_path(task_key, file_hash)
+            profiler.dump_stats(path)
+            self._apply_retention()
+            self._add_top_functions(log, profiler, path)
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"Error saving the profile of {task_key}: {e}")
+        return log
+
+    def _add_top_functions(self, log: RunLog, profiler: cProfile.Profile, path: str):
+        stats = pstats.Stats(profiler)
+        total = stats.total_tt
+        log.append("profile", f"Profile saved to {path} ({total:.2f}s profiled)", {"path": path, "total_seconds": round(total, 6)})
+
+        # Functions with the most time spent in their own code
+        hottest = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        for (file_name, line, function), (_, calls, own_time, cumulative_time, _) in hottest:
+            location = f"{os.path.basename(file_name)}:{line}" if line else file_name
+            log.append(
+                "profile",
+                f"{own_time:.3f}s own, {cumulative_time:.3f}s cumulative, {calls} calls: {function} ({location})",
+                {
+                    "function": function, "file": file_name, "line": line, "calls": calls,
+                    "own_seconds": round(own_time, 6), "cumulative_seconds": round(cumulative_time, 6),
+                },
+            )
+
+    def _apply_retention(self):
+        """Deletes the oldest profiles beyond keep."""
+        profiles = [
+            os.path.join(self.profile_dir, name) for name in os.listdir(self.profile_dir) if name.endswith(".prof")
+        ]
+        profiles.sort(key=os.path.getmtime, reverse=True)
+        for path in profiles[self.keep:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
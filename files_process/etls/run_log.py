@@ -0,0 +1,93 @@
+from collections import Counter, defaultdict
+from typing import Iterable, Iterator, List
+
+import pandas as pd
+
+
+class LogRecord:
+    """One entry of a RunLog.
+
+    data holds optional structured values of the entry, like the measures of
+    a 'metric' record, and is kept apart from the human readable message.
+    """
+
+    __slots__ = ("identifier", "message", "data")
+
+    def __init__(self, identifier: str, message, data: dict = None):
+        self.identifier = identifier
+        self.message = message
+        self.data = data
+
+    def __getitem__(self, key: str):
+        # Allows record["identifier"] like the rows of the former log DataFrame
+        return getattr(self, key)
+
+    def __repr__(self) -> str:
+        if self.data is not None:
+            return f"LogRecord({self.identifier!r}, {self.message!r}, {self.data!r})"
+        return f"LogRecord({self.identifier!r}, {self.message!r})"
+
+    def to_dict(self) -> dict:
+        record = {"identifier": self.identifier, "message": self.message}
+        if self.data is not None:
+            record["data"] = self.data
+        return record
+
+
+class RunLog:
+    """Append-only log of a pipeline run.
+
+    Keeps a counter and the positions of the records of each identifier, so
+    checks like has_errors do not scan the log. Use to_dataframe() when a
+    DataFrame is needed.
+    """
+
+    def __init__(self, records: Iterable = None):
+        self.records: List[LogRecord] = []
+        self._counts = Counter()
+        self._positions = defaultdict(list)
+        for record in records or []:
+            data = record.get("data") if isinstance(record, dict) else record.data
+            self.append(record["identifier"], record["message"], data)
+
+    def append(self, identifier: str, message, data: dict = None) -> LogRecord:
+        record = LogRecord(identifier, message, data)
+        self._counts[identifier] += 1
+        self._positions[identifier].append(len(self.records))
+        self.records.append(record)
+        return record
+
+    def extend(self, other: "RunLog") -> "RunLog":
+        for record in other:
+            self.append(record.identifier, record.message, record.data)
+        return self
+
+    def __iter__(self) -> Iterator[LogRecord]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __repr__(self) -> str:
+        return f"RunLog({self.records!r})"
+
+    @property
+    def empty(self) -> bool:
+        return not self.records
+
+    @property
+    def has_errors(self) -> bool:
+        return self._counts["error"] > 0
+
+    def count(self, identifier: str) -> int:
+        return self._counts[identifier]
+
+    def messages(self, identifier: str) -> list:
+        """Messages of the records with the given identifier, in insertion order."""
+        return [self.records[position].message for position in self._positions.get(identifier, [])]
+
+    def to_records(self) -> List[dict]:
+        return [record.to_dict() for record in self.records]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.to_records(), columns=["identifier", "message"])
@@ -0,0 +1,69 @@
+import pandas as pd
+
+from files_process.etls.dedup import DedupIndex, row_fingerprints
+from files_process.etls.run_log import RunLog
+from files_process.etls.utils import insert_row
+
+
+def filter_new_rows(dataframe: pd.DataFrame, log: RunLog, logger, *args, **kwargs) -> pd.DataFrame:
+    """Drops the rows loaded by previous runs and records the rest as pending for this run.
+
+    Args (tasks.json / settings):
+        key_columns: Columns that identify a transaction
+        amount_columns: Key columns compared as amounts
+        dedup: 'off' sends every row (they are still recorded)
+        dedup_index_path: SQLite file of the index
+    """
+    run_id = kwargs.get("run_id")
+    if not run_id or dataframe.empty:
+        return dataframe, log
+
+    try:
+        index = DedupIndex.from_settings(kwargs)
+        fingerprints = row_fingerprints(dataframe, kwargs.get("key_columns"), kwargs.get("amount_columns"))
+
+        if str(kwargs.get("dedup", "on")).strip().lower() not in ("off", "no", "false", "0"):
+            known = index.known(fingerprints)
+            if known.any():
+                dataframe = dataframe[~known]
+                fingerprints = fingerprints[~known]
+                message = f"Skipped {int(known.sum())} rows already loaded, {len(dataframe)} new rows"
+                logger.info(message)
+                log = insert_row(log, ["info", message])
+
+        index.add_pending(run_id, fingerprints)
+    except Exception as e:
+        # Without the index every row is sent, the stored procedures still handle duplicates
+        logger.warning(f"Dedup index not available, loading every row: {e}")
+        log = insert_row(log, ["warning", f"Dedup index not available, loading every row: {e}"])
+
+    return dataframe, log
+
+
+def commit_new_rows(log: RunLog, logger, *args, **kwargs) -> RunLog:
+    """Marks the rows of this run as loaded once the load commits, or forgets them if it failed.
+
+    Inside a pipeline transaction the index is updated after the transaction
+    commits, so a rolled back run leaves no trace in it.
+    """
+    run_id = kwargs.get("run_id")
+    if not run_id:
+        return log
+
+    try:
+        index = DedupIndex.from_settings(kwargs)
+        if log.has_errors:
+            index.discard(run_id)
+            return log
+
+        transaction = kwargs.get("transaction")
+        if transaction is not None:
+            transaction.after_commit(lambda: index.commit(run_id))
+            transaction.after_rollback(lambda: index.discard(run_id))
+        else:
+            index.commit(run_id)
+    except Exception as e:
+        logger.warning(f"Error updating the dedup index: {e}")
+        log = insert_row(log, ["warning", f"Error updating the dedup index: {e}"])
+
+    return log
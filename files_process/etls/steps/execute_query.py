@@ -1,4 +1,5 @@
 
+from files_process.etls.db import get_engine
 from files_process.etls.utils import insert_row
 
 
@@ -12,16 +13,21 @@ def execute_store_query(log, logger, *args, **kwargs):
     connection_string = kwargs["connection_string"]
     stored_query = kwargs["stored_query"]
 
-    try:
-        from sqlalchemy import create_engine
+    transaction = kwargs.get("transaction")
+    shared_connection = transaction.connection_for(connection_string) if transaction else None
 
-        engine = create_engine(connection_string, encoding="utf-8")
-        connection = engine.raw_connection()
+    try:
+        if shared_connection is not None:
+            # Runs inside the pipeline transaction, which commits once at the end
+            connection = shared_connection.connection
+        else:
+            connection = get_engine(connection_string, kwargs).raw_connection()
 
         cursor = connection.cursor()
         cursor.execute(stored_query)
         cursor.close()
-        connection.commit()
+        if shared_connection is None:
+            connection.commit()
 
         logger.info(f"Executed stored query {stored_query}")
     except Exception as e:
@@ -30,7 +36,8 @@ def execute_store_query(log, logger, *args, **kwargs):
         logger.error(error_message)
     finally:
         try:
-            connection.close()
+            if shared_connection is None:
+                connection.close()
         except Exception as e:
             error_message = f"Error closing connection: {e}"
             log = insert_row(log, ["error", error_message])
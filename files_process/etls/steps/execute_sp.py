@@ -1,11 +1,11 @@
 
-import os
+from files_process.etls.db import get_engine, resolve_connection_string
 from files_process.etls.utils import insert_row
 
 
 def execute_store_procedure(log, logger, *args, **kwargs):
     """Execute a stored procedure in a MySQL database."""
-    if 'validate_error' in kwargs and kwargs['validate_error'] and log[log["identifier"] == "error"].shape[0] > 0:
+    if 'validate_error' in kwargs and kwargs['validate_error'] and log.has_errors:
         logger.error("Error in previous step.")
         return log
 
@@ -16,19 +16,8 @@ def execute_store_procedure(log, logger, *args, **kwargs):
         return log
 
     stored_procedure = kwargs["stored_procedure"]
-    connection_string_env_var = kwargs.get("connection_string_env_var")
-
-    if connection_string_env_var:
-        connection_string = os.environ.get(connection_string_env_var)
-        if not connection_string:
-            error_message = f"Environment variable '{connection_string_env_var}' not set."
-            logger.error(error_message)
-            log = insert_row(log, ["error", error_message])
-            return log
-    elif "connection_string" in kwargs:
-        connection_string = kwargs["connection_string"]
-    else:
-        error_message = "Either 'connection_string_env_var' or 'connection_string' argument is required."
+    connection_string, error_message = resolve_connection_string(kwargs)
+    if error_message:
         logger.error(error_message)
         log = insert_row(log, ["error", error_message])
         return log
@@ -37,17 +26,22 @@ def execute_store_procedure(log, logger, *args, **kwargs):
     if 'procedure_params' in kwargs and isinstance(kwargs['procedure_params'], list):
         procedure_params.extend(kwargs['procedure_params'])
 
-    try:
-        from sqlalchemy import create_engine
+    transaction = kwargs.get("transaction")
+    shared_connection = transaction.connection_for(connection_string) if transaction else None
 
-        engine = create_engine(connection_string)
-        connection = engine.raw_connection()
+    try:
+        if shared_connection is not None:
+            # Runs inside the pipeline transaction, which commits once at the end
+            connection = shared_connection.connection
+        else:
+            connection = get_engine(connection_string, kwargs).raw_connection()
 
         cursor = connection.cursor()
         cursor.callproc(stored_procedure, procedure_params)
         result = list(cursor.fetchall())
         cursor.close()
-        connection.commit()
+        if shared_connection is None:
+            connection.commit()
         [insert_row(log, row) for row in result]
         logger.info(f"Executed stored procedure {stored_procedure}")
     except Exception as e:
@@ -56,7 +50,8 @@ def execute_store_procedure(log, logger, *args, **kwargs):
         logger.error(error_message)
     finally:
         try:
-            connection.close()
+            if shared_connection is None:
+                connection.close()
         except Exception as e:
             error_message = f"Error closing connection: {e}"
             log = insert_row(log, ["error", error_message])
@@ -1,15 +1,15 @@
 import os
 import shutil
-from pandas import DataFrame
 import datetime
 
+from files_process.etls.run_log import RunLog
 from files_process.etls.utils import insert_row
 
 
-def move_file(log: DataFrame, processed_dir: str, logger, *args, **kwargs) -> DataFrame:
+def move_file(log: RunLog, processed_dir: str, logger, *args, **kwargs) -> RunLog:
     """Move processed files to specified directory"""
-    if "identifier" in log.columns and "message" in log.columns and processed_dir:
-        processed_files = log[log["identifier"] == "file_processed"]["message"].tolist()
+    if processed_dir:
+        processed_files = log.messages("file_processed")
         os.makedirs(processed_dir, exist_ok=True)
         for file_path in processed_files:
             if os.path.isfile(file_path):
@@ -22,18 +22,17 @@ def move_file(log: DataFrame, processed_dir: str, logger, *args, **kwargs) -> Da
     return log
 
 
-def delete_file(log: DataFrame, logger, *args, **kwargs) -> DataFrame:
-    if "identifier" in log.columns and "message" in log.columns:
-        processed_files = log[log["identifier"] == "file_processed"]["message"].tolist()
+def delete_file(log: RunLog, logger, *args, **kwargs) -> RunLog:
+    processed_files = log.messages("file_processed")
 
-        for file_path in processed_files:
-            if os.path.isfile(file_path):
-                try:
-                    os.remove(file_path)
-                    logger.info(f"Successfully deleted {file_path}")
-                    insert_row(log, ["error ", "Successfully file deleted"])
-                except Exception as e:
-                    error_message = f"Error deleting {file_path}: {e}"
-                    logger.error(error_message)
-                    insert_row(log, ["error ", error_message])
+    for file_path in processed_files:
+        if os.path.isfile(file_path):
+            try:
+                os.remove(file_path)
+                logger.info(f"Successfully deleted {file_path}")
+                insert_row(log, ["error ", "Successfully file deleted"])
+            except Exception as e:
+                error_message = f"Error deleting {file_path}: {e}"
+                logger.error(error_message)
+                insert_row(log, ["error ", error_message])
     return log
@@ -1,9 +1,12 @@
 import pandas as pd
 
+from files_process.etls.amounts import AmountSpec, parse_amount_columns
+from files_process.etls.cleaning import normalize_blanks
+from files_process.etls.run_log import RunLog
 from files_process.etls.utils import insert_row
 
 
-def clean_data(dataframe: pd.DataFrame, log: pd.DataFrame, logger, *args, **kwargs) -> pd.DataFrame:
+def clean_data(dataframe: pd.DataFrame, log: RunLog, logger, *args, **kwargs) -> pd.DataFrame:
     """Cleans and transforms the dataset into the desired structure and filters
 
         DataFrame columns:
@@ -23,14 +26,14 @@ def clean_data(dataframe: pd.DataFrame, log: pd.DataFrame, logger, *args, **kwar
         dataframe["extra_data"] = dataframe["movement"]
         dataframe.drop(columns=["movement", "value_date"], inplace=True)
         dataframe["bank"] = "BBVA"
-        # Fill empty strings with NaN
-        dataframe.replace(r"^\s*$", pd.NA, regex=True, inplace=True)
+        # Fill empty strings with NaN, already done if the extractor normalized the blanks
+        dataframe = normalize_blanks(dataframe)
         # Replace NaN values with 0 in numeric columns
         numeric_columns = ["charges", "credits", "balance"]
-        for column in numeric_columns:
-            dataframe[column] = dataframe[column].str.replace(",", "", regex=False)
-            dataframe[column] = dataframe[column].fillna(0)
-            dataframe[column] = pd.to_numeric(dataframe[column], errors="coerce")
+        spec = AmountSpec.from_kwargs(kwargs, "bbva")
+        dataframe, _, log = parse_amount_columns(
+            dataframe, numeric_columns, spec, log, logger, as_cents=kwargs.get("amount_as_cents", False)
+        )
     except Exception as e:
         log = insert_row(log, ["error", f"Error al procesar {dataframe}: {e}"])
         logger.error(f"Error al procesar {dataframe}: {e}")
@@ -1,8 +1,12 @@
+import numpy as np
 import pandas as pd
+from files_process.etls.amounts import AmountSpec, parse_amount_columns
+from files_process.etls.cleaning import normalize_blanks
+from files_process.etls.run_log import RunLog
 from files_process.etls.utils import insert_row
 
 
-def clean_data(dataframe: pd.DataFrame, log: pd.DataFrame, logger, *args, **kwargs) -> pd.DataFrame:
+def clean_data(dataframe: pd.DataFrame, log: RunLog, logger, *args, **kwargs) -> pd.DataFrame:
     """
     Cleans and transforms the dataset into the desired structure and filters
 
@@ -21,23 +25,22 @@ def clean_data(dataframe: pd.DataFrame, log: pd.DataFrame, logger, *args, **kwar
 
         # Fill empty strings with NaN
         try:
-            dataframe = dataframe.replace(r"^\s*$", pd.NA, regex=True)
+            dataframe = normalize_blanks(dataframe)
         except Exception as e:
             log = insert_row(log, ["error", f"Error replacing empty strings with NaN: {e}"])
             logger.error(f"Error replacing empty strings with NaN: {e}")
 
-        # Replace NaN values with 0 in numeric columns
+        # Replace NaN values with 0 in numeric columns, rows with invalid amounts are dropped
         numeric_columns = ["value", "balance"]
-        for column in numeric_columns:
-            try:
-                dataframe[column] = dataframe[column].str.replace(",", "", regex=False)
-                dataframe[column] = dataframe[column].str.replace("$", "", regex=False)
-                dataframe[column] = dataframe[column].fillna(0)
-                dataframe[column] = pd.to_numeric(dataframe[column], errors="coerce")
-                dataframe = dataframe[pd.notna(dataframe[column])]
-            except Exception as e:
-                log = insert_row(log, ["error", f"Error processing numeric column {column}: {e}"])
-                logger.error(f"Error processing numeric column {column}: {e}")
+        try:
+            spec = AmountSpec.from_kwargs(kwargs, "nequi")
+            dataframe, invalid_rows, log = parse_amount_columns(
+                dataframe, numeric_columns, spec, log, logger, as_cents=kwargs.get("amount_as_cents", False)
+            )
+            dataframe = dataframe.loc[~invalid_rows].copy()
+        except Exception as e:
+            log = insert_row(log, ["error", f"Error processing numeric columns {numeric_columns}: {e}"])
+            logger.error(f"Error processing numeric columns {numeric_columns}: {e}")
 
         # Convert description and month to text
         try:
@@ -55,7 +58,7 @@ def clean_data(dataframe: pd.DataFrame, log: pd.DataFrame, logger, *args, **kwar
     return dataframe, log
 
 
-def transform_transactions(dataframe: pd.DataFrame, log: pd.DataFrame, logger, *args, **kwargs) -> pd.DataFrame:
+def transform_transactions(dataframe: pd.DataFrame, log: RunLog, logger, *args, **kwargs) -> pd.DataFrame:
     """
         input DataFrame columns:
           operation_date, description, value, balance, month
@@ -64,14 +67,14 @@ def transform_transactions(dataframe: pd.DataFrame, log: pd.DataFrame, logger, *
     """
     try:
 
+        value = dataframe["value"].to_numpy()
         dataframe["concept"] = dataframe["description"]
-        dataframe["charges"] = dataframe["value"].apply(lambda x: x if x <= 0 else 0)
-        dataframe["credits"] = dataframe["value"].apply(lambda x: x if x > 0 else 0)
-        dataframe["balance"] = dataframe["balance"]
+        # Negative values are charges (stored as positive amounts), positive values are credits
+        dataframe["charges"] = np.where(value < 0, -value, 0)
+        dataframe["credits"] = np.where(value > 0, value, 0)
         dataframe["bank"] = "Nequi"
         dataframe["extra_data"] = ""
         dataframe = dataframe.drop(columns=["description", "value"])
-        dataframe["charges"] = dataframe["charges"].apply(lambda x: abs(x) if x < 0 else x)
     except Exception as e:
         log = insert_row(log, ["error", f"Error al transformar {dataframe}: {e}"])
         logger.error(f"Error al transformar {dataframe}: {e}")
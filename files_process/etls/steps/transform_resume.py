@@ -1,10 +1,13 @@
 import pandas as pd
 from pandas import DataFrame
 
+from files_process.etls.amounts import AmountSpec, parse_amount_columns
+from files_process.etls.cleaning import normalize_blanks
+from files_process.etls.run_log import RunLog
 from files_process.etls.utils import insert_row
 
 
-def clean_data(data: DataFrame, log: DataFrame, logger, *args, **kwargs) -> DataFrame:
+def clean_data(data: DataFrame, log: RunLog, logger, *args, **kwargs) -> DataFrame:
     """Transforms the dataset into the desired structure and filters.
 
     DataFrame columns:
@@ -21,23 +24,17 @@ def clean_data(data: DataFrame, log: DataFrame, logger, *args, **kwargs) -> Data
         # Remove duplicates based on 'concept'
         data.drop_duplicates(subset=["concept"], inplace=True)
 
-        # Replace empty strings with NaN
-        data.replace(r"^\s*$", pd.NA, regex=True, inplace=True)
-
-        # Replace NaN values with 0 in 'value' and 'value1' columns
-        data["value"] = data["value"].fillna(0)
-        data["value1"] = data["value1"].fillna(0)
+        # Replace empty strings with NaN, already done if the extractor normalized the blanks
+        data = normalize_blanks(data)
 
         # Remove 'Nro' column
         data = data.drop(columns=["nro"])
 
-        # Remove , from value and value1 columns
-        data["value"] = data["value"].str.replace(",", "", regex=False)
-        data["value1"] = data["value1"].str.replace(",", "", regex=False)
-
-        # Convert 'value' and 'value1' columns to numeric
-        data["value"] = pd.to_numeric(data["value"], errors="coerce")
-        data["value1"] = pd.to_numeric(data["value1"], errors="coerce")
+        # Convert 'value' and 'value1' columns to numeric, empty values are 0
+        spec = AmountSpec.from_kwargs(kwargs, "bbva")
+        data, _, log = parse_amount_columns(
+            data, ["value", "value1"], spec, log, logger, as_cents=kwargs.get("amount_as_cents", False)
+        )
 
     except Exception as e:
         log = insert_row(log, ["error", f"Error al procesar {data}: {e}"])
@@ -47,7 +44,7 @@ def clean_data(data: DataFrame, log: DataFrame, logger, *args, **kwargs) -> Data
     return data, log
 
 
-def transform_data(data_frame: DataFrame, log: DataFrame, logger, *args, **kwargs) -> DataFrame:
+def transform_data(data_frame: DataFrame, log: RunLog, logger, *args, **kwargs) -> DataFrame:
     """Transform Dataset and compact in columns.
 
     DataFrame columns: concept, nro, value
@@ -1,8 +1,14 @@
-from typing import List
+from typing import List, Union
 import pandas as pd
 
+from files_process.etls.run_log import RunLog
+
+
+def insert_row(df: Union[RunLog, pd.DataFrame], row: List):
+    if isinstance(df, RunLog):
+        df.append(row[0], row[1])
+        return df
 
-def insert_row(df: pd.DataFrame, row: List):
     insert_loc = df.index.max()
 
     if pd.isna(insert_loc):
@@ -11,3 +17,10 @@ def insert_row(df: pd.DataFrame, row: List):
         df.loc[insert_loc + 1] = row
 
     return df
+
+
+def is_enabled(value) -> bool:
+    """Flags can come from settings.json (bool) or from a Discord message ('on', 'true'...)."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "on", "yes", "true")
+    return bool(value)
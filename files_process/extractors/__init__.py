@@ -1 +1,5 @@
-from .pdf_extractor import PDFExtractor
\ No newline at end of file
+from .pdf_document import PDFDocument, file_sha256
+from .pdf_extractor import PDFExtractor
+from .table_cache import TableCache
+from .table_store import TableStore
+from .statement_detector import detect_statement
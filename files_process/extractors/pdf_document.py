@@ -0,0 +1,115 @@
+import hashlib
+import io
+from typing import Dict, Optional
+
+import pypdf
+
+
+def file_sha256(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 del contenido de un archivo, leído por bloques."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PDFDocument:
+    """PDF abierto y descifrado una sola vez.
+
+    Se comparte entre la verificación de acceso, la extracción de texto y la
+    extracción de tablas para no volver a leer ni descifrar el archivo en
+    cada etapa.
+    """
+
+    def __init__(self, file_path: str, password: Optional[str] = None):
+        """
+        Abre y descifra el PDF
+
+        Args:
+            file_path: Ruta al archivo PDF
+            password: Contraseña opcional del PDF
+        """
+        self.file_path = file_path
+        self.password = password
+        self.error = None
+        self._reader = None
+        self._content = None
+        self._sha256 = None
+        self._page_texts: Dict[int, str] = {}
+        self._open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self):
+        try:
+            reader = pypdf.PdfReader(self.file_path, strict=False)
+            if reader.is_encrypted and reader.decrypt(self.password or "") == pypdf.PasswordType.NOT_DECRYPTED:
+                raise ValueError("Incorrect password")
+            # Forzar la lectura del árbol de páginas para validar el descifrado
+            len(reader.pages)
+            self._reader = reader
+        except Exception as e:
+            self.error = e
+
+    @property
+    def is_accessible(self) -> bool:
+        return self._reader is not None
+
+    @property
+    def reader(self) -> pypdf.PdfReader:
+        if self._reader is None:
+            raise ValueError(f"No se puede acceder al PDF {self.file_path}: {self.error}")
+        return self._reader
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 del archivo original (cifrado), calculado una sola vez."""
+        if self._sha256 is None:
+            self._sha256 = file_sha256(self.file_path)
+        return self._sha256
+
+    @property
+    def num_pages(self) -> int:
+        return len(self.reader.pages)
+
+    def page_text(self, index: int) -> str:
+        """
+        Texto de una página (base 0), extraído una sola vez
+
+        Args:
+            index: Índice de la página
+
+        Returns:
+            str: Texto de la página
+        """
+        if index not in self._page_texts:
+            self._page_texts[index] = self.reader.pages[index].extract_text()
+        return self._page_texts[index]
+
+    @property
+    def content(self) -> bytes:
+        """Bytes del PDF ya descifrado, generados una sola vez."""
+        if self._content is None:
+            if self.reader.is_encrypted:
+                writer = pypdf.PdfWriter(clone_from=self.reader)
+                buffer = io.BytesIO()
+                writer.write(buffer)
+                self._content = buffer.getvalue()
+            else:
+                with open(self.file_path, "rb") as pdf_file:
+                    self._content = pdf_file.read()
+        return self._content
+
+    def stream(self) -> io.BytesIO:
+        """Nuevo stream en memoria del PDF descifrado (camelot lo acepta en lugar de la ruta)."""
+        return io.BytesIO(self.content)
+
+    def close(self):
+        self._reader = None
+        self._content = None
+        self._page_texts.clear()
@@ -1,8 +1,37 @@
+import io
+import math
+from concurrent.futures import ProcessPoolExecutor
+
 import camelot
 import pandas as pd
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional, Union
+from files_process.etls.cleaning import normalize_blanks
 from logger import setup_logger
-import pypdf
+
+from .pdf_document import PDFDocument
+
+
+def _read_pages(source: Union[str, bytes], read_kwargs: dict) -> List[pd.DataFrame]:
+    """Lee con camelot un bloque de páginas. Se ejecuta en un proceso del pool."""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    return [table.df for table in camelot.read_pdf(source, **read_kwargs)]
+
+
+def _expand_pages(pages: str, num_pages: int) -> List[int]:
+    """Convierte una especificación de páginas de camelot ('all', '1,3-end') en la lista de páginas."""
+    if pages == 'all':
+        return list(range(1, num_pages + 1))
+
+    page_numbers = set()
+    for page_range in pages.split(','):
+        if '-' in page_range:
+            start, end = page_range.split('-')
+            end = num_pages if end == 'end' else int(end)
+            page_numbers.update(range(int(start), end + 1))
+        else:
+            page_numbers.add(int(page_range))
+    return sorted(page_numbers)
 
 
 class PDFExtractor:
@@ -15,50 +44,72 @@ class PDFExtractor:
         """
         self.logger = logger or setup_logger("pdf_extractor")
 
-    def check_pdf_access(self, file_path: str, password: Optional[str] = None) -> bool:
+    def open_document(self, file_path: str, password: Optional[str] = None) -> PDFDocument:
         """
-        Verifica si se puede acceder al PDF
+        Abre y descifra el PDF una sola vez para compartirlo entre etapas
 
         Args:
             file_path: Ruta al archivo PDF
             password: Contraseña opcional del PDF
 
+        Returns:
+            PDFDocument: Documento abierto
+        """
+        document = PDFDocument(file_path, password)
+        if not document.is_accessible:
+            self.logger.error(f"Error al acceder al PDF {file_path}: {str(document.error)}")
+        return document
+
+    def check_pdf_access(self, file_path: Union[str, PDFDocument], password: Optional[str] = None) -> bool:
+        """
+        Verifica si se puede acceder al PDF
+
+        Solo abre el archivo con pypdf e intenta descifrarlo, sin analizar tablas.
+
+        Args:
+            file_path: Ruta al archivo PDF o documento ya abierto
+            password: Contraseña opcional del PDF
+
         Returns:
             bool: True si se puede acceder al PDF, False en caso contrario
         """
-        try:
-            tables = camelot.read_pdf(
-                file_path,
-                password=password,
-                pages='1',
-                flavor='lattice'
-            )
-            return len(tables) > 0
-        except Exception as e:
-            self.logger.error(f"Error al acceder al PDF {file_path}: {str(e)}")
-            return False
+        if isinstance(file_path, PDFDocument):
+            return file_path.is_accessible
+        return self.open_document(file_path, password).is_accessible
 
     def extract_tables(
         self,
-        file_path: str,
+        file_path: Union[str, PDFDocument],
         password: Optional[str] = None,
         pages: str = 'all',
         flavor: str = 'lattice',
-        table_areas: Optional[List[str]] = None
+        table_areas: Optional[List[str]] = None,
+        workers: int = 1,
+        min_parallel_pages: int = 4
     ) -> List[pd.DataFrame]:
         """
         Extrae tablas de un archivo PDF
 
         Args:
-            file_path: Ruta al archivo PDF
+            file_path: Ruta al archivo PDF o documento ya abierto
             password: Contraseña opcional del PDF
             pages: Páginas a procesar ('all' o rango específico)
             flavor: Método de extracción ('lattice' o 'stream')
             table_areas: Áreas específicas donde buscar tablas
+            workers: Procesos para extraer bloques de páginas en paralelo (1 = serial)
+            min_parallel_pages: Mínimo de páginas para usar el modo paralelo
 
         Returns:
             List[pd.DataFrame]: Lista de DataFrames con las tablas extraídas
         """
+        document = file_path if isinstance(file_path, PDFDocument) else None
+        source = file_path
+        if document is not None:
+            # El documento ya está descifrado en memoria
+            source = document.stream()
+            password = None
+            file_path = document.file_path
+
         try:
             self.logger.info(f"Extrayendo tablas de {file_path}")
 
@@ -73,7 +124,14 @@ class PDFExtractor:
                 kwargs['table_areas'] = table_areas
 
             # Extraer tablas
-            tables = camelot.read_pdf(file_path, **kwargs)
+            page_chunks = []
+            if workers > 1:
+                page_chunks = self._split_pages(document or PDFDocument(file_path, password), pages, workers, min_parallel_pages)
+
+            if len(page_chunks) > 1:
+                tables = self._read_pages_parallel(document.content if document else file_path, kwargs, page_chunks)
+            else:
+                tables = [table.df for table in camelot.read_pdf(source, **kwargs)]
 
             if len(tables) == 0:
                 self.logger.warning(f"No se encontraron tablas en {file_path}")
@@ -81,8 +139,7 @@ class PDFExtractor:
 
             # Convertir tablas a DataFrames
             dfs = []
-            for i, table in enumerate(tables):
-                df = table.df
+            for i, df in enumerate(tables):
                 # Limpiar el DataFrame
                 df = self._clean_dataframe(df)
                 dfs.append(df)
@@ -94,6 +151,68 @@ class PDFExtractor:
             self.logger.error(f"Error al extraer tablas de {file_path}: {str(e)}")
             raise
 
+    def page_chunks(self, document: PDFDocument, pages: str = 'all', chunk_size: int = 0) -> List[str]:
+        """
+        Divide las páginas a procesar en bloques de chunk_size páginas para la extracción por partes
+
+        Args:
+            document: Documento abierto
+            pages: Páginas a procesar ('all' o rango específico)
+            chunk_size: Páginas por bloque, 0 para un solo bloque
+
+        Returns:
+            List[str]: Especificación de páginas de cada bloque
+        """
+        if chunk_size <= 0:
+            return [pages]
+
+        page_numbers = _expand_pages(pages, document.num_pages)
+        return [
+            ','.join(str(page) for page in page_numbers[start:start + chunk_size])
+            for start in range(0, len(page_numbers), chunk_size)
+        ]
+
+    def _split_pages(self, document: PDFDocument, pages: str, workers: int, min_parallel_pages: int) -> List[str]:
+        """
+        Divide las páginas a procesar en bloques contiguos, uno por proceso
+
+        Args:
+            document: Documento abierto
+            pages: Páginas a procesar ('all' o rango específico)
+            workers: Número de procesos
+            min_parallel_pages: Mínimo de páginas para usar el modo paralelo
+
+        Returns:
+            List[str]: Especificación de páginas de cada bloque, vacía si conviene el modo serial
+        """
+        page_numbers = _expand_pages(pages, document.num_pages)
+        if len(page_numbers) < max(min_parallel_pages, 2):
+            return []
+
+        chunk_size = math.ceil(len(page_numbers) / workers)
+        return [
+            ','.join(str(page) for page in page_numbers[start:start + chunk_size])
+            for start in range(0, len(page_numbers), chunk_size)
+        ]
+
+    def _read_pages_parallel(self, source: Union[str, bytes], kwargs: dict, page_chunks: List[str]) -> List[pd.DataFrame]:
+        """
+        Extrae cada bloque de páginas en un proceso distinto y une las tablas en orden de página
+
+        Args:
+            source: Ruta al archivo PDF o bytes del PDF descifrado
+            kwargs: Parámetros de extracción de camelot
+            page_chunks: Especificación de páginas de cada bloque
+
+        Returns:
+            List[pd.DataFrame]: Tablas en orden de página
+        """
+        self.logger.info(f"Extrayendo {len(page_chunks)} bloques de páginas en paralelo")
+        chunk_kwargs = [{**kwargs, 'pages': chunk} for chunk in page_chunks]
+        with ProcessPoolExecutor(max_workers=len(page_chunks)) as executor:
+            results = executor.map(_read_pages, [source] * len(page_chunks), chunk_kwargs)
+            return [table for chunk_tables in results for table in chunk_tables]
+
     def _clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Limpia un DataFrame extraído
@@ -104,33 +223,54 @@ class PDFExtractor:
         Returns:
             pd.DataFrame: DataFrame limpio
         """
-        # Eliminar filas y columnas vacías
-        df = df.replace('', pd.NA).dropna(how='all', axis=0).dropna(how='all', axis=1)
-
         # # Usar la primera fila como encabezados si es necesario
         # if df.iloc[0].str.contains('|'.join(['Fecha', 'Descripción', 'Importe'])).any():
         #     df.columns = df.iloc[0]
         #     df = df.iloc[1:]
 
-        # Limpiar valores
-        df = df.replace(r'^\s*$', pd.NA, regex=True)
-        df = df.fillna('')
+        # Eliminar filas y columnas vacías y normalizar las celdas en blanco a NA en una sola pasada
+        return normalize_blanks(df, drop_empty=True)
 
-        return df
+    def iter_text(self, file: Union[str, PDFDocument], password: str = None, pages: int = -1) -> Iterator[str]:
+        """
+        Genera el texto del PDF página por página, extrayendo cada página solo cuando se pide
 
-    def get_text(self, file: str, password: str = None, pages: int = -1, *args, **kwargs):
-        try:
-            pdfFile = pypdf.PdfReader(file)
-            if pdfFile.is_encrypted:
-                pdfFile.decrypt(password)
+        Args:
+            file: Ruta al archivo PDF o documento ya abierto
+            password: Contraseña opcional del PDF
+            pages: Número máximo de páginas a leer, -1 para todas
 
-            if pages < 0:
-                num_pages = pdfFile.get_num_pages()
-            else:
-                num_pages = pages - 1
+        Yields:
+            str: Texto de cada página
+        """
+        document = file if isinstance(file, PDFDocument) else PDFDocument(file, password)
+        num_pages = document.num_pages if pages < 0 else min(pages, document.num_pages)
+        for page in range(num_pages):
+            yield document.page_text(page) or ""
 
-            text = ''.join([pdfFile.get_page(page).extract_text() for page in range(num_pages)])
-            return text
+    def get_text(self, file: Union[str, PDFDocument], password: str = None, pages: int = -1,
+                 until: Callable[[str], bool] = None, max_chars: int = None, *args, **kwargs) -> str:
+        """
+        Extrae el texto del PDF, deteniéndose en cuanto se tiene lo necesario
+
+        Args:
+            file: Ruta al archivo PDF o documento ya abierto
+            password: Contraseña opcional del PDF
+            pages: Número máximo de páginas a leer, -1 para todas
+            until: Función sobre el texto acumulado; al devolver True no se leen más páginas
+            max_chars: Número máximo de caracteres devueltos
+
+        Returns:
+            str: Texto extraído, vacío si no se puede leer el PDF
+        """
+        try:
+            text = ''
+            for page_text in self.iter_text(file, password, pages):
+                text += page_text
+                if (max_chars is not None and len(text) >= max_chars) or (until is not None and until(text)):
+                    break
+            return text if max_chars is None else text[:max_chars]
         except Exception as e:
-            print(e)
+            file_path = file.file_path if isinstance(file, PDFDocument) else file
+            self.logger.error(f"Error al extraer el texto de {file_path}: {str(e)}")
             return ""
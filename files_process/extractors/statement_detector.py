@@ -0,0 +1,130 @@
+"""Detección determinista del banco y el periodo de un extracto a partir del nombre del archivo y la primera página."""
+import os
+import re
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+
+MONTHS = {
+    "enero": 1, "ene": 1, "febrero": 2, "feb": 2, "marzo": 3, "mar": 3, "abril": 4, "abr": 4,
+    "mayo": 5, "may": 5, "junio": 6, "jun": 6, "julio": 7, "jul": 7, "agosto": 8, "ago": 8,
+    "septiembre": 9, "setiembre": 9, "sept": 9, "sep": 9, "octubre": 10, "oct": 10,
+    "noviembre": 11, "nov": 11, "diciembre": 12, "dic": 12,
+}
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+
+# Año y mes en el nombre del archivo: 2024-03, 2024_3, 03-2024, marzo_2024...
+FILENAME_PERIOD_PATTERNS = [
+    re.compile(r"(?<!\d)(?P<year>20\d{2})[-_ .]?(?P<month>0?[1-9]|1[0-2])(?!\d)"),
+    re.compile(r"(?<!\d)(?P<month>0?[1-9]|1[0-2])[-_ .]?(?P<year>20\d{2})(?!\d)"),
+    re.compile(rf"(?<![a-z])(?P<month_name>{_MONTH_NAMES})[-_ .]?(?P<year>20\d{{2}})(?!\d)"),
+]
+
+_DMY_RANGE = r"\d{1,2}[/-]\d{1,2}[/-]\d{4}\s*(?:al|a|hasta|-)\s*\d{1,2}[/-](?P<month>\d{1,2})[/-](?P<year>\d{4})"
+_YMD_RANGE = r"\d{4}[/-]\d{1,2}[/-]\d{1,2}\s*(?:al|a|hasta|-)\s*(?P<year>\d{4})[/-](?P<month>\d{1,2})[/-]\d{1,2}"
+_MONTH_YEAR = rf"(?P<month_name>{_MONTH_NAMES})\.?\s*(?:de\s+|del\s+)?(?P<year>20\d{{2}})"
+
+# Patrones por banco sobre el texto de la primera página, sin tildes y en minúsculas
+BANK_PATTERNS = {
+    "bbva": {
+        "bank": [re.compile(r"\bbbva\b")],
+        "period": [
+            re.compile(rf"periodo[^\n]{{0,30}}?{_DMY_RANGE}"),
+            re.compile(r"fecha de corte[^\n]{0,20}?\d{1,2}[/-](?P<month>\d{1,2})[/-](?P<year>\d{4})"),
+            re.compile(rf"periodo[^\n]{{0,30}}?{_MONTH_YEAR}"),
+        ],
+    },
+    "nequi": {
+        "bank": [re.compile(r"\bnequi\b")],
+        "period": [
+            re.compile(rf"periodo[^\n]{{0,30}}?{_YMD_RANGE}"),
+            re.compile(rf"periodo[^\n]{{0,30}}?{_DMY_RANGE}"),
+            re.compile(rf"(?:periodo|extracto|mes)[^\n]{{0,30}}?{_MONTH_YEAR}"),
+        ],
+    },
+}
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def _period(match: re.Match) -> Optional[Tuple[int, int]]:
+    groups = match.groupdict()
+    month = MONTHS[groups["month_name"]] if groups.get("month_name") else int(groups["month"])
+    year = int(groups["year"])
+    if 1 <= month <= 12 and 2000 <= year <= 2100:
+        return month, year
+    return None
+
+
+def detect_from_filename(file_name: str) -> Dict[str, object]:
+    """
+    Busca el banco y el periodo en el nombre del archivo
+
+    Args:
+        file_name: Nombre o ruta del archivo
+
+    Returns:
+        dict: Campos encontrados entre bank_name, month y year
+    """
+    name = _normalize(os.path.splitext(os.path.basename(file_name))[0])
+    info = {}
+
+    bank = next((bank for bank in BANK_PATTERNS if bank in name), None)
+    if bank:
+        info["bank_name"] = bank
+
+    for pattern in FILENAME_PERIOD_PATTERNS:
+        match = pattern.search(name)
+        period = _period(match) if match else None
+        if period:
+            info["month"], info["year"] = period
+            break
+    return info
+
+
+def detect_from_text(text: str) -> Dict[str, object]:
+    """
+    Busca el banco y el periodo en el texto de la primera página del extracto
+
+    Args:
+        text: Texto de la primera página
+
+    Returns:
+        dict: Campos encontrados entre bank_name, month y year
+    """
+    text = _normalize(text)
+    info = {}
+
+    bank = next((bank for bank, patterns in BANK_PATTERNS.items() if any(p.search(text) for p in patterns["bank"])), None)
+    if bank is None:
+        return info
+    info["bank_name"] = bank
+
+    for pattern in BANK_PATTERNS[bank]["period"]:
+        match = pattern.search(text)
+        period = _period(match) if match else None
+        if period:
+            info["month"], info["year"] = period
+            break
+    return info
+
+
+def detect_statement(file_name: str, first_page_text: str) -> Dict[str, object]:
+    """
+    Detecta el banco, el mes y el año de un extracto sin usar el LLM
+
+    El texto de la primera página tiene prioridad sobre el nombre del archivo.
+
+    Args:
+        file_name: Nombre del archivo subido
+        first_page_text: Texto de la primera página
+
+    Returns:
+        dict: Campos encontrados entre bank_name, month y year
+    """
+    info = detect_from_filename(file_name)
+    info.update(detect_from_text(first_page_text))
+    return info
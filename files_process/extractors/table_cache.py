@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import List, Optional
+
+import pandas as pd
+
+from logger import setup_logger
+
+
+class TableCache:
+    """Caché en disco de tablas extraídas, direccionada por contenido.
+
+    Cada entrada es un directorio con un archivo Parquet por tabla y un
+    `meta.json` con las etiquetas originales de las columnas. La fecha de
+    modificación de `meta.json` marca el último acceso y se usa para
+    desalojar las entradas menos usadas cuando se supera el tamaño máximo.
+    """
+
+    META_FILE = "meta.json"
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024, logger=None):
+        """
+        Inicializa la caché
+
+        Args:
+            cache_dir: Directorio de la caché
+            max_bytes: Tamaño total máximo antes de desalojar entradas
+            logger: Logger opcional
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.logger = logger or setup_logger("table_cache")
+
+    @classmethod
+    def from_settings(cls, settings: dict, logger=None) -> Optional["TableCache"]:
+        """
+        Crea la caché a partir de la configuración, o None si está deshabilitada
+
+        Args:
+            settings: Configuración (table_cache_enabled, table_cache_dir, table_cache_max_mb)
+            logger: Logger opcional
+
+        Returns:
+            TableCache: Caché configurada o None
+        """
+        if not settings.get("table_cache_enabled", False):
+            return None
+        return cls(
+            settings.get("table_cache_dir", "cache/tables"),
+            int(settings.get("table_cache_max_mb", 512)) * 1024 * 1024,
+            logger
+        )
+
+    @staticmethod
+    def make_key(file_hash: str, **params) -> str:
+        """
+        Clave de la entrada: hash del archivo más los parámetros de extracción
+
+        Args:
+            file_hash: SHA-256 del archivo
+            **params: Parámetros que afectan el resultado (flavor, pages, table_areas, column_mapping...)
+
+        Returns:
+            str: Clave hexadecimal
+        """
+        payload = json.dumps({"file": file_hash, **params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[List[pd.DataFrame]]:
+        """
+        Obtiene las tablas de una entrada
+
+        Args:
+            key: Clave de la entrada
+
+        Returns:
+            List[pd.DataFrame]: Tablas guardadas o None si no existe la entrada
+        """
+        meta_path = os.path.join(self._entry_dir(key), self.META_FILE)
+        if not os.path.isfile(meta_path):
+            return None
+
+        try:
+            with open(meta_path, encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+
+            tables = []
+            for i, columns in enumerate(meta["columns"]):
+                table = pd.read_parquet(os.path.join(self._entry_dir(key), f"{i}.parquet"))
+                table.columns = columns
+                tables.append(table)
+
+            os.utime(meta_path)
+            return tables
+        except Exception as e:
+            self.logger.warning(f"Entrada de caché {key} inválida, se descarta: {e}")
+            self.invalidate(key)
+            return None
+
+    def put(self, key: str, tables: List[pd.DataFrame]):
+        """
+        Guarda las tablas de una entrada y desaloja las más antiguas si es necesario
+
+        Args:
+            key: Clave de la entrada
+            tables: Tablas a guardar
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+
+        try:
+            os.makedirs(tmp_dir)
+            for i, table in enumerate(tables):
+                table = table.copy()
+                table.columns = [str(column) for column in table.columns]
+                table.to_parquet(os.path.join(tmp_dir, f"{i}.parquet"))
+
+            with open(os.path.join(tmp_dir, self.META_FILE), "w", encoding="utf-8") as meta_file:
+                json.dump({"columns": [list(table.columns) for table in tables], "created": time.time()}, meta_file, default=str)
+
+            self.invalidate(key)
+            os.replace(tmp_dir, self._entry_dir(key))
+        except Exception as e:
+            self.logger.warning(f"No se pudo guardar la entrada de caché {key}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self._evict()
+
+    def invalidate(self, key: str):
+        """Elimina una entrada de la caché."""
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def clear(self):
+        """Elimina todas las entradas de la caché."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _evict(self):
+        """Desaloja las entradas usadas hace más tiempo hasta respetar el tamaño máximo."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(entry_dir, self.META_FILE)
+            if name.startswith(".") or not os.path.isfile(meta_path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file())
+            entries.append((os.path.getmtime(meta_path), size, name))
+            total += size
+
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.invalidate(name)
+            total -= size
+            self.logger.info(f"Entrada de caché {name} desalojada ({size} bytes)")
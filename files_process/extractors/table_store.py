@@ -0,0 +1,37 @@
+import threading
+from typing import Callable, Dict, Hashable, List
+
+import pandas as pd
+
+
+class TableStore:
+    """Tablas extraídas en memoria, compartidas por las tareas de una misma ejecución.
+
+    Varias tareas del mismo archivo (transacciones y resumen) piden las tablas
+    con los mismos parámetros de extracción; la primera ejecuta camelot y las
+    demás esperan su resultado en lugar de repetir la extracción.
+    """
+
+    def __init__(self):
+        self._tables: Dict[Hashable, List[pd.DataFrame]] = {}
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_or_extract(self, key: Hashable, extract: Callable[[], List[pd.DataFrame]]) -> List[pd.DataFrame]:
+        """
+        Obtiene las tablas de una clave, extrayéndolas una sola vez
+
+        Args:
+            key: Archivo y parámetros de extracción
+            extract: Función que extrae las tablas si aún no están
+
+        Returns:
+            List[pd.DataFrame]: Tablas sin filtrar; la lista es una copia para cada llamada
+        """
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            if key not in self._tables:
+                self._tables[key] = extract()
+            return list(self._tables[key])
@@ -1,9 +1,33 @@
-import pandas as pd
+import threading
+
 from files_process.etls.etl import ETL
+from files_process.etls.run_log import RunLog
 import constants
 
 
 class FileProcessor:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls, settings) -> "FileProcessor":
+        """Return the process-wide FileProcessor, creating it on first use.
+
+        The ETL inside reloads tasks.json when the file changes, so the
+        instance can live for the whole process.
+
+        Args:
+            settings: Application settings, only used on first call.
+
+        Returns:
+            FileProcessor: The shared processor.
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(settings)
+        return cls._instance
+
     def __init__(self, settings):
         self.settings = settings
         self.etl = ETL(settings)
@@ -12,11 +36,11 @@ class FileProcessor:
             "nequi": self._process_nequi
         }
 
-    def process_file(self, bank_name, *args, **kwargs) -> pd.DataFrame:
+    def process_file(self, bank_name, *args, **kwargs) -> RunLog:
         """Process a file for a given bank.
 
-        This method will call the corresponding bank processor and return the log
-        DataFrame.
+        This method will call the corresponding bank processor and return the
+        run log.
 
         Args:
             bank_name: The name of the bank to process.
@@ -24,9 +48,9 @@ class FileProcessor:
             **kwargs: Keyword arguments to pass to the ETL pipeline.
 
         Returns:
-            pd.DataFrame: A DataFrame with the log of the processing.
+            RunLog: The log of the processing.
         """
-        log = pd.DataFrame(columns=["identifier", "message"])
+        log = RunLog()
         if bank_name.strip().lower() not in self.banks:
             return log
 
@@ -35,34 +59,39 @@ class FileProcessor:
     def _process_bbva(self, *args, **kwargs):
         """Process BBVA files.
 
-        This method will run both the transactions and resume pipelines and
-        concatenate the logs into a single DataFrame.
+        This method will run the transactions pipeline and, with the
+        bbva_process_resume setting, the resume pipeline too, concatenating
+        the logs into a single RunLog.
 
         Args:
             *args: Arguments to pass to the ETL pipeline.
             **kwargs: Keyword arguments to pass to the ETL pipeline.
 
         Returns:
-            pd.DataFrame: A DataFrame with the concatenated logs.
+            RunLog: The concatenated logs.
         """
-        log = self.etl.run(constants.PROCESS_BBVA_TRANSACTIONS_ETL, *args, **kwargs)
+        if not getattr(self.settings, "bbva_process_resume", False):
+            return self.etl.run(constants.PROCESS_BBVA_TRANSACTIONS_ETL, *args, **kwargs)
+
+        # Both tasks share one table extraction and run in parallel
+        log = self.etl.run_tasks(constants.PROCESS_BBVA_ETL, *args, **kwargs)
         return log
 
     def _process_nequi(self, *args, **kwargs):
         """Process Nequi files.
 
         This method will run both the transactions and resume pipelines and
-        concatenate the logs into a single DataFrame.
+        concatenate the logs into a single RunLog.
 
         Args:
             *args: Arguments to pass to the ETL pipeline.
             **kwargs: Keyword arguments to pass to the ETL pipeline.
 
         Returns:
-            pd.DataFrame: A DataFrame with the concatenated logs.
+            RunLog: The concatenated logs.
         """
-        log = pd.DataFrame(columns=["identifier", "message"])
+        log = RunLog()
         log_transactions = self.etl.run(constants.PROCESS_NEQUI_TRANSACTIONS_ETL, *args, **kwargs)
         # log_resume = self.etl.run(constants.PROCESS_RESUME_ETL, *args, **kwargs)
-        log = pd.concat([log_transactions], ignore_index=True)
+        log.extend(log_transactions)
         return log
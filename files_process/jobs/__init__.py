@@ -0,0 +1,2 @@
+from .job_queue import JobQueue, STATUS_QUEUED, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED
+from .worker import WorkerPool
@@ -0,0 +1,261 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Parameters removed from a job once it finishes, they are only needed while it can still run
+SENSITIVE_PARAMS = ("pdf_password",)
+
+
+def worker_id(name: str) -> str:
+    """Identifier of a worker running in this process: '<host>:<pid>:<name>'."""
+    return f"{socket.gethostname()}:{os.getpid()}:{name}"
+
+
+def worker_alive(worker: Optional[str]) -> bool:
+    """
+    Checks if the process of a worker id is still running.
+
+    Workers of other hosts cannot be checked and count as alive. Ids without
+    a host and pid (older jobs) count as dead.
+    """
+    parts = (worker or "").split(":")
+    if len(parts) < 2 or not parts[1].isdigit():
+        return False
+    if parts[0] != socket.gethostname() or os.name == "nt":
+        # On Windows os.kill terminates the process instead of probing it
+        return True
+    try:
+        os.kill(int(parts[1]), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user
+        return True
+    return True
+
+
+class JobQueue:
+    """Durable queue of statement processing jobs backed by SQLite.
+
+    Every method opens its own connection, so the queue can be shared by the
+    bot and by the worker processes. Claims run inside an immediate
+    transaction, which makes the per-bank concurrency limits hold across
+    processes.
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 3, backoff_seconds: float = 30, bank_limits: Dict[str, int] = None):
+        """
+        Initializes the queue and creates the jobs table if needed.
+
+        Args:
+            db_path: Path of the SQLite database
+            max_attempts: Attempts before a job is marked as failed
+            backoff_seconds: Base delay before a retry, doubled on every attempt
+            bank_limits: Maximum running jobs per bank (banks not listed are unlimited)
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.bank_limits = {bank.lower(): limit for bank, limit in (bank_limits or {}).items()}
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    bank TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    worker TEXT,
+                    error TEXT,
+                    result TEXT,
+                    channel_id INTEGER,
+                    message_id INTEGER,
+                    notified INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at)")
+
+    @classmethod
+    def from_settings(cls, settings) -> "JobQueue":
+        return cls(
+            getattr(settings, "job_queue_path", "data/jobs.db"),
+            max_attempts=getattr(settings, "job_max_attempts", 3),
+            backoff_seconds=getattr(settings, "job_backoff_seconds", 30),
+            bank_limits=getattr(settings, "job_bank_concurrency", {}),
+        )
+
+    @contextmanager
+    def _connect(self):
+        """Autocommit connection, closed on exit."""
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Optional[dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else []
+        return job
+
+    def enqueue(self, bank: str, params: dict, channel_id: int = None, message_id: int = None) -> int:
+        """
+        Adds a job to the queue.
+
+        Args:
+            bank: Bank key used to pick the ETL
+            params: Keyword arguments for FileProcessor.process_file
+            channel_id: Discord channel of the upload
+            message_id: Discord message of the upload
+
+        Returns:
+            int: Id of the new job
+        """
+        now = time.time()
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "INSERT INTO jobs (bank, params, status, available_at, created_at, updated_at, channel_id, message_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (bank.strip().lower(), json.dumps(params, default=str), STATUS_QUEUED, now, now, now, channel_id, message_id)
+            )
+            return cursor.lastrowid
+
+    def claim(self, worker: str) -> Optional[dict]:
+        """
+        Takes the oldest available job whose bank is under its concurrency limit.
+
+        Args:
+            worker: Identifier of the claiming worker
+
+        Returns:
+            dict: The claimed job or None if there is nothing to run
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                running = dict(connection.execute(
+                    "SELECT bank, COUNT(*) FROM jobs WHERE status = ? GROUP BY bank", (STATUS_RUNNING,)
+                ).fetchall())
+                candidates = connection.execute(
+                    "SELECT * FROM jobs WHERE status = ? AND available_at <= ? ORDER BY id", (STATUS_QUEUED, now)
+                )
+                job = next((row for row in candidates if running.get(row["bank"], 0) < self.bank_limits.get(row["bank"], float("inf"))), None)
+                if job is not None:
+                    connection.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, worker = ?, updated_at = ? WHERE id = ?",
+                        (STATUS_RUNNING, worker, now, job["id"])
+                    )
+                    job = connection.execute("SELECT * FROM jobs WHERE id = ?", (job["id"],)).fetchone()
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            return self._to_job(job)
+
+    def _finish(self, connection: sqlite3.Connection, job_id: int, status: str, error: str = None, result: List[dict] = None):
+        params = json.loads(connection.execute("SELECT params FROM jobs WHERE id = ?", (job_id,)).fetchone()["params"])
+        params = {key: value for key, value in params.items() if key not in SENSITIVE_PARAMS}
+        connection.execute(
+            "UPDATE jobs SET status = ?, error = ?, result = ?, params = ?, updated_at = ? WHERE id = ?",
+            (status, error, json.dumps(result or [], default=str), json.dumps(params, default=str), time.time(), job_id)
+        )
+
+    def complete(self, job_id: int, result: List[dict]):
+        """
+        Marks a job as done and stores its processing log.
+
+        Args:
+            job_id: Id of the job
+            result: Log records of the run
+        """
+        with self._connect() as connection:
+            self._finish(connection, job_id, STATUS_DONE, result=result)
+
+    def fail(self, job_id: int, error: str):
+        """
+        Records a failed attempt. The job is retried with exponential backoff
+        until it reaches the maximum attempts.
+
+        Only crashes are retried: the workers call it when process_file raises.
+        Step errors are recorded in the run log and the job completes with them.
+
+        Args:
+            job_id: Id of the job
+            error: Error message of the attempt
+        """
+        with self._connect() as connection:
+            attempts = connection.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()["attempts"]
+            if attempts >= self.max_attempts:
+                self._finish(connection, job_id, STATUS_FAILED, error=error)
+                return
+
+            delay = self.backoff_seconds * 2 ** (attempts - 1)
+            connection.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = ?, updated_at = ? WHERE id = ?",
+                (STATUS_QUEUED, error, time.time() + delay, time.time(), job_id)
+            )
+
+    def requeue_running(self) -> int:
+        """
+        Puts back in the queue the jobs left running by a worker process that died.
+
+        Jobs of workers that are still alive (standalone workers started with
+        python -m files_process.jobs.worker) keep running.
+
+        Returns:
+            int: Number of requeued jobs
+        """
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                running = connection.execute("SELECT id, worker FROM jobs WHERE status = ?", (STATUS_RUNNING,)).fetchall()
+                orphaned = [row["id"] for row in running if not worker_alive(row["worker"])]
+                now = time.time()
+                connection.executemany(
+                    "UPDATE jobs SET status = ?, worker = NULL, updated_at = ? WHERE id = ?",
+                    ((STATUS_QUEUED, now, job_id) for job_id in orphaned)
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            return len(orphaned)
+
+    def get(self, job_id: int) -> Optional[dict]:
+        """Returns a job by id, or None if it does not exist."""
+        with self._connect() as connection:
+            return self._to_job(connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def pending_notifications(self) -> List[dict]:
+        """Returns the finished jobs whose result has not been reported yet."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) AND notified = 0 ORDER BY id", (STATUS_DONE, STATUS_FAILED)
+            ).fetchall()
+            return [self._to_job(row) for row in rows]
+
+    def mark_notified(self, job_id: int):
+        with self._connect() as connection:
+            connection.execute("UPDATE jobs SET notified = 1 WHERE id = ?", (job_id,))
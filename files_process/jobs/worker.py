@@ -0,0 +1,103 @@
+import multiprocessing
+
+from dotenv import load_dotenv
+
+from files_process.file_processor import FileProcessor
+from files_process.jobs.job_queue import JobQueue, worker_id
+from logger import setup_logger
+
+
+def run_worker(settings, name: str, stop_event):
+    """
+    Worker process loop: claims jobs from the queue and runs them through the
+    FileProcessor until the stop event is set.
+
+    A job is retried only when process_file raises (a crash before or outside
+    the pipeline, with the file still in place). Errors of the pipeline steps
+    are part of the returned log: the transaction was rolled back and the
+    post-load already ran, so the job completes and reports them.
+
+    Args:
+        settings: Application settings
+        name: Name of the worker, stored on the claimed jobs with the host and pid
+        stop_event: multiprocessing.Event that stops the loop
+    """
+    logger = setup_logger("jobs")
+    queue = JobQueue.from_settings(settings)
+    processor = FileProcessor.instance(settings)
+    poll_seconds = getattr(settings, "job_poll_seconds", 2)
+    # The pid lets requeue_running tell a live worker from a dead one
+    worker = worker_id(name)
+
+    while not stop_event.is_set():
+        job = queue.claim(worker)
+        if job is None:
+            stop_event.wait(poll_seconds)
+            continue
+
+        logger.info(f"Worker {worker} running job {job['id']} ({job['bank']}), attempt {job['attempts']}")
+        try:
+            log = processor.process_file(job["bank"], **job["params"])
+            queue.complete(job["id"], log.to_records())
+            logger.info(f"Job {job['id']} done")
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {e}")
+            queue.fail(job["id"], str(e))
+
+
+class WorkerPool:
+    """Pool of worker processes that consume the job queue."""
+
+    def __init__(self, settings, logger=None):
+        """
+        Initializes the pool.
+
+        Args:
+            settings: Application settings (job_workers sets the number of processes)
+            logger: Optional logger
+        """
+        self.settings = settings
+        self.logger = logger or setup_logger("jobs")
+        self.size = getattr(settings, "job_workers", 2)
+        self.stop_event = multiprocessing.Event()
+        self.processes = []
+
+    def start(self):
+        """Requeues the jobs of dead workers (a previous shutdown or crash) and starts the workers."""
+        requeued = JobQueue.from_settings(self.settings).requeue_running()
+        if requeued:
+            self.logger.warning(f"Requeued {requeued} interrupted jobs")
+
+        # Not daemonic: the workers start their own process pools for page-parallel extraction
+        for i in range(self.size):
+            process = multiprocessing.Process(
+                target=run_worker,
+                args=(self.settings, f"job-worker-{i}", self.stop_event),
+                name=f"job-worker-{i}"
+            )
+            process.start()
+            self.processes.append(process)
+        self.logger.info(f"Started {self.size} job workers")
+
+    def stop(self, timeout: float = 30):
+        """Asks the workers to stop after their current job, terminating them after the timeout."""
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+
+if __name__ == "__main__":
+    # Standalone workers: python -m files_process.jobs.worker
+    from settings import Settings
+
+    load_dotenv()
+    pool = WorkerPool(Settings())
+    pool.start()
+    try:
+        for process in pool.processes:
+            process.join()
+    except KeyboardInterrupt:
+        pool.stop()
@@ -47,6 +47,11 @@ def setup_logger(name="discord_bot", level=logging.INFO):
     """
     # Crear el logger
     logger = logging.getLogger(name)
+
+    # Configurar una sola vez por proceso, las siguientes llamadas reutilizan los handlers
+    if getattr(logger, "_configured", False):
+        return logger
+
     logger.setLevel(level)
 
     # Crear directorio de logs si no existe
@@ -60,7 +65,7 @@ def setup_logger(name="discord_bot", level=logging.INFO):
     file_handler = logging.FileHandler(
         filename=f"logs/{datetime.now().strftime('%Y-%m-%d')}-discord.log",
         encoding="utf-8",
-        mode="w"
+        mode="a"
     )
     file_handler_formatter = logging.Formatter(
         "[{asctime}] [{levelname:<8}] {name}: {message}",
@@ -75,5 +80,6 @@ def setup_logger(name="discord_bot", level=logging.INFO):
     # Agregar los handlers
     logger.addHandler(console_handler)
     logger.addHandler(file_handler)
+    logger._configured = True
 
     return logger
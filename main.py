@@ -4,6 +4,7 @@ from files_process.etls.etl import ETL
 from logger import setup_logger
 from settings import Settings
 from files_process import FileProcessor
+from files_process.jobs import WorkerPool
 
 
 load_dotenv()
@@ -19,13 +20,20 @@ def main():
         # log = FileProcessor(settings).process_file("bbva", password='1001773168', month=4, year=2025)
         # print(log)
 
+        # Iniciar los workers de la cola de trabajos
+        workers = WorkerPool(settings, logger)
+        workers.start()
+
         # Iniciar el bot
         bot = DiscordBot(logger, settings)
         logger.info("Iniciando bot de Discord...")
-        if bot.run():
-            logger.info("Bot iniciado correctamente")
-        else:
-            logger.error("Error al iniciar el bot")
+        try:
+            if bot.run():
+                logger.info("Bot iniciado correctamente")
+            else:
+                logger.error("Error al iniciar el bot")
+        finally:
+            workers.stop()
 
     except Exception as ex:
         logger.error(f"Error inesperado: {str(ex)}")
@@ -0,0 +1,25 @@
+"""Step scripts of the tasks of test_checkpoints, they record their calls in CALLS."""
+import pandas as pd
+
+from files_process.etls.run_log import RunLog
+from files_process.etls.utils import insert_row
+
+CALLS = []
+FAIL = {"finish": False}
+
+
+def extract(log: RunLog, logger, *args, **kwargs):
+    CALLS.append("extract")
+    return pd.DataFrame({"value": [1, 2, 3]}), log
+
+
+def multiply(data: pd.DataFrame, log: RunLog, logger, *args, factor: int = 2, **kwargs):
+    CALLS.append(f"multiply:{factor}")
+    return data.assign(value=data["value"] * factor), log
+
+
+def finish(data: pd.DataFrame, log: RunLog, logger, *args, **kwargs):
+    CALLS.append(f"finish:{data['value'].tolist()}")
+    if FAIL["finish"]:
+        insert_row(log, ["error", "finish failed"])
+    return data, log
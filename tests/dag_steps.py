@@ -0,0 +1,27 @@
+"""Step scripts of the tasks of test_etl_dag, they record what runs in the 'events' run argument."""
+import time
+
+import pandas as pd
+
+from files_process.etls.run_log import RunLog
+from files_process.etls.utils import insert_row
+
+
+def extract(log: RunLog, logger, *args, events: list, label: str, fail: bool = False, table_store=None, **kwargs):
+    def extract_tables():
+        events.append("extract_tables")
+        time.sleep(0.05)
+        return [pd.DataFrame({"value": [1, 2]})]
+
+    events.append(f"start:{label}")
+    tables = table_store.get_or_extract(("statement.pdf", "lattice"), extract_tables) if table_store else extract_tables()
+    time.sleep(0.05)
+    events.append(f"end:{label}")
+    if fail:
+        insert_row(log, ["error", f"{label} failed"])
+    return tables[0], log
+
+
+def post_load(log: RunLog, logger, *args, events: list, **kwargs):
+    events.append("post_load")
+    return log
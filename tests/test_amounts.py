@@ -0,0 +1,97 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from files_process.etls.amounts import AMOUNT_SPECS, AmountSpec, parse_amount_columns, parse_amounts
+from files_process.etls.run_log import RunLog
+
+logger = logging.getLogger("tests")
+
+
+def parse(values, spec="bbva", **kwargs):
+    return parse_amounts(pd.Series(values, dtype=object), AMOUNT_SPECS[spec], **kwargs)
+
+
+def test_bbva_separators():
+    values, invalid = parse(["1,234,567.89", "12.50", "0.00"])
+    assert values.tolist() == [1234567.89, 12.5, 0.0]
+    assert not invalid.any()
+
+
+def test_es_co_separators():
+    values, invalid = parse(["1.234.567,89", "12,50"], spec="es_CO")
+    assert values.tolist() == [1234567.89, 12.5]
+    assert not invalid.any()
+
+
+def test_same_separators_are_rejected():
+    with pytest.raises(ValueError):
+        AmountSpec(thousands=".", decimal=".")
+
+
+def test_negative_notations():
+    values, invalid = parse(["(1,234.00)", "1,234.00-", "-5.25"])
+    assert values.tolist() == [-1234.0, -1234.0, -5.25]
+    assert not invalid.any()
+
+
+def test_currency_symbols_and_nbsp():
+    values, invalid = parse(["$1,000.00", "$\xa02,500.10", " $ 3.00 "])
+    assert values.tolist() == [1000.0, 2500.1, 3.0]
+    assert not invalid.any()
+
+    values, _ = parse(["€1.000,00", "EUR 2,50"], spec="es_ES")
+    assert values.tolist() == [1000.0, 2.5]
+
+
+def test_blanks_take_the_fill_value():
+    values, invalid = parse([None, "", " ", "\xa0", "10.00"], fill_value=0)
+    assert values.tolist() == [0.0, 0.0, 0.0, 0.0, 10.0]
+    assert not invalid.any()
+
+    values, _ = parse([None, "10.00"], fill_value=None)
+    assert pd.isna(values[0]) and values[1] == 10.0
+
+
+def test_invalid_mask():
+    values, invalid = parse(["10.00", "abc", None, "1.2.3"])
+    assert invalid.tolist() == [False, True, False, True]
+    assert values[0] == 10.0
+    assert pd.isna(values[1]) and pd.isna(values[3])
+
+
+def test_as_cents_is_int64():
+    values, _ = parse(["1,234.56", "(0.10)", None], as_cents=True)
+    assert str(values.dtype) == "Int64"
+    assert values.tolist() == [123456, -10, 0]
+
+
+def test_numeric_columns_are_kept():
+    values, invalid = parse_amounts(pd.Series([1.5, 2.0]), AMOUNT_SPECS["bbva"])
+    assert values.tolist() == [1.5, 2.0]
+    assert not invalid.any()
+
+
+def test_parse_amount_columns_reports_invalid_rows():
+    dataframe = pd.DataFrame({"charges": ["1.00", "x", None], "credits": [None, "2.00", "y"]})
+    dataframe, invalid_rows, log = parse_amount_columns(
+        dataframe, ["charges", "credits"], AMOUNT_SPECS["bbva"], RunLog(), logger
+    )
+    assert invalid_rows.tolist() == [False, True, True]
+    assert log.count("warning") == 2
+    assert dataframe["charges"][0] == 1.0
+
+
+def test_parse_amount_columns_drops_page_headers():
+    dataframe = pd.DataFrame({
+        "concept": ["Concepto", "PAGO", "Concepto", "ABONO"],
+        "charges": ["Cargos", "10.00", " CARGOS ", None],
+        "credits": ["Abonos", None, "Abonos", "5.00"],
+    })
+    dataframe, invalid_rows, log = parse_amount_columns(
+        dataframe, ["charges", "credits"], AMOUNT_SPECS["bbva"], RunLog(), logger
+    )
+    assert dataframe["concept"].tolist() == ["PAGO", "ABONO"]
+    assert not invalid_rows.any()
+    assert log.count("warning") == 0
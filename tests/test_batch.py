@@ -0,0 +1,50 @@
+import pandas as pd
+
+from files_process.batch import dedup_step_args, drop_repeated_rows
+from files_process.etls.pipeline.plan import TaskPlan
+
+COLUMNS = ["bank", "operation_date", "concept", "charges", "credits", "balance"]
+FEBRUARY = [
+    ["Nequi", "27/02/2024", "RECARGA", 0.0, 50.0, 150.0],
+    ["Nequi", "28/02/2024", "CAFE", 4.5, 0.0, 145.5],
+    ["Nequi", "28/02/2024", "CAFE", 4.5, 0.0, 145.5],
+]
+# Overlaps February: it repeats the last two movements and adds a third identical one
+MARCH = [
+    ["Nequi", "28/02/2024", "CAFE", 4.5, 0.0, 145.5],
+    ["Nequi", "28/02/2024", "CAFE", 4.5, 0.0, 145.5],
+    ["Nequi", "28/02/2024", "CAFE", 4.5, 0.0, 145.5],
+    ["Nequi", "01/03/2024", "PAGO", 20.0, 0.0, 125.5],
+]
+
+
+def test_overlapping_files_of_a_batch_are_deduped():
+    frames = [("feb.pdf", pd.DataFrame(FEBRUARY, columns=COLUMNS)), ("mar.pdf", pd.DataFrame(MARCH, columns=COLUMNS))]
+    deduped, dropped = drop_repeated_rows(frames)
+
+    assert dropped == [0, 2]
+    assert len(deduped[0][1]) == 3
+    march = deduped[1][1]
+    assert march.index.tolist() == [2, 3]
+    assert march["concept"].tolist() == ["CAFE", "PAGO"]
+
+
+def test_files_without_overlap_are_kept():
+    frames = [
+        ("feb.pdf", pd.DataFrame(FEBRUARY[:1], columns=COLUMNS)),
+        ("empty.pdf", pd.DataFrame(columns=COLUMNS)),
+        ("mar.pdf", pd.DataFrame(MARCH[3:], columns=COLUMNS)),
+    ]
+    deduped, dropped = drop_repeated_rows(frames)
+    assert dropped == [0, 0, 0]
+    assert [len(data) for _, data in deduped] == [1, 0, 1]
+
+
+def test_dedup_step_args():
+    step = {"name": "dedup", "script": "files_process/etls/steps/dedup_rows.py", "method": "filter_new_rows",
+            "args": {"key_columns": ["concept"]}, "type": "Transform"}
+    task = {"key": "k", "name": "n", "extract_provider": {"script": "files_process/etls/extract/extract_pdf.py", "method": "extract"}, "steps": [step]}
+    assert dedup_step_args(TaskPlan(task)) == {"key_columns": ["concept"]}
+
+    task["steps"] = []
+    assert dedup_step_args(TaskPlan(task)) is None
@@ -0,0 +1,104 @@
+import logging
+
+import pytest
+
+from files_process.etls.checkpoints import PipelineCheckpoints
+from files_process.etls.pipeline.plan import TaskPlan, load_module
+
+STEPS_SCRIPT = "tests/checkpoint_steps.py"
+logger = logging.getLogger("tests")
+
+
+def transform(method: str, checkpoint: bool = True, **args) -> dict:
+    return {"name": method, "script": STEPS_SCRIPT, "method": method, "args": args, "type": "Transform", "checkpoint": checkpoint}
+
+
+def make_plan(steps: list = None) -> TaskPlan:
+    return TaskPlan({
+        "key": "checkpointed",
+        "name": "checkpointed",
+        "extract_provider": {"script": STEPS_SCRIPT, "method": "extract", "args": {}},
+        "steps": steps if steps is not None else [transform("multiply", factor=2), transform("multiply", factor=5), transform("finish", checkpoint=False)],
+    })
+
+
+@pytest.fixture
+def steps():
+    module = load_module(STEPS_SCRIPT)
+    module.CALLS.clear()
+    module.FAIL["finish"] = False
+    yield module
+    module.FAIL["finish"] = False
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return {"pipeline_checkpoints": True, "checkpoint_dir": str(tmp_path / "checkpoints"), "metrics_enabled": False}
+
+
+@pytest.fixture
+def statement(tmp_path):
+    path = tmp_path / "statement.pdf"
+    path.write_bytes(b"%PDF statement")
+    return str(path)
+
+
+def run(plan, settings, **run_kwargs):
+    return plan.build(settings, logger, **run_kwargs).run()
+
+
+def test_rerun_resumes_after_the_last_checkpointed_transform(steps, settings, statement):
+    plan = make_plan()
+    steps.FAIL["finish"] = True
+    assert run(plan, settings, filepath=statement, month=3).has_errors
+    assert steps.CALLS == ["extract", "multiply:2", "multiply:5", "finish:[10, 20, 30]"]
+
+    steps.CALLS.clear()
+    steps.FAIL["finish"] = False
+    log = run(plan, settings, filepath=statement, month=3)
+
+    assert not log.has_errors
+    # Extraction and both multiplications come from the checkpoint
+    assert steps.CALLS == ["finish:[10, 20, 30]"]
+    assert log.messages("file_processed") == [statement]
+    assert any(message.startswith("Resumed from the checkpoint of step") for message in log.messages("info"))
+
+
+def test_keys_change_with_the_input_the_arguments_and_the_steps(settings, statement, tmp_path):
+    plan = make_plan()
+    keys = PipelineCheckpoints.for_run(settings, plan, {"filepath": statement, "month": 3}).keys
+
+    # One key per leading checkpointed Transform, the chain stops at "checkpoint": false
+    assert len(keys) == 2
+    assert keys == PipelineCheckpoints.for_run(settings, plan, {"filepath": statement, "month": 3, "run_id": "other"}).keys
+    assert keys != PipelineCheckpoints.for_run(settings, plan, {"filepath": statement, "month": 4}).keys
+
+    other_file = tmp_path / "other.pdf"
+    other_file.write_bytes(b"%PDF other statement")
+    assert keys[0] != PipelineCheckpoints.for_run(settings, plan, {"filepath": str(other_file), "month": 3}).keys[0]
+
+    changed = make_plan([transform("multiply", factor=2), transform("multiply", factor=7)])
+    changed_keys = PipelineCheckpoints.for_run(settings, changed, {"filepath": statement, "month": 3}).keys
+    assert changed_keys[0] == keys[0] and changed_keys[1] != keys[1]
+
+
+def test_checkpoints_can_be_turned_off(settings, statement):
+    plan = make_plan()
+    assert PipelineCheckpoints.for_run(settings, plan, {"filepath": statement, "checkpoint": "off"}) is None
+    assert PipelineCheckpoints.for_run({**settings, "pipeline_checkpoints": False}, plan, {"filepath": statement}) is None
+    # Without a single input file, or without a leading checkpointed Transform, there is nothing to key
+    assert PipelineCheckpoints.for_run(settings, plan, {"month": 3}) is None
+    assert PipelineCheckpoints.for_run(settings, make_plan([transform("finish", checkpoint=False)]), {"filepath": statement}) is None
+
+
+def test_changed_arguments_do_not_resume(steps, settings, statement):
+    plan = make_plan()
+    run(plan, settings, filepath=statement, month=3)
+    steps.CALLS.clear()
+
+    run(plan, settings, filepath=statement, month=4)
+    assert steps.CALLS[0] == "extract"
+
+    steps.CALLS.clear()
+    run(plan, settings, filepath=statement, month=3, checkpoint="off")
+    assert steps.CALLS[0] == "extract"
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from files_process.etls.cleaning import BLANK_NORMALIZED, normalize_blanks
+
+
+def test_strips_text_and_sets_blanks_to_na():
+    dataframe = pd.DataFrame({"concept": ["  PAGO ", "", "   ", None, "\tABONO\n"], "amount": [1.0, 2.0, np.nan, 4.0, 5.0]})
+    result = normalize_blanks(dataframe)
+
+    assert result["concept"].tolist()[0] == "PAGO"
+    assert result["concept"].tolist()[4] == "ABONO"
+    assert result["concept"][1:4].isna().all()
+    # Numeric columns are left as they are
+    assert result["amount"].tolist()[:2] == [1.0, 2.0] and np.isnan(result["amount"][2])
+    # The input frame is not modified
+    assert dataframe["concept"].tolist()[0] == "  PAGO "
+
+
+def test_marks_the_frame_and_skips_marked_frames():
+    result = normalize_blanks(pd.DataFrame({"concept": [" a "]}))
+    assert result.attrs[BLANK_NORMALIZED]
+
+    result["concept"] = [" b "]
+    assert normalize_blanks(result)["concept"][0] == " b "
+    assert normalize_blanks(result, force=True)["concept"][0] == "b"
+
+
+def test_drop_empty_removes_rows_and_columns_of_na_or_empty_cells():
+    dataframe = pd.DataFrame({
+        "date": ["01/03", "", None, "02/03"],
+        "concept": ["PAGO", None, "", "ABONO"],
+        "empty": ["", None, "", None],
+        "spaces": [" ", None, "", None],
+    })
+    result = normalize_blanks(dataframe, drop_empty=True)
+
+    # Rows 1 and 2 only hold NA and '', the 'empty' column too
+    assert result.index.tolist() == [0, 3]
+    # A whitespace-only cell does not count as empty, so 'spaces' is kept (now NA)
+    assert result.columns.tolist() == ["date", "concept", "spaces"]
+    assert result["spaces"].isna().all()
+
+
+def test_drop_empty_keeps_frames_without_blanks():
+    dataframe = pd.DataFrame({"a": ["x", "y"], "b": ["1", "2"]})
+    result = normalize_blanks(dataframe, drop_empty=True)
+    assert result.shape == (2, 2)
+    assert result.equals(dataframe)
+
+
+def test_empty_frame():
+    result = normalize_blanks(pd.DataFrame(columns=["a", "b"]), drop_empty=True)
+    assert result.empty
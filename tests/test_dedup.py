@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from files_process.etls.dedup import STATUS_COMMITTED, STATUS_PENDING, DedupIndex, row_fingerprints
+
+
+def transactions(rows):
+    return pd.DataFrame(rows, columns=["bank", "operation_date", "concept", "charges", "credits", "balance"])
+
+
+ROWS = [
+    ["BBVA", "01/03/2024", "PAGO TARJETA", 100.0, 0.0, 900.0],
+    ["BBVA", "02/03/2024", "ABONO NOMINA", 0.0, 1500.0, 2400.0],
+    ["BBVA", "03/03/2024", "CAFE", 4.5, 0.0, 2395.5],
+]
+
+
+def statuses(index: DedupIndex) -> dict:
+    with index._connect() as connection:
+        return dict(connection.execute("SELECT fingerprint, status FROM fingerprints").fetchall())
+
+
+def test_fingerprints_are_stable():
+    first = row_fingerprints(transactions(ROWS))
+    # Same transactions extracted again: other index, padded text, amounts as text
+    again = transactions([[bank, f" {date} ", concept, str(charges), credits, balance]
+                          for bank, date, concept, charges, credits, balance in ROWS])
+    again.index = [10, 11, 12]
+
+    assert first.dtype == np.int64
+    assert len(set(first)) == 3
+    assert np.array_equal(first, row_fingerprints(again))
+    assert np.array_equal(first, row_fingerprints(transactions(ROWS)))
+
+
+def test_identical_rows_are_numbered_by_occurrence():
+    rows = [ROWS[0], ROWS[1], ROWS[0], ROWS[0]]
+    fingerprints = row_fingerprints(transactions(rows))
+
+    assert len(set(fingerprints)) == 4
+    # The first occurrence keeps the fingerprint of the row alone
+    assert fingerprints[0] == row_fingerprints(transactions([ROWS[0]]))[0]
+    # Reprocessing the statement gives the same set
+    assert np.array_equal(fingerprints, row_fingerprints(transactions(rows)))
+
+
+def test_pending_rows_only_count_once_committed(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.db"))
+    fingerprints = row_fingerprints(transactions(ROWS))
+
+    index.add_pending("run1:0", fingerprints)
+    assert set(statuses(index).values()) == {STATUS_PENDING}
+    assert not index.known(fingerprints).any()
+
+    assert index.commit("run1") == 3
+    assert set(statuses(index).values()) == {STATUS_COMMITTED}
+    assert index.known(fingerprints).all()
+
+    # A later run does not turn committed rows back to pending, nor discard them
+    index.add_pending("run2", fingerprints[:1])
+    assert index.discard("run2") == 0
+    assert index.known(fingerprints).all()
+
+
+def test_discarded_rows_are_forgotten(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.db"))
+    fingerprints = row_fingerprints(transactions(ROWS))
+
+    index.add_pending("run1", fingerprints)
+    assert index.discard("run1") == 3
+    assert statuses(index) == {}
+    assert index.commit("run1") == 0
+    assert not index.known(fingerprints).any()
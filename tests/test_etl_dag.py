@@ -0,0 +1,116 @@
+import json
+import os
+
+import pytest
+
+import constants
+from files_process.etls.etl import ETL
+from files_process.file_processor import FileProcessor
+
+STEPS_SCRIPT = os.path.join(os.path.dirname(__file__), "dag_steps.py")
+
+
+class DagSettings:
+    def __init__(self, tasks_file: str):
+        self.tasks_file = tasks_file
+        self.dag_workers = 0
+        self.metrics_enabled = False
+        self.pipeline_checkpoints = False
+        self.profile_enabled = False
+
+
+def task(key: str, depends_on: list = None, fail: bool = False) -> dict:
+    definition = {
+        "key": key,
+        "name": key,
+        "extract_provider": {"script": STEPS_SCRIPT, "method": "extract", "args": {"label": key, "fail": fail}},
+        "steps": [],
+        "post_load_provider": {"name": "post_load", "script": STEPS_SCRIPT, "method": "post_load", "args": {}},
+    }
+    if depends_on:
+        definition["depends_on"] = depends_on
+    return definition
+
+
+@pytest.fixture
+def make_etl(tmp_path):
+    def make(tasks: list) -> ETL:
+        tasks_file = tmp_path / "tasks.json"
+        tasks_file.write_text(json.dumps(tasks))
+        return ETL(DagSettings(str(tasks_file)))
+    return make
+
+
+def test_dependencies_run_first_and_share_one_extraction(make_etl):
+    etl = make_etl([task("transactions"), task("resume", depends_on=["transactions"]), task("summary")])
+    events = []
+    log = etl.run_tasks(["resume", "transactions", "summary"], events=events)
+
+    assert not log.has_errors
+    assert events.index("end:transactions") < events.index("start:resume")
+    # Independent tasks start before the first one ends
+    assert events.index("start:summary") < events.index("end:transactions")
+    assert events.count("extract_tables") == 1
+    # The post-load is shared by the three tasks and runs once, after all of them
+    assert events.count("post_load") == 1
+    assert events[-1] == "post_load"
+
+
+def test_dependents_of_a_failed_task_are_skipped(make_etl):
+    etl = make_etl([
+        task("transactions", fail=True),
+        task("resume", depends_on=["transactions"]),
+        task("report", depends_on=["resume"]),
+        task("summary"),
+    ])
+    events = []
+    log = etl.run_tasks(["transactions", "resume", "report", "summary"], events=events)
+
+    errors = log.messages("error")
+    assert "transactions failed" in errors
+    assert any(message.startswith("Task resume skipped") for message in errors)
+    assert any(message.startswith("Task report skipped") for message in errors)
+    assert "start:resume" not in events and "start:report" not in events
+    assert "end:summary" in events
+
+
+def test_unknown_dependency_skips_the_task(make_etl):
+    etl = make_etl([task("resume", depends_on=["transactions"])])
+    events = []
+    log = etl.run_tasks(["resume"], events=events)
+
+    assert log.messages("error") == ["Task resume skipped, dependencies failed or missing: transactions"]
+    assert "start:resume" not in events
+
+
+def test_cycles_are_reported(make_etl):
+    etl = make_etl([task("a", depends_on=["b"]), task("b", depends_on=["a"])])
+    events = []
+    log = etl.run_tasks(["a", "b"], events=events)
+
+    assert log.has_errors
+    assert log.messages("error")[0].startswith("Circular task dependencies")
+    assert events == []
+
+
+def test_failed_resume_does_not_affect_transactions(make_etl):
+    etl = make_etl([task("transactions"), task("resume", fail=True)])
+    events = []
+    log = etl.run_tasks(["transactions", "resume"], events=events)
+
+    assert log.messages("error") == ["resume failed"]
+    assert "end:transactions" in events and "end:resume" in events
+    # The post-load still runs once, for both tasks
+    assert events.count("post_load") == 1
+
+
+@pytest.mark.parametrize("process_resume, expected", [(False, ["transactions"]), (True, ["transactions", "resume"])])
+def test_bbva_resume_task_is_behind_a_setting(make_etl, process_resume, expected):
+    settings = make_etl([task(constants.PROCESS_BBVA_TRANSACTIONS_ETL), task(constants.PROCESS_RESUME_ETL)]).settings
+    settings.bbva_process_resume = process_resume
+    events = []
+    FileProcessor(settings).process_file("bbva", events=events)
+
+    keys = {"transactions": constants.PROCESS_BBVA_TRANSACTIONS_ETL, "resume": constants.PROCESS_RESUME_ETL}
+    started = [event.split(":", 1)[1] for event in events if event.startswith("start:")]
+    assert sorted(started) == sorted(keys[name] for name in expected)
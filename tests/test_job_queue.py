@@ -0,0 +1,109 @@
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from files_process.jobs import job_queue
+from files_process.jobs.job_queue import STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING, JobQueue, worker_id
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"), max_attempts=2, backoff_seconds=60, bank_limits={"BBVA": 1})
+
+
+def params(name: str) -> dict:
+    return {"filepath": f"downloads/{name}.pdf", "pdf_password": "secret"}
+
+
+def advance(monkeypatch, seconds: float):
+    now = time.time() + seconds
+    monkeypatch.setattr(job_queue.time, "time", lambda: now)
+
+
+def test_claims_the_oldest_job_first(queue):
+    first = queue.enqueue("Santander", params("first"))
+    second = queue.enqueue("banorte", params("second"))
+
+    job = queue.claim("worker-a")
+    assert job["id"] == first
+    assert job["status"] == STATUS_RUNNING and job["worker"] == "worker-a" and job["attempts"] == 1
+    assert job["bank"] == "santander"
+    assert job["params"] == params("first")
+    assert queue.claim("worker-b")["id"] == second
+    assert queue.claim("worker-c") is None
+
+
+def test_bank_limits_skip_to_other_banks(queue):
+    first = queue.enqueue("bbva", params("first"))
+    second = queue.enqueue("bbva", params("second"))
+    other = queue.enqueue("santander", params("other"))
+
+    assert queue.claim("worker-a")["id"] == first
+    # BBVA already has its only running job, the next BBVA statement waits
+    assert queue.claim("worker-b")["id"] == other
+    assert queue.claim("worker-c") is None
+
+    queue.complete(first, [])
+    assert queue.claim("worker-c")["id"] == second
+
+
+def test_failed_attempts_are_retried_with_backoff(queue, monkeypatch):
+    job_id = queue.enqueue("santander", params("statement"))
+    queue.claim("worker-a")
+    queue.fail(job_id, "crash")
+
+    job = queue.get(job_id)
+    assert job["status"] == STATUS_QUEUED and job["error"] == "crash"
+    assert job["available_at"] >= time.time() + 59
+    assert queue.claim("worker-a") is None
+
+    advance(monkeypatch, 61)
+    assert queue.claim("worker-a")["attempts"] == 2
+    queue.fail(job_id, "crash again")
+
+    job = queue.get(job_id)
+    assert job["status"] == STATUS_FAILED and job["error"] == "crash again"
+    assert "pdf_password" not in job["params"]
+    assert [job["id"] for job in queue.pending_notifications()] == [job_id]
+
+
+def test_completed_jobs_are_notified_once(queue):
+    done = queue.enqueue("santander", params("done"))
+    waiting = queue.enqueue("santander", params("waiting"))
+    queue.claim("worker-a")
+    queue.complete(done, [{"type": "info", "message": "ok"}])
+
+    job = queue.get(done)
+    assert job["status"] == STATUS_DONE
+    assert job["result"] == [{"type": "info", "message": "ok"}]
+    assert job["params"] == {"filepath": "downloads/done.pdf"}
+    assert [job["id"] for job in queue.pending_notifications()] == [done]
+    assert queue.get(waiting)["status"] == STATUS_QUEUED
+
+    queue.mark_notified(done)
+    assert queue.pending_notifications() == []
+
+
+def test_requeue_running_only_takes_jobs_of_dead_workers(queue):
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True, check=True)
+    dead = f"{socket.gethostname()}:{finished.stdout.strip()}:job-worker-0"
+    workers = {
+        "dead": dead,
+        "alive": worker_id("job-worker-1"),
+        "remote": "other-host:1:job-worker-0",
+        "legacy": "job-worker-2",
+    }
+    jobs = {}
+    for name, worker in workers.items():
+        jobs[name] = queue.enqueue("santander", params(name))
+        queue.claim(worker)
+
+    assert queue.requeue_running() == 2
+    assert queue.get(jobs["dead"])["status"] == STATUS_QUEUED
+    assert queue.get(jobs["dead"])["worker"] is None
+    assert queue.get(jobs["legacy"])["status"] == STATUS_QUEUED
+    assert queue.get(jobs["alive"])["status"] == STATUS_RUNNING
+    assert queue.get(jobs["remote"])["status"] == STATUS_RUNNING
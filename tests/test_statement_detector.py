@@ -0,0 +1,95 @@
+import pytest
+
+from discord_bot import manage_extact_channel
+from files_process.extractors.statement_detector import detect_from_filename, detect_from_text, detect_statement
+
+
+@pytest.mark.parametrize("file_name, expected", [
+    ("extracto_2024-03.pdf", {"month": 3, "year": 2024}),
+    ("nequi_03_2024.pdf", {"bank_name": "nequi", "month": 3, "year": 2024}),
+    ("BBVA Marzo 2024.pdf", {"bank_name": "bbva", "month": 3, "year": 2024}),
+    ("extracto_sept-2023.pdf", {"month": 9, "year": 2023}),
+    # YYYY-MM-DD: the day is not read as a month
+    ("movimientos_2024-03-31.pdf", {"month": 3, "year": 2024}),
+    ("movimientos_2024-11-05.pdf", {"month": 11, "year": 2024}),
+    # DD-MM-YYYY
+    ("corte_31-03-2024.pdf", {"month": 3, "year": 2024}),
+])
+def test_period_in_file_name(file_name, expected):
+    assert detect_from_filename(file_name) == expected
+
+
+@pytest.mark.parametrize("file_name", [
+    # Account and reference numbers that contain a year-like run of digits
+    "bbva_cuenta_0013020124050.pdf",
+    "extracto_20240315.pdf",
+    "ref_1202455.pdf",
+    "cuenta-9912-2024123.pdf",
+    "statement.pdf",
+])
+def test_digits_of_account_numbers_are_not_a_period(file_name):
+    assert "month" not in detect_from_filename(file_name)
+    assert "year" not in detect_from_filename(file_name)
+
+
+def test_bank_and_period_in_bbva_header():
+    text = "BBVA Colombia\nNo. de Cuenta 0013-0201-24-0500\nPeriodo: del 01/03/2024 al 31/03/2024\n"
+    assert detect_from_text(text) == {"bank_name": "bbva", "month": 3, "year": 2024}
+
+
+def test_bank_and_period_in_nequi_header():
+    text = "Nequi - Extracto de tu cuenta\nPeríodo: 2024/02/01 a 2024/02/29"
+    assert detect_from_text(text) == {"bank_name": "nequi", "month": 2, "year": 2024}
+
+
+def test_month_names_are_accent_and_case_insensitive():
+    assert detect_from_text("NEQUI\nExtracto del mes: Septiembre de 2023") == {"bank_name": "nequi", "month": 9, "year": 2023}
+    assert detect_from_text("bbva\nFecha de corte: 15/12/2023") == {"bank_name": "bbva", "month": 12, "year": 2023}
+
+
+def test_text_without_a_known_bank_gives_nothing():
+    assert detect_from_text("Banco Desconocido\nPeriodo: del 01/03/2024 al 31/03/2024") == {}
+
+
+def test_header_text_takes_priority_over_the_file_name():
+    info = detect_statement("nequi_2023-01.pdf", "BBVA\nPeriodo: del 01/03/2024 al 31/03/2024")
+    assert info == {"bank_name": "bbva", "month": 3, "year": 2024}
+
+
+class FakeLLM:
+    def __init__(self, answer=None):
+        self.answer = answer
+        self.texts = []
+
+    def __call__(self, text, cache=None, logger=None):
+        self.texts.append(text)
+        return self.answer
+
+
+def test_llm_is_not_called_when_the_header_has_everything(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(manage_extact_channel, "get_extract_info", llm)
+    params = manage_extact_channel.complete_statement_info(
+        {}, "upload.pdf", "BBVA\nPeriodo: del 01/03/2024 al 31/03/2024"
+    )
+    assert params == {"bank_name": "bbva", "month": 3, "year": 2024}
+    assert llm.texts == []
+
+
+def test_llm_fills_only_the_missing_fields(monkeypatch):
+    llm = FakeLLM(manage_extact_channel.PDfInfo(bank_name="nequi", month=5, year=2022))
+    monkeypatch.setattr(manage_extact_channel, "get_extract_info", llm)
+    header = "BBVA\nSin periodo en la primera página " + "x" * 5000
+    params = manage_extact_channel.complete_statement_info({"month": 3}, "upload.pdf", header, llm_header_chars=100)
+
+    # The bank comes from the header, the month from the message, only the year from the LLM
+    assert params == {"month": 3, "bank_name": "bbva", "year": 2022}
+    assert llm.texts == [header[:100]]
+
+
+def test_llm_is_not_called_when_the_message_gave_everything(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(manage_extact_channel, "get_extract_info", llm)
+    params = {"bank_name": "nequi", "month": 1, "year": 2024}
+    assert manage_extact_channel.complete_statement_info(dict(params), "x.pdf", "") == params
+    assert llm.texts == []
@@ -0,0 +1,90 @@
+import os
+import time
+
+import pandas as pd
+
+from files_process.extractors import TableCache
+
+
+def tables(value: str):
+    return [pd.DataFrame({0: [value, "b"], 1: ["1.00", "2.00"]}), pd.DataFrame({"concept": [value]})]
+
+
+def entry_size(cache: TableCache, key: str) -> int:
+    entry_dir = os.path.join(cache.cache_dir, key)
+    return sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file())
+
+
+def age(cache: TableCache, key: str, seconds: float):
+    """Moves the last access of an entry back in time."""
+    past = time.time() - seconds
+    os.utime(os.path.join(cache.cache_dir, key, TableCache.META_FILE), (past, past))
+
+
+def test_round_trip_keeps_the_column_labels(tmp_path):
+    cache = TableCache(str(tmp_path))
+    cache.put("key", tables("a"))
+    first, second = cache.get("key")
+
+    assert first.columns.tolist() == [0, 1]
+    assert first.values.tolist() == [["a", "1.00"], ["b", "2.00"]]
+    assert second.columns.tolist() == ["concept"]
+    assert cache.get("missing") is None
+
+
+def test_key_depends_on_the_file_and_the_extraction_parameters():
+    key = TableCache.make_key("hash", flavor="lattice", pages="all")
+
+    assert key == TableCache.make_key("hash", pages="all", flavor="lattice")
+    assert key != TableCache.make_key("other hash", flavor="lattice", pages="all")
+    assert key != TableCache.make_key("hash", flavor="stream", pages="all")
+    assert key != TableCache.make_key("hash", flavor="lattice", pages="1-2")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = TableCache(str(tmp_path))
+    cache.put("a", tables("a"))
+    cache.put("b", tables("b"))
+    # Room for two entries
+    cache.max_bytes = int(entry_size(cache, "a") * 2.5)
+    age(cache, "a", 200)
+    age(cache, "b", 100)
+
+    # Reading a makes it the most recently used, b is now the oldest
+    assert cache.get("a") is not None
+    cache.put("c", tables("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_put_replaces_an_entry_and_invalidate_removes_it(tmp_path):
+    cache = TableCache(str(tmp_path))
+    cache.put("key", tables("a"))
+    cache.put("key", tables("z")[:1])
+
+    replaced = cache.get("key")
+    assert len(replaced) == 1 and replaced[0].iloc[0, 0] == "z"
+
+    cache.invalidate("key")
+    assert cache.get("key") is None
+    assert [name for name in os.listdir(tmp_path) if not name.startswith(".")] == []
+
+
+def test_corrupt_entries_are_discarded(tmp_path):
+    cache = TableCache(str(tmp_path))
+    cache.put("key", tables("a"))
+    with open(os.path.join(tmp_path, "key", "0.parquet"), "wb") as table_file:
+        table_file.write(b"not parquet")
+
+    assert cache.get("key") is None
+    assert not os.path.exists(os.path.join(tmp_path, "key"))
+
+
+def test_from_settings(tmp_path):
+    assert TableCache.from_settings({"table_cache_enabled": False}) is None
+
+    cache = TableCache.from_settings({"table_cache_enabled": True, "table_cache_dir": str(tmp_path), "table_cache_max_mb": 2})
+    assert cache.cache_dir == str(tmp_path)
+    assert cache.max_bytes == 2 * 1024 * 1024